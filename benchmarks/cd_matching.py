@@ -0,0 +1,67 @@
+"""Time ranking the repositories matching a `dev cd` query.
+
+    python -m benchmarks.cd_matching [repositories]
+
+Ranks a set of generated repositories (default 10,000) against a few queries, with frecency
+boosts on some of them, and prints the best time of each query in milliseconds. Matching must
+stay under BUDGET_MS for `dev cd` to feel instant.
+"""
+
+import random
+import string
+import sys
+import time
+from typing import List, Tuple
+
+from dev.helpers.fuzzy import Matcher
+
+BUDGET_MS = 10.0
+QUERIES = ['a', 'api', 'acme/web', 'xyz', 'srvgw', 'platform-infra']
+ROUNDS = 20
+
+
+def generate(count: int) -> List[Tuple[str, str, str]]:
+    rng = random.Random(0)
+    words = [''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 8))) for _ in range(500)]
+    words += ['api', 'web', 'service', 'gateway', 'platform', 'infra', 'acme']
+    hosts = ['github.com', 'gitlab.com', 'example.com']
+    organizations = [rng.choice(words) for _ in range(50)] + ['acme']
+
+    return [
+        (
+            '-'.join(rng.choices(words, k=rng.randint(1, 3))),
+            rng.choice(organizations),
+            rng.choice(hosts),
+        )
+        for _ in range(count)
+    ]
+
+
+def measure(query: str, candidates: List, boosts: List[float]) -> Tuple[float, int]:
+    best = float('inf')
+    matches = 0
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        matches = len(Matcher(query).rank(candidates, boosts.__getitem__))
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, matches
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    candidates = generate(count)
+    boosts = [20.0 if i % 50 == 0 else 0.0 for i in range(count)]
+
+    over_budget = False
+    for query in QUERIES:
+        elapsed, matches = measure(query, candidates, boosts)
+        over_budget = over_budget or elapsed > BUDGET_MS
+        print(f'{query:<16} {elapsed:6.2f} ms {matches:6d} matches')
+
+    if over_budget:
+        print(f'Over the {BUDGET_MS:.0f} ms budget for {count} repositories')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Compare throughput of the pty copy loop against the previous select() loop.
+
+    python -m benchmarks.pty_throughput [megabytes]
+
+A child writes the given amount of data (default 256 MB) to its pty, the parent copies it to
+/dev/null. Results are printed in MB/s.
+"""
+
+import os
+import sys
+import time
+from select import select
+from typing import Callable
+
+from dev import pty
+
+
+def legacy_read(fd: int) -> bytes:
+    return os.read(fd, 1024)
+
+
+def legacy_copy(
+    master_fd: int,
+    master_read: Callable[[int], bytes] = legacy_read,
+    stdin_read: Callable[[int], bytes] = legacy_read,
+) -> None:
+    # The copy loop as it was before the poll based pump, kept for comparison
+    fds = [master_fd, pty.STDIN_FILENO]
+    while fds:
+        rfds, _wfds, _xfds = select(fds, [], [])
+
+        if master_fd in rfds:
+            try:
+                data = master_read(master_fd)
+            except OSError:
+                data = b''
+            if not data:
+                return
+            else:
+                os.write(pty.STDOUT_FILENO, data)
+
+        if pty.STDIN_FILENO in rfds:
+            data = stdin_read(pty.STDIN_FILENO)
+            if not data:
+                fds.remove(pty.STDIN_FILENO)
+            else:
+                pty._writen(master_fd, data)
+
+
+def measure(megabytes: int, master_read: Callable[[int], bytes]) -> float:
+    size = megabytes * 1024 * 1024
+    code = (
+        'import os, sys\n'
+        'chunk = b"x" * 65536\n'
+        f'for _ in range({size} // 65536):\n'
+        '    os.write(1, chunk)\n'
+    )
+
+    start = time.perf_counter()
+    pty.spawn((sys.executable, '-c', code), master_read=master_read)
+    elapsed = time.perf_counter() - start
+
+    return megabytes / elapsed
+
+
+def main() -> None:
+    megabytes = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+
+    saved_stdin = os.dup(pty.STDIN_FILENO)
+    saved_stdout = os.dup(pty.STDOUT_FILENO)
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, pty.STDIN_FILENO)
+    os.dup2(devnull, pty.STDOUT_FILENO)
+
+    results = {}
+    try:
+        results['poll pump'] = measure(megabytes, pty._read)
+
+        copy = pty._copy
+        pty._copy = legacy_copy
+        try:
+            results['select loop'] = measure(megabytes, legacy_read)
+        finally:
+            pty._copy = copy
+    finally:
+        os.dup2(saved_stdin, pty.STDIN_FILENO)
+        os.dup2(saved_stdout, pty.STDOUT_FILENO)
+
+    for name, throughput in results.items():
+        print(f'{name:<12} {throughput:8.1f} MB/s')
+
+
+if __name__ == '__main__':
+    main()
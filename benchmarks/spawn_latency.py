@@ -0,0 +1,46 @@
+"""Compare the time to run short commands through `bash -c` and by executing them directly.
+
+    python -m benchmarks.spawn_latency [rounds]
+
+Each command is run the given number of times (default 200) both ways and the median wall time
+from fork until it exited is printed in milliseconds. Probes like `git branch --show-current`
+or `brew --prefix` are run often enough for the startup of bash to matter.
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Sequence
+
+from dev.helpers.argv import split_command
+
+COMMANDS = ['true', 'uname -s', 'git --version']
+
+
+def measure(argv: Sequence[str], rounds: int) -> float:
+    timings: List[float] = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        subprocess.run(argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    print(f'{"command":<16} {"bash -c":>10} {"direct":>10}')
+    for command in COMMANDS:
+        argv = split_command(command, dict(os.environ))
+        if argv is None:
+            print(f'{command:<16} {"not on PATH":>21}')
+            continue
+        shell = measure(('bash', '-c', command), rounds)
+        direct = measure(argv, rounds)
+        print(f'{command:<16} {shell:8.2f}ms {direct:8.2f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Compare the time to start a command by forking against posix_spawn as dev grows in memory.
+
+    python -m benchmarks.spawn_rss [rounds]
+
+The parent allocates increasing amounts of memory and runs `true` the given number of times
+(default 100) in each mode, printing the median time until it exited in milliseconds:
+
+  pty fork      dev.pty.spawn forking the interpreter
+  pty spawn     dev.pty.spawn with posix_spawn (Linux only)
+  pipe fork     subprocess.Popen with close_fds, which forks or vforks
+  pipe spawn    subprocess.Popen with popen_args, which lets it use posix_spawn
+"""
+
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List
+
+from dev import pty
+from dev.helpers.argv import popen_args
+
+SIZES_MB = [0, 256, 1024, 2048]
+
+
+def measure(run: Callable[[], None], rounds: int) -> float:
+    timings: List[float] = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def pty_spawn(use_posix_spawn: bool) -> Callable[[], None]:
+    def run() -> None:
+        saved = pty.USE_POSIX_SPAWN
+        pty.USE_POSIX_SPAWN = use_posix_spawn
+        try:
+            pty.spawn(('true',))
+        finally:
+            pty.USE_POSIX_SPAWN = saved and pty.USE_POSIX_SPAWN
+
+    return run
+
+
+def pipe_fork() -> None:
+    subprocess.run(('true',), stdout=subprocess.DEVNULL)
+
+
+def pipe_spawn() -> None:
+    subprocess.run(**popen_args('true'), stdout=subprocess.DEVNULL)
+
+
+def max_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return rss / 1024 / 1024 if sys.platform == 'darwin' else rss / 1024
+
+
+def main() -> None:
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+
+    saved_stdin = os.dup(pty.STDIN_FILENO)
+    saved_stdout = os.dup(pty.STDOUT_FILENO)
+    devnull = os.open(os.devnull, os.O_RDWR)
+
+    def measure_all(modes: Dict[str, Callable[[], None]]) -> List[float]:
+        os.dup2(devnull, pty.STDIN_FILENO)
+        os.dup2(devnull, pty.STDOUT_FILENO)
+        try:
+            return [measure(run, rounds) for run in modes.values()]
+        finally:
+            os.dup2(saved_stdin, pty.STDIN_FILENO)
+            os.dup2(saved_stdout, pty.STDOUT_FILENO)
+
+    # The first spawn finds out whether Python was built with POSIX_SPAWN_SETSID
+    measure_all({'warm up': pty_spawn(pty.USE_POSIX_SPAWN)})
+    modes: Dict[str, Callable[[], None]] = {'pty fork': pty_spawn(False)}
+    if pty.USE_POSIX_SPAWN:
+        modes['pty spawn'] = pty_spawn(True)
+    modes['pipe fork'] = pipe_fork
+    modes['pipe spawn'] = pipe_spawn
+
+    print(f'{"rss":>8} ' + ' '.join(f'{name:>11}' for name in modes), flush=True)
+    ballast = []
+    for size in SIZES_MB:
+        # Written to, untouched pages would not count towards the page tables copied by fork
+        ballast.append(b'x' * (size * 1024 * 1024 - sum(len(b) for b in ballast)))
+        results = measure_all(modes)
+        print(
+            f'{max_rss_mb():6.0f}MB ' + ' '.join(f'{result:9.2f}ms' for result in results),
+            flush=True,
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,5 @@
-try:
-    __import__('pkg_resources').declare_namespace(__name__)
-except ImportError:
-    from pkgutil import extend_path
+# pkgutil-style namespace package, declare_namespace() from pkg_resources costs a few hundred
+# milliseconds on every invocation.
+from pkgutil import extend_path
 
-    __path__ = extend_path(__path__, __name__)
+__path__ = extend_path(__path__, __name__)
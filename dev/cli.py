@@ -1,11 +1,14 @@
 #!/usr/bin/env python3
 """
 Usage:
-  dev <command> [-- <extra_args>...]
+  dev [--profile] <command> [-- <extra_args>...]
   dev cd [<repository>]
-  dev clone <repository_or_url>
+  dev clone [--jobs=<n>] [--filter=<spec>] [--reference=<dir>] [--manifest=<file>]
+            [<repository_or_url>...]
   dev init <shell>
   dev open <target>
+  dev stats [--days=<n>] [--limit=<n>]
+  dev sync [--jobs=<n>] [--timeout=<seconds>]
   dev update
   dev [-hvct]
 
@@ -14,32 +17,56 @@ Options:
   -v, --version    Show version
   -c, --commands   List all commands
   -t, --tasks      List all tasks
+  --profile        Print where the time of the command went and write a trace, before or
+                   right after the command
 
 """
 
 import os
 import sys
+import time
+from typing import Optional
 
-from docopt import docopt
+from docopt import DocoptExit, docopt
 
+from dev import environment
 from dev.config import config
 from dev.console import console, error_console
+from dev.engine import Engine
 from dev.exceptions import CommandNotFoundError, NonZeroReturnCodeError, TaskNotFoundError
 from dev.helpers import load_local_taks, task_to_class
 from dev.helpers.parent_shell import ParentShellHelper
-from dev.tasks.internal import HelpCommand, HelpTask
+from dev.helpers.run_history import COMMAND, FAILED, SUCCEEDED, RunHistoryHelper
+from dev.helpers.trace import TraceHelper
+from dev.tasks.internal import registry as internal_registry
 from dev.version import __version__
 
 from . import sys_path  # noqa
 
-args = docopt(__doc__ or '')
 
-load_local_taks()
+def main(args: Optional[dict] = None) -> None:
+    if args is None:
+        # Arguments after the command are left to it, e.g. the options of dev clone
+        args = docopt(__doc__ or '', options_first=True)
 
+    # Task modules are imported on demand by task_to_class, only the ones needed by the
+    # resolved command are loaded.
+    load_local_taks()
 
-def main(args: dict = args) -> None:
     command = args['<command>']
     extra_args = args['<extra_args>']
+    profile = args.get('--profile') is True
+    # Whether the extra arguments followed `--`
+    separated = args.get('--') is True
+    if extra_args and extra_args[0] == '--profile' and not separated:
+        # `dev up --profile`, options_first leaves options after the command to it
+        profile = True
+        separated = extra_args[1:2] == ['--']
+        extra_args = extra_args[2:] if separated else extra_args[1:]
+    if extra_args and not separated and command not in internal_registry:
+        # options_first hands everything after the command over, only internal commands like
+        # dev clone parse it. Arguments for the tasks of a Devfile command follow `--`.
+        raise DocoptExit
 
     try:
         if args['--version'] is True:
@@ -47,22 +74,20 @@ def main(args: dict = args) -> None:
             sys.exit(0)
 
         if args['--tasks'] is True:
-            HelpTask()
+            task_to_class('help_task')()
             sys.exit(0)
 
         if not command or args['--commands'] is True:
-            HelpCommand()
+            task_to_class('help_command')()
             sys.exit(0)
 
         warn_when_using_bare(command)
 
-        for direction, tasks in config.resolve_tasks(command, extra_args).items():
-            for task in tasks:
-                task_to_class(task.name)(args=task.args, extra_args=extra_args, direction=direction)
+        run_tasks(command, extra_args)
     except CommandNotFoundError:
-        HelpCommand(command)
+        task_to_class('help_command')(command)
     except TaskNotFoundError as e:
-        HelpTask(e.task)
+        task_to_class('help_task')(e.task)
     except NonZeroReturnCodeError as e:
         console.print(
             f'Failed to run [b]{command}[/]:',
@@ -71,6 +96,45 @@ def main(args: dict = args) -> None:
         )
     finally:
         ParentShellHelper.send_queued_commands()
+        write_trace(profile)
+
+
+def write_trace(profile: bool) -> None:
+    filename = os.environ.get('DEV_TRACE')
+    if not filename and not profile:
+        return
+    if not filename:
+        timestamp = time.strftime('%Y%m%d-%H%M%S')
+        filename = f'{environment.cache_path}/traces/{timestamp}-{os.getpid()}.json'
+
+    if profile:
+        error_console.print(TraceHelper.render_summary())
+
+    try:
+        TraceHelper.write(filename)
+    except OSError as e:
+        error_console.print(f'Failed to write trace to {filename}: {e}', style='red')
+        return
+
+    if profile:
+        error_console.print(f'Trace written to {filename}, open it in https://ui.perfetto.dev')
+
+
+def run_tasks(command: str, extra_args: Optional[list]) -> None:
+    started = time.time()
+    start = time.perf_counter()
+    outcome = FAILED
+    try:
+        for direction, tasks in config.resolve_tasks(command, extra_args).items():
+            Engine(tasks, direction=direction, extra_args=extra_args).run()
+        outcome = SUCCEEDED
+    finally:
+        # Navigation and setup commands like dev cd are not worth keeping a history of
+        if command not in internal_registry:
+            RunHistoryHelper.record(
+                COMMAND, command, extra_args, started, TraceHelper.elapsed(start), outcome
+            )
+            RunHistoryHelper.store(command)
 
 
 def warn_when_using_bare(command: str) -> None:
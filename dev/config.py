@@ -1,15 +1,18 @@
+import hashlib
+import os
+import pickle
 import sys
-from typing import Dict, Generator, List, Optional, Tuple, Union
+from typing import Any, Dict, Generator, List, Optional, Tuple, Union
 
-import yaml
 from schema import Optional as SchemaOptional
 from schema import Or, Schema, SchemaError
-from yaml import parser, scanner
 
 from dev import environment
 from dev.console import error_console
 from dev.exceptions import CommandNotFoundError
-from dev.task import InternalTask
+from dev.helpers.files import write_cache_file
+from dev.helpers.trace import TraceHelper
+from dev.tasks.internal import registry as internal_registry
 from dev.version import __version__
 
 # Accepted argument types to tasks, can be nested in list and dict
@@ -80,12 +83,9 @@ class ConfigParser:
 
     def __init__(self, filename: str) -> None:
         try:
-            self.devfile = self.load_devfile(filename)
-            self.tasks = self.load_tasks()
+            with TraceHelper.span(filename, 'config'):
+                self.devfile, self.tasks = self.load(filename)
             environment.set_name(self.devfile.get('name', 'unknown'))
-        except scanner.ScannerError as e:
-            error_console.print(f'Failed to load {filename}: {e}', style='red')
-            sys.exit(1)
         except SchemaError as e:
             fancy_error = ' '.join(e.code.split('\n')[-2:])
             error_console.print(f'Failed to validate {filename}: {fancy_error}', style='red')
@@ -102,22 +102,77 @@ class ConfigParser:
             )
             sys.exit(1)
 
+    def load(self, filename: str) -> Tuple[dict, Dict[str, List[ConfigTask]]]:
+        # Parsing and validating a large Devfile is slow, reuse the result from the last run as
+        # long as the file and dev itself are unchanged.
+        try:
+            stat = os.stat(filename)
+        except FileNotFoundError:
+            return {}, self.load_tasks({})
+
+        path = os.path.abspath(filename)
+        key = (path, stat.st_mtime_ns, stat.st_size, stat.st_ino, __version__)
+        cached = self.read_cache(path, key)
+        TraceHelper.annotate('config', cached=bool(cached))
+        if cached:
+            return cached
+
+        devfile = self.load_devfile(filename)
+        tasks = self.load_tasks(devfile)
+        self.write_cache(path, key, (devfile, tasks))
+        return devfile, tasks
+
+    def cache_filename(self, path: str) -> str:
+        path_hash = hashlib.sha1(path.encode()).hexdigest()
+        return f'{environment.cache_path}/devfiles/{path_hash}'
+
+    def read_cache(
+        self, path: str, key: tuple
+    ) -> Optional[Tuple[dict, Dict[str, List[ConfigTask]]]]:
+        try:
+            with open(self.cache_filename(path), 'rb') as fp:
+                cached_key, data = pickle.load(fp)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+            return None
+        if cached_key != key:
+            return None
+        return data
+
+    def write_cache(self, path: str, key: tuple, data: Any) -> None:
+        write_cache_file(
+            self.cache_filename(path),
+            pickle.dumps((key, data), protocol=pickle.HIGHEST_PROTOCOL),
+        )
+
     def load_devfile(self, filename: str) -> dict:
         try:
-            with open(filename) as file:
-                devfile = yaml.load(file, Loader=yaml.FullLoader)
+            file = open(filename)
+        except FileNotFoundError:
+            return {}
+
+        # Only pay for importing yaml when there is a Devfile to parse
+        import yaml
+        from yaml import parser, scanner
 
-            if not devfile:
-                raise FileNotFoundError
+        # Use the libyaml bindings when available, they are an order of magnitude faster
+        loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
 
-            self.__schema__.validate(devfile)
-            return devfile
+        try:
+            with file:
+                devfile = yaml.load(file, Loader=loader)
         except parser.ParserError as e:
             error_console.print(f'Failed to parse {filename}: {e}', style='red')
             sys.exit(1)
-        except FileNotFoundError:
+        except scanner.ScannerError as e:
+            error_console.print(f'Failed to load {filename}: {e}', style='red')
+            sys.exit(1)
+
+        if not devfile:
             return {}
 
+        self.__schema__.validate(devfile)
+        return devfile
+
     @property
     def custom_command_config(self) -> dict:
         return self.devfile.get('commands', {})
@@ -144,7 +199,7 @@ class ConfigParser:
         if command != 'update':
             self.check_version(self.devfile.get('version', 1))
 
-        if command in InternalTask.tasks():
+        if command in internal_registry:
             # Treat internal tasks as commands: dev update -> dev.tasks.internal.update.
             return {'up': [ConfigTask(command, extra_args)]}
 
@@ -160,14 +215,15 @@ class ConfigParser:
 
         return tasks_to_run
 
-    def load_tasks(self) -> Dict[str, List[ConfigTask]]:
+    def load_tasks(self, devfile: dict) -> Dict[str, List[ConfigTask]]:
         tasks = {}
 
-        for command in self.custom_command_config:
-            tasks[command] = self.parse_commands(self.custom_command_config[command])
+        custom_command_config = devfile.get('commands', {})
+        for command in custom_command_config:
+            tasks[command] = self.parse_commands(custom_command_config[command])
 
         for command in self.reserved_commands:
-            tasks[command] = self.parse_commands(self.devfile.get(command, []))
+            tasks[command] = self.parse_commands(devfile.get(command, []))
 
         return tasks
 
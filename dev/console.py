@@ -1,4 +1,20 @@
-from rich.console import Console
+from typing import Any, Optional
 
-console = Console()
-error_console = Console(stderr=True)
+
+class LazyConsole:
+    # Importing rich.console is one of the more expensive parts of starting dev, defer it until
+    # something is actually printed. Commands like `dev cd foo` never print on success.
+    def __init__(self, **kwargs: Any) -> None:
+        self._kwargs = kwargs
+        self._console: Optional[Any] = None
+
+    def __getattr__(self, name: str) -> Any:
+        if self._console is None:
+            from rich.console import Console
+
+            self._console = Console(**self._kwargs)
+        return getattr(self._console, name)
+
+
+console = LazyConsole()
+error_console = LazyConsole(stderr=True)
@@ -0,0 +1,224 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Set
+
+from dev.config import ConfigTask
+from dev.console import console
+from dev.helpers import prefix_markup, task_context, task_to_class
+from dev.helpers.fingerprint import Fingerprint
+from dev.helpers.hash_cache import HashCacheHelper
+from dev.helpers.homebrew import HomebrewHelper
+from dev.helpers.probe import ProbeHelper
+from dev.helpers.run_history import FAILED, SKIPPED, SUCCEEDED, TASK, RunHistoryHelper
+from dev.helpers.shadowenv import ShadowenvHelper
+from dev.helpers.trace import TraceHelper
+from dev.version import __version__
+
+
+def default_jobs() -> int:
+    return int(os.environ.get('DEV_JOBS', min(4, os.cpu_count() or 1)))
+
+
+class TaskNode:
+    def __init__(
+        self,
+        index: int,
+        task: ConfigTask,
+        depends_on: Set[int],
+        barrier: bool,
+        segment: int = 0,
+        interactive: bool = False,
+    ) -> None:
+        self.index = index
+        self.task = task
+        self.depends_on = depends_on
+        self.barrier = barrier
+        self.interactive = interactive
+        # Barriers end a segment, tasks of a segment run once all earlier segments ran
+        self.segment = segment
+
+    def __repr__(self) -> str:
+        return f'<{self.index} {self.task.name}: {sorted(self.depends_on)}>'
+
+
+class Engine:
+    """Run the tasks of a command, concurrently where their dependencies allow it.
+
+    Dependencies are inferred from __depends_on__ on each task class. A task that runs alone runs
+    in the main thread exactly like a plain loop would, with full terminal access. Tasks running
+    side by side get their command output prefixed with the task name. Interactive tasks, which
+    may prompt for a password, always run alone.
+
+    When tasks fail no new tasks are started, running tasks are allowed to finish and the failure
+    of the task appearing first in the Devfile is raised.
+
+    Tasks implementing fingerprint() are skipped when their inputs are unchanged since their last
+    successful run. Set DEV_FORCE=1 to run everything.
+
+    Homebrew formulae needed by the tasks up to the next barrier are installed with a single
+    `brew install` before the first of them starts, a `run` task can still tap a repository for
+    the tasks after it. The probes of those tasks, like `pyenv root`, run at the same time first.
+    Shadowenv configuration written by the tasks is committed once, after all of them ran.
+    """
+
+    def __init__(
+        self,
+        tasks: List[ConfigTask],
+        direction: str = 'up',
+        extra_args: Optional[Any] = None,
+        jobs: Optional[int] = None,
+    ) -> None:
+        self.direction = direction
+        self.extra_args = extra_args
+        self.jobs = max(1, jobs or default_jobs())
+        self.force = os.environ.get('DEV_FORCE') == '1'
+        self.nodes = self.build_graph(tasks)
+        self.completed: List[TaskNode] = []
+        self.prepared_segments: Set[int] = set()
+
+    def build_graph(self, tasks: List[ConfigTask]) -> List[TaskNode]:
+        nodes: List[TaskNode] = []
+        segment = 0
+
+        for index, task in enumerate(tasks):
+            task_class = task_to_class(task.name)
+            depends_on_names = task_class.__depends_on__
+            if depends_on_names is None:
+                nodes.append(TaskNode(index, task, set(range(index)), True, segment))
+                segment += 1
+                continue
+
+            depends_on = {n.index for n in nodes if n.barrier or n.task.name in depends_on_names}
+            nodes.append(
+                TaskNode(index, task, depends_on, False, segment, task_class.__interactive__)
+            )
+
+        return nodes
+
+    def prepare_segment(self, segment: int) -> None:
+        if segment in self.prepared_segments:
+            return
+        self.prepared_segments.add(segment)
+        formulae: List[str] = []
+        probes: List[Dict[str, Any]] = []
+        for node in self.nodes:
+            if node.segment == segment:
+                task_class = task_to_class(node.task.name)
+                task_class.validate(node.task.args)
+                probes.extend(task_class.probes(node.task.args))
+                if self.direction == 'up':
+                    formulae.extend(task_class.formulae(node.task.args))
+        if formulae:
+            probes.append(HomebrewHelper.PREFIX_PROBE)
+        # Probes of tools a formula is about to install fail here, they run again once installed
+        ProbeHelper.prefetch(probes)
+        if formulae:
+            HomebrewHelper.install_formulae(formulae)
+
+    def run(self) -> None:
+        try:
+            # Shadowenv files written by the tasks are committed together once they all ran
+            with ShadowenvHelper.session():
+                self.run_nodes()
+        finally:
+            self.store_fingerprints()
+
+    def run_nodes(self) -> None:
+        pending = list(self.nodes)
+        running: Dict[Future, TaskNode] = {}
+        done: Set[int] = set()
+        failed: Dict[int, BaseException] = {}
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            while running or (pending and not failed):
+                ready = [] if failed else [n for n in pending if n.depends_on <= done]
+                for node in ready:
+                    # Tasks of a segment only get ready once the earlier segments are done
+                    self.prepare_segment(node.segment)
+
+                interactive = [n for n in ready if n.interactive]
+                if interactive:
+                    # Nothing new starts until the running tasks finished and it ran
+                    ready = [] if running else interactive[:1]
+
+                if not running and (len(ready) == 1 or self.jobs == 1):
+                    node = ready[0]
+                    pending.remove(node)
+                    try:
+                        self.run_node(node)
+                    except BaseException as e:
+                        failed[node.index] = e
+                    else:
+                        done.add(node.index)
+                    continue
+
+                for node in ready[: self.jobs - len(running)]:
+                    pending.remove(node)
+                    running[executor.submit(self.run_node, node, True)] = node
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    node = running.pop(future)
+                    exception = future.exception()
+                    if exception:
+                        failed[node.index] = exception
+                    else:
+                        done.add(node.index)
+
+        if failed:
+            raise failed[min(failed)]
+
+    def run_node(self, node: TaskNode, concurrent: bool = False) -> None:
+        if concurrent:
+            task_context.name = node.task.name
+        started = time.time()
+        start = time.perf_counter()
+        outcome = FAILED
+        try:
+            task_class = task_to_class(node.task.name)
+            with TraceHelper.span(node.task.name, 'fingerprint') as span:
+                key = self.fingerprint_key(node)
+                fingerprint = self.fingerprint(task_class, node)
+                skip = bool(fingerprint) and HashCacheHelper.read_hash(key) == fingerprint
+                span.args['skipped'] = skip
+
+            if skip:
+                console.print(
+                    f'{prefix_markup(task_context.name)}=> Skipping [b]{node.task.name}[/], '
+                    'nothing changed since last run',
+                    style='blue',
+                )
+                task_class.restore(node.task.args, self.extra_args)
+                outcome = SKIPPED
+                return
+
+            task_class(args=node.task.args, extra_args=self.extra_args, direction=self.direction)
+            self.completed.append(node)
+            outcome = SUCCEEDED
+        finally:
+            task_context.name = None
+            name = node.task.name if self.direction == 'up' else f'{node.task.name} (down)'
+            RunHistoryHelper.record(
+                TASK, name, node.task.args, started, TraceHelper.elapsed(start), outcome
+            )
+
+    def store_fingerprints(self) -> None:
+        # Taken after the run, which may have changed the inputs (created files, installed tools)
+        for node in self.completed:
+            fingerprint = self.fingerprint(task_to_class(node.task.name), node)
+            if fingerprint:
+                HashCacheHelper.write_hash(self.fingerprint_key(node), fingerprint)
+
+    def fingerprint_key(self, node: TaskNode) -> str:
+        return Fingerprint(os.getcwd(), node.task.name, node.task.args).hexdigest()
+
+    def fingerprint(self, task_class: Any, node: TaskNode) -> Optional[str]:
+        if self.force or self.direction != 'up':
+            return None
+        # Like formulae(), fingerprint() reads the args and needs them to be valid
+        task_class.validate(node.task.args)
+        fingerprint = task_class.fingerprint(node.task.args, self.extra_args)
+        if fingerprint is None:
+            return None
+        return fingerprint.add(__version__, node.task.args, self.extra_args).hexdigest()
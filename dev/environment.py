@@ -1,8 +1,11 @@
 import os
+import threading
 from typing import Any, Dict
 
 name: str
 env: Dict[Any, Any] = dict(os.environ)
+cache_path: str = os.environ.get('DEV_CACHE_PATH', '/opt/dev/cache')
+lock = threading.Lock()
 
 
 def set_name(new_name: str) -> None:
@@ -24,5 +27,6 @@ def unset_env(env_to_unset: dict) -> None:
 
 def prepend_path(new_path: str) -> None:
     global env
-    old_path = env['PATH']
-    env['PATH'] = f'{new_path}:{old_path}'
+    with lock:
+        old_path = env['PATH']
+        env['PATH'] = f'{new_path}:{old_path}'
@@ -15,3 +15,9 @@ class NonZeroReturnCodeError(Exception):
     def __init__(self, code: int, command: str) -> None:
         self.code = code
         self.command = command
+
+
+class CommandTimeoutError(NonZeroReturnCodeError):
+    def __init__(self, code: int, command: str, timeout: float) -> None:
+        super().__init__(code, command)
+        self.timeout = timeout
@@ -1,17 +1,29 @@
-import io
+import codecs
 import os
 import subprocess
 import sys
+import threading
+import time
 from importlib import import_module
 from pkgutil import iter_modules
-from typing import Callable, List, Optional, Tuple
+from typing import Callable, List, Optional, Pattern, Union
 
 from dev import environment, pty
 from dev.console import console
 from dev.exceptions import NonZeroReturnCodeError, TaskNotFoundError
+from dev.helpers.argv import popen_args, resolve_command
+from dev.helpers.capture import Capture  # noqa: F401
+from dev.helpers.files import atomic_write  # noqa: F401
+from dev.helpers.shell import ShellHelper
+from dev.helpers.trace import TraceHelper
 
 root_path = os.path.dirname(os.path.abspath(__file__ + '/..'))
 
+# Set by the execution engine while a task runs concurrently with others. Commands started from
+# such a task get their output captured and prefixed with the task name instead of taking over
+# the terminal.
+task_context = threading.local()
+
 
 def snake_to_camel(word: str) -> str:
     return ''.join(x.capitalize() or '_' for x in word.split('_'))
@@ -22,20 +34,35 @@ def camel_to_snake(word: str) -> str:
 
 
 def task_to_class(task_name: str) -> Callable:
-    try:
-        if f'dev.tasks.internal.{task_name}' in sys.modules:
-            return getattr(
-                sys.modules[f'dev.tasks.internal.{task_name}'], snake_to_camel(task_name)
-            )
-        return getattr(sys.modules[f'dev.tasks.{task_name}'], snake_to_camel(task_name))
-    except KeyError:
+    from dev.tasks import registry
+    from dev.tasks.internal import registry as internal_registry
+
+    module_path = internal_registry.get(task_name) or registry.get(task_name)
+    if not module_path:
         raise TaskNotFoundError(task_name)
+    module = sys.modules.get(module_path)
+    if module is None:
+        with TraceHelper.span(module_path, 'import'):
+            module = import_module(module_path)
+    return getattr(module, snake_to_camel(task_name))
 
 
 def load_local_taks(directory: str = 'devs') -> None:
+    from dev.tasks import registry
+
     for _, module_name, _ in iter_modules([directory]):
-        sys.path.append(directory)
-        sys.modules.setdefault(f'dev.tasks.{module_name}', import_module(module_name))
+        if directory not in sys.path:
+            sys.path.append(directory)
+        registry.setdefault(module_name, module_name)
+
+
+def import_tasks() -> None:
+    # Listing tasks and commands needs every task class defined, import all registered modules.
+    from dev.tasks import registry
+    from dev.tasks.internal import registry as internal_registry
+
+    for module_path in list(internal_registry.values()) + list(registry.values()):
+        import_module(module_path)
 
 
 def run_command(
@@ -46,78 +73,121 @@ def run_command(
     wrap_sudo_in_shell: bool = True,
     ok_exit_codes: List[int] = [0],
     env: Optional[dict] = None,
+    head: Optional[int] = None,
+    tail: Optional[int] = None,
+    match: Optional[Union[str, Pattern]] = None,
 ) -> Optional[str]:
-    all_env = environment.env
+    """Run a shell command, returning its output when output is True.
+
+    The whole output is returned unless bounded to the first `head` and last `tail` lines, or the
+    first match of `match`. A silent command is terminated as soon as its match is found.
+    """
+    all_env = dict(environment.env)
+    capture = Capture(head=head, tail=tail, match=match) if output else None
 
     if env:
         all_env.update(env)
 
+    task_name = getattr(task_context, 'name', None)
+
     if not silent:
-        console.print(f'=> Running command: {command}', style='blue')
+        console.print(f'{prefix_markup(task_name)}=> Running command: {command}', style='blue')
+
+    with TraceHelper.span(command, 'command', task=task_name, sudo=sudo, silent=silent) as span:
+        if sudo:
+            # sudo may prompt for a password on the terminal
+            return sudo_run(
+                command,
+                capture=capture,
+                wrap_sudo_in_shell=wrap_sudo_in_shell,
+                ok_exit_codes=ok_exit_codes,
+                env=all_env,
+            )
 
-    if sudo or silent:
-        return subprocess_run(
-            command,
-            output=output,
-            sudo=sudo,
-            wrap_sudo_in_shell=wrap_sudo_in_shell,
-            ok_exit_codes=ok_exit_codes,
-            env=all_env,
-        )
+        if silent or task_name:
+            # Imported here, asyncio is only needed once such a command runs
+            from dev.helpers.async_command import run_command_sync
+
+            return run_command_sync(
+                command, span, capture, silent, task_name, all_env, ok_exit_codes
+            )
+
+        return pty_spawn(command, capture=capture, ok_exit_codes=ok_exit_codes, env=all_env)
 
-    return pty_spawn(command, output=output, ok_exit_codes=ok_exit_codes, env=all_env)
 
+def prefix_markup(task_name: Optional[str]) -> str:
+    return f'\\[{task_name}] ' if task_name else ''
 
-def subprocess_run(
+
+def sudo_run(
     command: str,
-    output: bool = False,
-    sudo: bool = False,
+    capture: Optional[Capture] = None,
     wrap_sudo_in_shell: bool = True,
     ok_exit_codes: List[int] = [0],
     env: Optional[dict] = None,
 ) -> Optional[str]:
-    if sudo:
-        command = command.replace('"', '\\"')
-        if wrap_sudo_in_shell:
-            command = f'sudo bash -c "{command}"'
-        else:
-            command = f'sudo {command}'
-    completed_process = subprocess.run(command, capture_output=True, shell=True, env=env)
-    exit_code = completed_process.returncode
+    command = command.replace('"', '\\"')
+    if wrap_sudo_in_shell:
+        command = f'sudo bash -c "{command}"'
+    else:
+        command = f'sudo {command}'
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        **popen_args(command, env), stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env
+    )
+    TraceHelper.annotate('command', spawn_ms=TraceHelper.elapsed(start))
+    stdout, stderr = process.communicate()
+    exit_code = process.returncode
+    TraceHelper.annotate('command', exit_code=exit_code, output_bytes=len(stdout) + len(stderr))
     if exit_code not in ok_exit_codes:
         raise NonZeroReturnCodeError(exit_code, command)
-    if output:
-        return completed_process.stdout.decode().strip()
+    if capture:
+        capture.write(stdout.decode(errors='replace'))
+        capture.close()
+        return capture.value
     return None
 
 
 def pty_spawn(
     command: str,
-    output: bool = False,
+    capture: Optional[Capture] = None,
     ok_exit_codes: List[int] = [0],
     env: Optional[dict] = None,
 ) -> Optional[str]:
-    pty_output = io.StringIO()
-    argv: Tuple[str, ...] = ('bash', '-c', command)
+    # Multibyte characters may be split across reads, decode incrementally
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    argv, executable = resolve_command(command, env)
+    output_bytes = 0
 
     def read_pty(fd: int) -> bytes:
-        data = os.read(fd, 1024)
-        if output is True:
-            pty_output.write(data.decode())
+        nonlocal output_bytes
+        data = pty._read(fd)
+        output_bytes += len(data)
+        if capture:
+            capture.write(decoder.decode(data, final=not data))
         return data
 
-    status = pty.spawn(argv, master_read=read_pty, env=env)
+    start = time.perf_counter()
+
+    def executed() -> None:
+        TraceHelper.annotate('command', spawn_ms=TraceHelper.elapsed(start))
+
+    status = pty.spawn(
+        tuple(argv), master_read=read_pty, env=env, executed=executed, executable=executable
+    )
     exit_code = pty.waitstatus_to_exitcode(status)
+    TraceHelper.annotate('command', exit_code=exit_code, output_bytes=output_bytes)
 
     if exit_code not in ok_exit_codes:
         raise NonZeroReturnCodeError(exit_code, command)
 
-    if output:
-        pty_output.seek(0)
-        return pty_output.read().strip()
+    if capture:
+        capture.write(decoder.decode(b'', final=True))
+        capture.close()
+        return capture.value
 
     return None
 
 
 def current_shell() -> Optional[str]:
-    return run_command("ps | cut -d '-' -f 2 | head -2 | tail -1", output=True)
+    return ShellHelper.current()
@@ -0,0 +1,86 @@
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Characters asking bash for more than splitting words: pipes, redirections, expansions, globs,
+# escapes, comments and command lists. Quotes are fine, shlex removes them like bash does.
+SHELL_METACHARACTERS = frozenset('|&;<>()$`\\*?[]{}~#!\n')
+
+# Keywords and builtins of bash, some exist as binaries too (/usr/bin/time, /usr/bin/cd on macOS)
+# which do not behave the same
+SHELL_WORDS = frozenset(
+    'alias bg builtin case cd command coproc declare eval exec exit export fg for function hash '
+    'if jobs let local popd pushd read readonly select set shopt source time trap type ulimit '
+    'umask unalias unset until wait while'.split()
+)
+
+bash_paths: Dict[Optional[str], Optional[str]] = {}
+
+
+def resolve_command(
+    command: str, env: Optional[dict] = None
+) -> Tuple[Sequence[str], Optional[str]]:
+    """Returns the argv running command and the path of the executable it starts.
+
+    Commands simple enough are executed directly. Commands using shell syntax, starting with
+    variable assignments or naming a shell builtin or function rather than an executable on PATH
+    are run by bash.
+    """
+    path = (env if env is not None else os.environ).get('PATH')
+    argv = simple_argv(command)
+    if argv:
+        # Imported here, commands run through the shell never need it
+        import shutil
+
+        executable = shutil.which(argv[0], path=path)
+        if executable:
+            return argv, os.path.abspath(executable)
+    return ('bash', '-c', command), which_bash(path)
+
+
+def simple_argv(command: str) -> Optional[List[str]]:
+    if SHELL_METACHARACTERS.intersection(command):
+        return None
+
+    import shlex
+
+    try:
+        argv = shlex.split(command)
+    except ValueError:
+        # Unbalanced quotes, let bash report it
+        return None
+    if not argv or '=' in argv[0] or argv[0] in SHELL_WORDS:
+        return None
+    return argv
+
+
+def which_bash(path: Optional[str]) -> Optional[str]:
+    # Looked up for every command using shell syntax, bash does not move while dev runs
+    if path not in bash_paths:
+        import shutil
+
+        executable = shutil.which('bash', path=path)
+        bash_paths[path] = executable and os.path.abspath(executable)
+    return bash_paths[path]
+
+
+def split_command(command: str, env: Optional[dict] = None) -> Optional[Sequence[str]]:
+    """Returns the argv of a command simple enough to be executed without a shell, else None."""
+    argv, _ = resolve_command(command, env)
+    return None if argv[:2] == ('bash', '-c') else argv
+
+
+def command_argv(command: str, env: Optional[dict] = None) -> Sequence[str]:
+    """Returns the argv running command, executing it directly when it needs no shell."""
+    argv, _ = resolve_command(command, env)
+    return argv
+
+
+def popen_args(command: str, env: Optional[dict] = None) -> Dict[str, Any]:
+    """Returns the arguments of subprocess.Popen running command.
+
+    Naming the executable by its path and leaving descriptors to close-on-exec lets subprocess
+    start the child with posix_spawn rather than forking the interpreter.
+    """
+    argv, executable = resolve_command(command, env)
+    # Descriptors opened by Python are not inheritable, only standard streams are passed on
+    return dict(args=argv, executable=executable, close_fds=False)
@@ -0,0 +1,202 @@
+import asyncio
+import codecs
+import os
+import signal
+import subprocess
+import time
+import weakref
+from typing import Any, List, Optional, Pattern, Tuple, Union
+
+from dev import environment
+from dev.console import console
+from dev.exceptions import CommandTimeoutError, NonZeroReturnCodeError
+from dev.helpers import prefix_markup, task_context
+from dev.helpers.argv import popen_args
+from dev.helpers.capture import Capture
+from dev.helpers.trace import Span, TraceHelper
+
+# Commands run_command_async runs at the same time in one event loop, the others wait their turn
+MAX_CONCURRENT_COMMANDS = int(os.environ.get('DEV_COMMAND_JOBS', 8))
+
+READ_SIZE = 64 * 1024
+
+semaphores: 'weakref.WeakKeyDictionary[Any, asyncio.Semaphore]' = weakref.WeakKeyDictionary()
+
+
+def semaphore() -> asyncio.Semaphore:
+    # asyncio primitives belong to the loop they were first used in
+    loop = asyncio.get_running_loop()
+    if loop not in semaphores:
+        semaphores[loop] = asyncio.Semaphore(MAX_CONCURRENT_COMMANDS)
+    return semaphores[loop]
+
+
+def limit_concurrent_commands(jobs: int) -> None:
+    """Run at most jobs commands at once in the running event loop, before any was started."""
+    semaphores[asyncio.get_running_loop()] = asyncio.Semaphore(max(1, jobs))
+
+
+async def run_command_async(
+    command: str,
+    output: bool = False,
+    silent: bool = False,
+    ok_exit_codes: List[int] = [0],
+    env: Optional[dict] = None,
+    head: Optional[int] = None,
+    tail: Optional[int] = None,
+    match: Optional[Union[str, Pattern]] = None,
+    timeout: Optional[float] = None,
+    capture: Optional[Capture] = None,
+) -> Optional[str]:
+    """Run a shell command without blocking the event loop, see run_command.
+
+    Output can be fed to a capture of the caller instead of head, tail and match, which still
+    holds the output when the command fails.
+
+    Independent commands overlap with asyncio.gather(), at most MAX_CONCURRENT_COMMANDS of them
+    run at once. A command that outlives `timeout` seconds, or whose caller is cancelled, is
+    killed together with the processes it started. Output of commands that are not silent is
+    printed line by line, prefixed with the task name when running concurrently with others.
+
+    Commands needing the terminal, like sudo prompting for a password, should use run_command.
+    """
+    all_env = dict(environment.env)
+    if capture is None and output:
+        capture = Capture(head=head, tail=tail, match=match)
+
+    if env:
+        all_env.update(env)
+
+    task_name = getattr(task_context, 'name', None)
+
+    if not silent:
+        console.print(f'{prefix_markup(task_name)}=> Running command: {command}', style='blue')
+
+    async with semaphore():
+        span = TraceHelper.start(command, 'command', task=task_name, silent=silent)
+        try:
+            return await spawn(
+                command, span, capture, silent, task_name, all_env, timeout, ok_exit_codes
+            )
+        except BaseException as e:
+            span.args.setdefault('error', type(e).__name__)
+            raise
+        finally:
+            TraceHelper.finish(span)
+
+
+def run_command_sync(
+    command: str,
+    span: Span,
+    capture: Optional[Capture],
+    silent: bool,
+    task_name: Optional[str],
+    env: dict,
+    ok_exit_codes: List[int],
+) -> Optional[str]:
+    """Run a command from synchronous code, in an event loop of its own. Used by run_command for
+    commands that do not need the terminal."""
+    return asyncio.run(spawn(command, span, capture, silent, task_name, env, None, ok_exit_codes))
+
+
+async def spawn(
+    command: str,
+    span: Span,
+    capture: Optional[Capture],
+    silent: bool,
+    task_name: Optional[str],
+    env: dict,
+    timeout: Optional[float],
+    ok_exit_codes: List[int],
+) -> Optional[str]:
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    # Started by subprocess rather than asyncio, which needs a child watcher attached to the main
+    # thread on Python 3.7. A new session lets a timeout or cancellation kill everything the
+    # command started.
+    process = subprocess.Popen(
+        **popen_args(command, env),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL if silent else subprocess.STDOUT,
+        env=env,
+        start_new_session=True,
+    )
+    span.args['spawn_ms'] = TraceHelper.elapsed(start)
+
+    reader = asyncio.StreamReader(limit=READ_SIZE)
+    transport, _ = await loop.connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(reader), process.stdout
+    )
+
+    async def finish() -> Tuple[bool, int]:
+        finished = await read(reader, span, capture, silent, task_name)
+        if not finished:
+            # The match was found, the rest of the output is not needed
+            await kill(process, signal.SIGTERM)
+        # The timeout covers the wait too, a command may close its output and keep running
+        return finished, await wait(process)
+
+    try:
+        finished, exit_code = await asyncio.wait_for(finish(), timeout)
+    except asyncio.TimeoutError:
+        await kill(process, signal.SIGKILL)
+        raise CommandTimeoutError(process.returncode or -signal.SIGKILL, command, timeout or 0)
+    except BaseException:
+        await kill(process, signal.SIGKILL)
+        raise
+    finally:
+        transport.close()
+    span.args['exit_code'] = exit_code
+
+    if finished and exit_code not in ok_exit_codes:
+        raise NonZeroReturnCodeError(exit_code, command)
+
+    return capture.value if capture else None
+
+
+async def read(
+    reader: asyncio.StreamReader,
+    span: Span,
+    capture: Optional[Capture],
+    silent: bool,
+    task_name: Optional[str],
+) -> bool:
+    """Read the output of a command to the end, returns False when stopped early by a match."""
+    # Multibyte characters may be split across reads, decode incrementally
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    prefix = f'[{task_name}] ' if task_name else ''
+    partial = ''
+    output_bytes = 0
+    try:
+        while True:
+            data = await reader.read(READ_SIZE)
+            output_bytes += len(data)
+            lines = (partial + decoder.decode(data, final=not data)).split('\n')
+            partial = lines.pop()
+            if not data and partial:
+                lines.append(partial)
+            for line in lines:
+                line = line.rstrip('\r')
+                if not silent:
+                    console.print(f'{prefix}{line}', markup=False, highlight=False)
+                if capture and capture.feed(line):
+                    return False
+            if not data:
+                return True
+    finally:
+        span.args['output_bytes'] = output_bytes
+
+
+async def wait(process: subprocess.Popen) -> int:
+    # A thread per waiting command, like the child watcher of asyncio since Python 3.8
+    return await asyncio.get_running_loop().run_in_executor(None, process.wait)
+
+
+async def kill(process: subprocess.Popen, signum: int) -> None:
+    if process.poll() is None:
+        try:
+            os.killpg(process.pid, signum)
+        except ProcessLookupError:
+            ...
+    await wait(process)
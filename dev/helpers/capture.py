@@ -0,0 +1,70 @@
+import re
+from collections import deque
+from typing import Deque, List, Optional, Pattern, Union
+
+
+class Capture:
+    """Keeps the output of a command, or a bounded view of it.
+
+    Without head and tail all of the output is kept, callers may parse it (e.g. JSON). Otherwise
+    the first `head` lines and the last `tail` lines are kept, lines in between are only counted.
+    With `match` set the value is the first match of the pattern and capture is done as soon as it
+    is found, letting the caller stop reading and terminate the command.
+    """
+
+    def __init__(
+        self,
+        head: Optional[int] = None,
+        tail: Optional[int] = None,
+        match: Optional[Union[str, Pattern]] = None,
+    ) -> None:
+        self.head: List[str] = []
+        self.head_size = head or 0
+        self.tail: Deque[str] = deque(maxlen=None if head is None and tail is None else tail or 0)
+        self.pattern = re.compile(match) if isinstance(match, str) else match
+        self.matched: Optional[str] = None
+        self.dropped = 0
+        self.partial = ''
+
+    @property
+    def done(self) -> bool:
+        return self.matched is not None
+
+    def feed(self, line: str) -> bool:
+        """Add one line of output, returns True once nothing more needs to be read."""
+        if self.pattern is not None:
+            if self.matched is None:
+                found = self.pattern.search(line)
+                if found:
+                    self.matched = found.group(0)
+            return self.done
+
+        if len(self.head) < self.head_size:
+            self.head.append(line)
+        elif self.tail.maxlen != 0:
+            if len(self.tail) == self.tail.maxlen:
+                self.dropped += 1
+            self.tail.append(line)
+        else:
+            self.dropped += 1
+        return False
+
+    def write(self, text: str) -> bool:
+        """Add a chunk of output which may end in the middle of a line."""
+        lines = (self.partial + text).split('\n')
+        self.partial = lines.pop()
+        for line in lines:
+            if self.feed(line.rstrip('\r')):
+                return True
+        return False
+
+    def close(self) -> None:
+        if self.partial:
+            self.feed(self.partial.rstrip('\r'))
+            self.partial = ''
+
+    @property
+    def value(self) -> str:
+        if self.pattern is not None:
+            return self.matched or ''
+        return '\n'.join(self.head + list(self.tail)).strip()
@@ -0,0 +1,33 @@
+import os
+import threading
+from typing import Union
+
+
+def atomic_write(filename: str, data: Union[str, bytes]) -> None:
+    """Replace the content of filename, readers see the previous or the new content in full.
+
+    The data is written to a temporary file next to filename and moved over it, the temporary
+    file is removed when writing fails.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+    # Unique per thread, tasks running concurrently may write the same file
+    tmp_filename = f'{filename}.{os.getpid()}.{threading.get_ident()}'
+    try:
+        with open(tmp_filename, 'wb' if isinstance(data, bytes) else 'w') as fp:
+            fp.write(data)
+        os.replace(tmp_filename, filename)
+    except BaseException:
+        try:
+            os.unlink(tmp_filename)
+        except OSError:
+            ...
+        raise
+
+
+def write_cache_file(filename: str, data: Union[str, bytes]) -> None:
+    """Like atomic_write, for caches: a cache that can not be written is not an error."""
+    try:
+        atomic_write(filename, data)
+    except OSError:
+        # The cache is an optimization, never fail a command because it can not be written
+        ...
@@ -0,0 +1,46 @@
+import hashlib
+import json
+import os
+import shutil
+from typing import Any, List, Optional
+
+from dev import environment
+
+
+class Fingerprint:
+    """Describes the inputs of a task run: arguments, files it reads and tools it uses.
+
+    Files and tools are fingerprinted on their stat result rather than their content, this keeps
+    checking an unchanged task at a handful of syscalls.
+    """
+
+    def __init__(self, *values: Any) -> None:
+        self.inputs: List[str] = []
+        self.add(*values)
+
+    def add(self, *values: Any) -> 'Fingerprint':
+        for value in values:
+            self.inputs.append(json.dumps(value, sort_keys=True, default=str))
+        return self
+
+    def add_file(self, filename: Optional[str]) -> 'Fingerprint':
+        if not filename:
+            return self
+        path = os.path.abspath(filename)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self.inputs.append(f'{path}:missing')
+        else:
+            self.inputs.append(f'{path}:{stat.st_ino}:{stat.st_size}:{stat.st_mtime_ns}')
+        return self
+
+    def add_tool(self, name: str) -> 'Fingerprint':
+        path = shutil.which(name, path=environment.env.get('PATH'))
+        if not path:
+            self.inputs.append(f'{name}:missing')
+            return self
+        return self.add_file(os.path.realpath(path))
+
+    def hexdigest(self) -> str:
+        return hashlib.sha1('\0'.join(self.inputs).encode()).hexdigest()
@@ -0,0 +1,61 @@
+import json
+import math
+import time
+from typing import Dict, List, Optional
+
+from dev import environment
+from dev.helpers.files import write_cache_file
+
+# Multipliers of the selection count by time since the last selection, in seconds
+RECENCY_WEIGHTS = ((60 * 60, 4.0), (24 * 60 * 60, 2.0), (7 * 24 * 60 * 60, 1.0))
+OLD_WEIGHT = 0.25
+
+# Highest boost a frequently selected candidate gets, it never outranks a much better match
+MAX_BOOST = 30.0
+
+# Entries kept, the least frecent ones are dropped beyond that
+MAX_ENTRIES = 1000
+
+
+class Frecency:
+    """Remembers how often and how recently keys, like repository paths, were selected."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.entries: Dict[str, List[float]] = self.read_cache()
+
+    def cache_filename(self) -> str:
+        return f'{environment.cache_path}/frecency/{self.name}.json'
+
+    def read_cache(self) -> Dict[str, List[float]]:
+        try:
+            with open(self.cache_filename()) as fp:
+                return json.load(fp)
+        except (OSError, ValueError):
+            return {}
+
+    def write_cache(self) -> None:
+        write_cache_file(self.cache_filename(), json.dumps(self.entries))
+
+    def score(self, key: str, now: Optional[float] = None) -> float:
+        entry = self.entries.get(key)
+        if not entry:
+            return 0.0
+        count, last_selected = entry
+        age = (now or time.time()) - last_selected
+        weight = next((w for max_age, w in RECENCY_WEIGHTS if age < max_age), OLD_WEIGHT)
+        return count * weight
+
+    def boost(self, key: str, now: Optional[float] = None) -> float:
+        return min(MAX_BOOST, 10.0 * math.log2(1.0 + self.score(key, now)))
+
+    def record(self, key: str) -> None:
+        now = time.time()
+        count = self.entries.get(key, [0, now])[0]
+        self.entries[key] = [count + 1, now]
+
+        if len(self.entries) > MAX_ENTRIES:
+            ranked = sorted(self.entries, key=lambda k: self.score(k, now), reverse=True)
+            self.entries = {k: self.entries[k] for k in ranked[:MAX_ENTRIES]}
+
+        self.write_cache()
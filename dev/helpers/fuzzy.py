@@ -0,0 +1,149 @@
+import re
+from typing import Callable, List, Optional, Sequence, Tuple
+
+# Score of a query matching a field, depending on how it matches. Typing the full name of a
+# repository should take you there, an exact match outweighs any other kind by far.
+EXACT = 200.0
+PREFIX = 80.0
+WORD_PREFIX = 70.0
+SUBSTRING = 60.0
+SUBSEQUENCE = 40.0
+
+# Weight of a match on each field of a candidate (repository, organization, host)
+FIELD_WEIGHTS = (1.0, 0.6, 0.3)
+
+# The best candidate is picked without asking when it scores this much higher than the next one
+CLEAR_WINNER_RATIO = 1.5
+
+word_separators = '-_./'
+
+
+def subsequence_pattern(query: str) -> re.Pattern:
+    # Each gap excludes the character that ends it, so matching never backtracks. Gaps never span
+    # a tab or newline, which separate fields and candidates. An empty query matches anything.
+    if not query:
+        return re.compile('')
+    parts = [re.escape(query[0])]
+    for character in query[1:]:
+        parts.append(f'[^{re.escape(character)}\t\n]*{re.escape(character)}')
+    return re.compile(''.join(parts))
+
+
+def field_score(query: str, pattern: re.Pattern, field: str) -> float:
+    if not field:
+        return 0.0
+    if field == query:
+        return EXACT
+
+    position = field.find(query)
+    if position == 0:
+        return PREFIX
+    if len(query) == 1:
+        # A single character is too common to match anywhere but at the start
+        return 0.0
+    if position > 0:
+        if field[position - 1] in word_separators:
+            return WORD_PREFIX
+        return SUBSTRING - min(position, 10)
+
+    match = pattern.search(field)
+    if not match:
+        return 0.0
+    # Compact matches rank higher, `abc` in `a-b-c` before `a-xx-b-xx-c`
+    return SUBSEQUENCE * len(query) / (match.end() - match.start())
+
+
+class Matcher:
+    """Scores candidates made of a repository, organization and host against a query.
+
+    Characters of the query have to appear in order in a field, exact, prefix and substring matches
+    score higher than scattered ones. A query containing a slash (`org/repo`) matches its last part
+    against the repository and its first part against the organization or host. Missing
+    organizations and hosts are given as empty strings.
+    """
+
+    def __init__(self, query: str) -> None:
+        scope, _, query = query.lower().rpartition('/')
+        if not query:
+            # `org/` lists the repositories of an organization
+            query, scope = scope, ''
+        self.query = query
+        self.scope = scope
+        self.pattern = subsequence_pattern(query)
+        self.scope_pattern = subsequence_pattern(scope) if scope else None
+
+        if not query:
+            # `dev cd ""` and `dev cd /` list every repository, one match per candidate
+            self.search_patterns = [re.compile('\n')]
+        elif len(query) == 1:
+            # Literal patterns are searched much faster than one starting with a character class
+            self.search_patterns = [
+                re.compile(f'{separator}{re.escape(query)}') for separator in '\t\n'
+            ]
+        else:
+            self.search_patterns = [self.pattern]
+
+    def score(self, candidate: Sequence[str]) -> float:
+        repository, organization, host = (field.lower() for field in candidate)
+        return self.score_fields(repository, organization, host)
+
+    def score_fields(self, repository: str, organization: str, host: str) -> float:
+        if self.scope_pattern is not None:
+            repository_score = field_score(self.query, self.pattern, repository)
+            scope_score = max(
+                field_score(self.scope, self.scope_pattern, organization) * FIELD_WEIGHTS[1],
+                field_score(self.scope, self.scope_pattern, host) * FIELD_WEIGHTS[2],
+            )
+            if not repository_score or not scope_score:
+                return 0.0
+            return repository_score + scope_score
+
+        return max(
+            field_score(self.query, self.pattern, repository) * FIELD_WEIGHTS[0],
+            field_score(self.query, self.pattern, organization) * FIELD_WEIGHTS[1],
+            field_score(self.query, self.pattern, host) * FIELD_WEIGHTS[2],
+        )
+
+    def rank(
+        self,
+        candidates: Sequence[Sequence[str]],
+        boost: Optional[Callable[[int], float]] = None,
+    ) -> List[Tuple[float, int]]:
+        """Returns (score, index) of the matching candidates, best first.
+
+        boost(index), e.g. the frecency of past selections, is added to the score of matching
+        candidates. Equal scores keep the order of the candidates.
+        """
+        # All candidates in one text, one per line, searched by the regex engine in a single pass.
+        # Only candidates it finds are scored in Python.
+        text = '\n' + '\n'.join(map('\t'.join, candidates)).lower()
+        lines = text.split('\n')
+        starts = sorted(m.start() for p in self.search_patterns for m in p.finditer(text))
+
+        ranked = []
+        line = 0
+        previous = 0
+        position = 0
+        for start in starts:
+            # Line 0 is the empty line before the first candidate
+            line += text.count('\n', position, start + 1)
+            position = start + 1
+            if line == previous:
+                continue
+            previous = line
+
+            score = self.score_fields(*lines[line].split('\t'))
+            if not score:
+                continue
+            if boost:
+                score += boost(line - 1)
+            ranked.append((-score, line - 1))
+
+        ranked.sort()
+        return [(-score, index) for score, index in ranked]
+
+
+def clear_winner(ranked: List[Tuple[float, int]]) -> bool:
+    return len(ranked) == 1 or (
+        len(ranked) > 1 and ranked[0][0] >= ranked[1][0] * CLEAR_WINNER_RATIO
+    )
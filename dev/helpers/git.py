@@ -1,7 +1,10 @@
+import os
 import re
-from typing import Optional, Tuple
+import threading
+from typing import Dict, List, Optional, Tuple
 
 from dev.helpers import run_command
+from dev.helpers.git_metadata import GitMetadata, UnsupportedLayout, parse_config
 
 git_url_pattern = re.compile(r'git@(?P<host>.+):(?P<organization>.+)\/(?P<repository>.+)\.git')
 http_url_pattern = re.compile(
@@ -10,26 +13,107 @@ http_url_pattern = re.compile(
 
 
 class GitHelper:
+    """Reads repository metadata from the files in .git, falling back to git for layouts the
+    reader does not support. Metadata is read once per repository and process.
+    """
+
+    lock = threading.RLock()
+    repositories: Dict[str, Optional[GitMetadata]] = {}
+
+    @staticmethod
+    def metadata() -> Optional[GitMetadata]:
+        """Returns the metadata of the repository in the working directory, None when git has to
+        be asked instead."""
+        if 'GIT_DIR' in os.environ or 'GIT_CONFIG' in os.environ:
+            return None
+
+        cwd = os.getcwd()
+        with GitHelper.lock:
+            if cwd not in GitHelper.repositories:
+                try:
+                    GitHelper.repositories[cwd] = GitMetadata(cwd)
+                except (UnsupportedLayout, OSError):
+                    GitHelper.repositories[cwd] = None
+            return GitHelper.repositories[cwd]
+
     @staticmethod
     def setup_config() -> str:
+        if 'https://github.com/' in GitHelper.global_config('url.git@github.com:.insteadof'):
+            # Already set up, spare the write to the global config
+            return ''
+
         output = run_command(
             'git config --global url."git@github.com:".insteadOf "https://github.com/"',
             output=True,
             silent=True,
+            head=1,
         )
         assert output is not None
         return output
 
+    @staticmethod
+    def global_config(name: str) -> List[str]:
+        """Returns the values of name in the global config files, empty when they can not be
+        read without git."""
+        xdg_config_home = os.environ.get('XDG_CONFIG_HOME') or os.path.expanduser('~/.config')
+        values: List[str] = []
+        for filename in [f'{xdg_config_home}/git/config', os.path.expanduser('~/.gitconfig')]:
+            try:
+                values.extend(parse_config(filename).get(name, []))
+            except FileNotFoundError:
+                continue
+            except (UnsupportedLayout, OSError):
+                return []
+        return values
+
     @staticmethod
     def current_branch() -> str:
-        output = run_command('git branch --show-current', output=True, silent=True)
+        metadata = GitHelper.metadata()
+        if metadata:
+            try:
+                return metadata.current_branch()
+            except (UnsupportedLayout, OSError):
+                ...
+
+        output = run_command('git branch --show-current', output=True, silent=True, head=1)
         assert output is not None
         return output
 
     @staticmethod
     def remote_origin_url() -> str:
+        metadata = GitHelper.metadata()
+        if metadata:
+            try:
+                url = metadata.get('remote.origin.url')
+            except (UnsupportedLayout, OSError):
+                url = None
+            # Without it in the repository config, git also looks in the global ones
+            if url is not None:
+                return url
+
+        output = run_command(
+            'git config --get remote.origin.url',
+            output=True,
+            silent=True,
+            ok_exit_codes=[0, 1],
+            head=1,
+        )
+        assert output is not None
+        return output
+
+    @staticmethod
+    def head_commit() -> str:
+        metadata = GitHelper.metadata()
+        if metadata:
+            try:
+                commit = metadata.resolve('HEAD')
+            except (UnsupportedLayout, OSError):
+                commit = None
+            if commit:
+                return commit
+
         output = run_command(
-            'git config --get remote.origin.url', output=True, silent=True, ok_exit_codes=[0, 1]
+            'git rev-parse HEAD', output=True, silent=True, ok_exit_codes=[0, 128], head=1
         )
         assert output is not None
         return output
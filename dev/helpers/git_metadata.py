@@ -0,0 +1,207 @@
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+section_pattern = re.compile(r'^\[\s*([\w.-]+)(?:\s+"((?:[^"\\]|\\.)*)")?\s*\]\s*(.*)$')
+key_pattern = re.compile(r'^([A-Za-z][\w-]*)\s*(?:=\s*(.*))?$')
+
+
+class UnsupportedLayout(Exception):
+    """The repository uses a layout or feature only git itself knows how to read."""
+
+
+def parse_value(value: str) -> str:
+    # Values may be quoted in parts, escape \\, \", \n and \t, and end with a comment
+    result = []
+    quoted = False
+    index = 0
+    while index < len(value):
+        character = value[index]
+        if character == '\\':
+            index += 1
+            if index >= len(value):
+                raise UnsupportedLayout('line continuation')
+            escaped = value[index]
+            result.append({'n': '\n', 't': '\t', 'b': '\b'}.get(escaped, escaped))
+        elif character == '"':
+            quoted = not quoted
+        elif character in '#;' and not quoted:
+            break
+        else:
+            result.append(character)
+        index += 1
+    if quoted:
+        raise UnsupportedLayout('unterminated quote')
+    return ''.join(result).strip()
+
+
+def parse_config(filename: str, depth: int = 0) -> Dict[str, List[str]]:
+    """Parse a git config file into lowercase `section.subsection.key` names and their values.
+
+    include.path directives are followed, conditional includes are left to git.
+    """
+    if depth > 10:
+        raise UnsupportedLayout('include depth')
+
+    values: Dict[str, List[str]] = {}
+    section = ''
+    with open(filename) as fp:
+        for raw_line in fp:
+            line = raw_line.strip()
+            if not line or line[0] in '#;':
+                continue
+
+            if line.startswith('['):
+                match = section_pattern.match(line)
+                if not match:
+                    raise UnsupportedLayout(f'section {line}')
+                name, subsection, rest = match.groups()
+                if name.lower().startswith('includeif'):
+                    raise UnsupportedLayout('conditional include')
+                section = name.lower()
+                if subsection is not None:
+                    section += '.' + re.sub(r'\\(.)', r'\1', subsection)
+                line = rest.strip()
+                if not line or line[0] in '#;':
+                    continue
+
+            match = key_pattern.match(line)
+            if not match or not section:
+                raise UnsupportedLayout(f'line {line}')
+            key, value = match.groups()
+            name = f'{section}.{key.lower()}'
+            value = 'true' if value is None else parse_value(value)
+            values.setdefault(name, []).append(value)
+
+            if name == 'include.path':
+                path = os.path.expanduser(value)
+                if not os.path.isabs(path):
+                    path = os.path.join(os.path.dirname(filename), path)
+                if os.path.isfile(path):
+                    for included_name, included in parse_config(path, depth + 1).items():
+                        values.setdefault(included_name, []).extend(included)
+
+    return values
+
+
+def find_git_dir(path: str) -> Tuple[str, str]:
+    """Returns the git directory and the common directory of the repository containing path.
+
+    They differ for worktrees, whose .git is a file pointing to their own directory inside the
+    main repository, which holds the config and shared refs.
+    """
+    path = os.path.abspath(path)
+    while True:
+        candidate = os.path.join(path, '.git')
+        if os.path.isdir(candidate):
+            git_dir = candidate
+            break
+        if os.path.isfile(candidate):
+            with open(candidate) as fp:
+                content = fp.read().strip()
+            if not content.startswith('gitdir:'):
+                raise UnsupportedLayout(f'{candidate} is not a gitdir file')
+            git_dir = os.path.join(path, content[len('gitdir:') :].strip())
+            break
+        parent = os.path.dirname(path)
+        if parent == path:
+            raise UnsupportedLayout('not in a repository')
+        path = parent
+
+    common_dir = git_dir
+    commondir_filename = os.path.join(git_dir, 'commondir')
+    if os.path.isfile(commondir_filename):
+        with open(commondir_filename) as fp:
+            common_dir = os.path.join(git_dir, fp.read().strip())
+
+    return os.path.normpath(git_dir), os.path.normpath(common_dir)
+
+
+class GitMetadata:
+    """Reads HEAD, config and refs of a repository from its files without running git.
+
+    Raises UnsupportedLayout for anything it does not understand (reftable, conditional includes,
+    unusual syntax), callers then ask git. Everything read is kept for the lifetime of the
+    instance.
+    """
+
+    def __init__(self, path: str = '.') -> None:
+        self.git_dir, self.common_dir = find_git_dir(path)
+        if os.path.isdir(os.path.join(self.common_dir, 'reftable')):
+            raise UnsupportedLayout('reftable')
+        self._config: Optional[Dict[str, List[str]]] = None
+        self._packed_refs: Optional[Dict[str, str]] = None
+        self._head: Optional[str] = None
+
+    @property
+    def config(self) -> Dict[str, List[str]]:
+        if self._config is None:
+            self._config = parse_config(os.path.join(self.common_dir, 'config'))
+            worktree_config = os.path.join(self.git_dir, 'config.worktree')
+            if self.git_dir != self.common_dir and os.path.isfile(worktree_config):
+                for name, values in parse_config(worktree_config).items():
+                    self._config.setdefault(name, []).extend(values)
+        return self._config
+
+    def get(self, name: str) -> Optional[str]:
+        # Like `git config --get`, the last value wins
+        values = self.config.get(name.lower())
+        return values[-1] if values else None
+
+    @property
+    def head(self) -> str:
+        if self._head is None:
+            with open(os.path.join(self.git_dir, 'HEAD')) as fp:
+                self._head = fp.read().strip()
+        return self._head
+
+    def current_branch(self) -> str:
+        # Empty when HEAD is detached, like `git branch --show-current`
+        if self.head.startswith('ref: refs/heads/'):
+            return self.head[len('ref: refs/heads/') :]
+        if self.head.startswith('ref: '):
+            raise UnsupportedLayout(f'HEAD points to {self.head}')
+        return ''
+
+    @property
+    def packed_refs(self) -> Dict[str, str]:
+        if self._packed_refs is None:
+            self._packed_refs = {}
+            try:
+                with open(os.path.join(self.common_dir, 'packed-refs')) as fp:
+                    for line in fp:
+                        if line.startswith(('#', '^')):
+                            continue
+                        sha, _, ref = line.strip().partition(' ')
+                        self._packed_refs[ref] = sha
+            except FileNotFoundError:
+                ...
+        return self._packed_refs
+
+    def symbolic_ref(self, ref: str) -> Optional[str]:
+        """Returns the ref a symbolic ref like refs/remotes/origin/HEAD points to."""
+        try:
+            with open(os.path.join(self.common_dir, ref)) as fp:
+                value = fp.read().strip()
+        except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+            # Symbolic refs are never packed
+            return None
+        return value[len('ref: ') :] if value.startswith('ref: ') else None
+
+    def resolve(self, ref: str = 'HEAD') -> Optional[str]:
+        """Returns the commit a ref points to, following symbolic refs."""
+        for _ in range(10):
+            if ref == 'HEAD':
+                value = self.head
+            else:
+                # Per worktree refs live in the git directory, shared ones in the common one
+                directory = self.git_dir if ref.startswith('refs/bisect/') else self.common_dir
+                try:
+                    with open(os.path.join(directory, ref)) as fp:
+                        value = fp.read().strip()
+                except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+                    return self.packed_refs.get(ref)
+            if not value.startswith('ref: '):
+                return value
+            ref = value[len('ref: ') :]
+        raise UnsupportedLayout('symbolic ref loop')
@@ -1,46 +1,191 @@
 import hashlib
 import os
-from typing import Optional
+import re
+import threading
+from typing import Any, Optional
 
 from dev import environment
-from dev.helpers import run_command
+
+# Files are hashed in chunks of this many bytes, they are never read into memory whole
+CHUNK_SIZE = 1024 * 1024
+
+# Seconds to wait for another dev process holding the write lock of the database
+LOCK_TIMEOUT = 10.0
+
+# Names and content of the files earlier versions kept a hash in, a sha1 in hex
+LEGACY_HASH = re.compile('[0-9a-f]{40}')
+
+schema = '''
+CREATE TABLE IF NOT EXISTS hashes (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    inode INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    hash TEXT NOT NULL
+);
+'''
 
 
 class HashCacheHelper:
-    cache_prefix = f'/opt/dev/cache/{environment.name}'
+    """Remembers hashes by key in a single SQLite database below the cache path.
+
+    SQLite makes every write atomic and serializes writers across concurrent dev processes, a
+    crash never leaves a truncated hash behind. Keys are scoped to the environment name. Hashes
+    of files are remembered by their stat result, an unchanged file is never read twice.
+
+    The cache is an optimization: when the database can not be used every key reads as missing
+    and writes are dropped.
+    """
+
+    lock = threading.RLock()
+    connection: Optional[Any] = None
+    connection_filename: Optional[str] = None
 
     @classmethod
-    def read_hash(cls, key):
-        if not os.path.exists(f'{cls.cache_prefix}/{key}'):
+    def database_filename(cls) -> str:
+        return f'{environment.cache_path}/hashes.sqlite3'
+
+    @classmethod
+    def connect(cls) -> Optional[Any]:
+        # Imported here, sqlite3 is only needed by commands that check fingerprints
+        import sqlite3
+
+        filename = cls.database_filename()
+        if cls.connection is not None and cls.connection_filename == filename:
+            return cls.connection
+
+        try:
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            created = not os.path.exists(filename)
+            connection = sqlite3.connect(
+                filename, timeout=LOCK_TIMEOUT, isolation_level=None, check_same_thread=False
+            )
+            # Readers never wait for a writer in WAL mode
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.executescript(schema)
+            if created:
+                cls.import_legacy_hashes(connection)
+        except (OSError, sqlite3.Error):
             return None
-        return open(f'{cls.cache_prefix}/{key}').read()
+
+        cls.connection = connection
+        cls.connection_filename = filename
+        return connection
+
+    @staticmethod
+    def import_legacy_hashes(connection: Any) -> None:
+        """Copies the hashes earlier versions kept in a file per key, in a directory per
+        environment name below the cache path, into a new database. Tasks they skipped keep being
+        skipped after an upgrade."""
+        rows = []
+        for namespace in os.listdir(environment.cache_path):
+            directory = os.path.join(environment.cache_path, namespace)
+            if not os.path.isdir(directory):
+                continue
+            try:
+                keys = os.listdir(directory)
+            except OSError:
+                continue
+            for key in keys:
+                if not LEGACY_HASH.fullmatch(key):
+                    continue
+                try:
+                    with open(os.path.join(directory, key)) as fp:
+                        hash = fp.read()
+                except (OSError, ValueError):
+                    continue
+                if LEGACY_HASH.fullmatch(hash):
+                    rows.append((namespace, key, hash))
+        connection.executemany(
+            'INSERT OR IGNORE INTO hashes (namespace, key, hash) VALUES (?, ?, ?)', rows
+        )
 
     @classmethod
-    def write_hash(cls, key, hash):
-        if not os.path.isdir(cls.cache_prefix):
-            run_command(f'mkdir -p {cls.cache_prefix}', silent=True)
-        with open(f'{cls.cache_prefix}/{key}', 'w+') as fp:
-            fp.write(hash)
+    def execute(cls, query: str, parameters: tuple) -> Optional[tuple]:
+        import sqlite3
+
+        with cls.lock:
+            connection = cls.connect()
+            if connection is None:
+                return None
+            try:
+                return connection.execute(query, parameters).fetchone()
+            except sqlite3.Error:
+                # A locked or corrupt database costs running the task again, nothing more
+                return None
+
+    @classmethod
+    def namespace(cls) -> str:
+        return getattr(environment, 'name', '')
+
+    @classmethod
+    def read_hash(cls, key: str) -> Optional[str]:
+        row = cls.execute(
+            'SELECT hash FROM hashes WHERE namespace = ? AND key = ?', (cls.namespace(), key)
+        )
+        return row[0] if row else None
+
+    @classmethod
+    def write_hash(cls, key: str, hash: str) -> None:
+        cls.execute(
+            'INSERT OR REPLACE INTO hashes (namespace, key, hash) VALUES (?, ?, ?)',
+            (cls.namespace(), key, hash),
+        )
 
     @classmethod
-    def has_changed(cls, key, hash):
+    def has_changed(cls, key: str, hash: str) -> bool:
         old_hash = cls.read_hash(key)
         return old_hash != hash
 
     @classmethod
-    def hash_data(cls, data: str):
+    def hash_data(cls, data: str) -> str:
         hash_object = hashlib.sha1(data.encode())
         return hash_object.hexdigest()
 
+    @classmethod
+    def hash_file(cls, filename: str) -> str:
+        """Returns the sha1 of the content of a file, read in chunks.
+
+        The hash is remembered with the inode, size and mtime of the file and reused as long as
+        they are unchanged.
+        """
+        path = os.path.abspath(filename)
+        stat = os.stat(path)
+        row = cls.execute('SELECT inode, size, mtime_ns, hash FROM files WHERE path = ?', (path,))
+        if row and tuple(row[:3]) == (stat.st_ino, stat.st_size, stat.st_mtime_ns):
+            return row[3]
+
+        hash_object = hashlib.sha1()
+        with open(path, 'rb') as fp:
+            for chunk in iter(lambda: fp.read(CHUNK_SIZE), b''):
+                hash_object.update(chunk)
+        hash = hash_object.hexdigest()
+
+        cls.execute(
+            'INSERT OR REPLACE INTO files (path, inode, size, mtime_ns, hash) '
+            'VALUES (?, ?, ?, ?, ?)',
+            (path, stat.st_ino, stat.st_size, stat.st_mtime_ns, hash),
+        )
+        return hash
+
     @classmethod
     def changed(cls, key: str, data: Optional[str] = None, filename: Optional[str] = None) -> bool:
+        """Returns whether data, or the content of filename, changed since the last call with the
+        same key, and remembers it."""
         if filename:
-            data = open(filename).read()
-        elif not data:
+            new_data_hash = cls.hash_file(filename)
+        elif data:
+            new_data_hash = cls.hash_data(data)
+        else:
             raise RuntimeError('Neither filename or data was passed')
 
         key_hash = cls.hash_data(key)
-        new_data_hash = cls.hash_data(data)
         has_changed = cls.has_changed(key_hash, new_data_hash)
         if has_changed:
             cls.write_hash(key_hash, new_data_hash)
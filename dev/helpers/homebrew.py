@@ -1,36 +1,69 @@
 import os
-from typing import Optional
+import threading
+from typing import Any, Dict, List, Optional, Set
 
 from dev.helpers import run_command
+from dev.helpers.probe import ProbeHelper
 
 
 class HomebrewHelper:
-    @staticmethod
-    def prefix() -> Optional[str]:
-        return run_command('brew --prefix', output=True, silent=True)
+    # Homebrew refuses to run concurrent installs, serialize them across tasks running in parallel
+    lock = threading.RLock()
+    # Names found in opt/ and Caskroom/ by directory, scanned once and dropped after installs
+    index: Dict[str, Set[str]] = {}
+
+    PREFIX_PROBE: Dict[str, Any] = dict(
+        command='brew --prefix', tool='brew', env_names=['HOMEBREW_PREFIX']
+    )
+
+    @classmethod
+    def prefix(cls) -> Optional[str]:
+        return ProbeHelper.output(**cls.PREFIX_PROBE)
+
+    @classmethod
+    def installed(cls, directory: str) -> Set[str]:
+        path = f'{cls.prefix()}/{directory}'
+        with cls.lock:
+            if path not in cls.index:
+                try:
+                    with os.scandir(path) as entries:
+                        cls.index[path] = {entry.name for entry in entries if entry.is_dir()}
+                except OSError:
+                    cls.index[path] = set()
+            return cls.index[path]
 
     @classmethod
     def already_installed(cls, formula: str) -> bool:
-        if '/' in formula:
-            # Remove tapped repository from formula name
-            formula = formula.split('/')[-1]
-        path = f'{cls.prefix()}/opt/{formula}'
-        return os.path.isdir(path)
+        # Remove tapped repository from formula name
+        return formula.split('/')[-1] in cls.installed('opt')
 
     @classmethod
     def cask_already_installed(cls, cask: str) -> bool:
-        path = f'{cls.prefix()}/Caskroom/{cask}'
-        return os.path.isdir(path)
+        return cask in cls.installed('Caskroom')
+
+    @classmethod
+    def install_formulae(cls, formulae: List[str]) -> List[str]:
+        """Install the missing formulae with a single `brew install`, returns the installed ones."""
+        with cls.lock:
+            missing = [f for f in dict.fromkeys(formulae) if not cls.already_installed(f)]
+            if missing:
+                run_command(f'brew install {" ".join(missing)}')
+                cls.index.clear()
+            return missing
+
+    @classmethod
+    def install_casks(cls, casks: List[str]) -> List[str]:
+        with cls.lock:
+            missing = [c for c in dict.fromkeys(casks) if not cls.cask_already_installed(c)]
+            if missing:
+                run_command(f'brew install --cask {" ".join(missing)}')
+                cls.index.clear()
+            return missing
 
     @classmethod
     def install_formula(cls, formula: str) -> bool:
-        if cls.already_installed(formula):
-            return False
-        run_command(f'brew install {formula}')
-        return True
+        return bool(cls.install_formulae([formula]))
 
     @classmethod
     def install_cask(cls, cask: str) -> None:
-        if cls.cask_already_installed(cask):
-            return
-        run_command(f'brew install --cask {cask}')
+        cls.install_casks([cask])
@@ -0,0 +1,128 @@
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from dev import environment
+from dev.helpers import run_command
+from dev.helpers.files import write_cache_file
+from dev.helpers.fingerprint import Fingerprint
+
+# Probed paths practically never move, the TTL only bounds how long a missed invalidation lasts
+PROBE_TTL = 24 * 60 * 60
+
+
+class ProbeHelper:
+    """Memoizes commands that report where a tool lives, like `brew --prefix` or `pyenv root`.
+
+    Answers are kept in memory and in a cache file shared by all runs. An answer is reused while
+    the tool binary, the files, the environment variables and any other context it depends on (like
+    the working directory) are unchanged, for at most PROBE_TTL seconds.
+    """
+
+    lock = threading.Lock()
+    caches: Dict[str, Dict[str, dict]] = {}
+
+    @classmethod
+    def output(
+        cls,
+        command: str,
+        tool: str,
+        files: List[str] = [],
+        env_names: List[str] = [],
+        context: List[Any] = [],
+    ) -> Optional[str]:
+        stamp = cls.stamp(command, tool, files, env_names, context)
+        entry = cls.fresh_entry(command, stamp)
+        if entry:
+            return entry['value']
+
+        value = run_command(command, output=True, silent=True, head=1)
+        cls.store({command: (stamp, value)})
+        return value
+
+    @classmethod
+    def prefetch(cls, probes: List[Dict[str, Any]]) -> None:
+        """Run the stale ones of probes, keyword arguments of output(), at the same time.
+
+        output() then answers them from memory. A probe failing here is left to output(), which
+        runs it again and raises.
+        """
+        stale = {}
+        for probe in probes:
+            stamp = cls.stamp(**probe)
+            if not cls.fresh_entry(probe['command'], stamp):
+                stale[probe['command']] = stamp
+        if not stale:
+            return
+
+        # Imported here, asyncio is not needed by commands finding every answer in the cache
+        import asyncio
+
+        from dev.helpers.async_command import run_command_async
+
+        async def run_probes() -> List[Any]:
+            return await asyncio.gather(
+                *(run_command_async(c, output=True, silent=True, head=1) for c in stale),
+                return_exceptions=True,
+            )
+
+        values = asyncio.run(run_probes())
+        cls.store(
+            {
+                command: (stamp, value)
+                for (command, stamp), value in zip(stale.items(), values)
+                if not isinstance(value, BaseException)
+            }
+        )
+
+    @staticmethod
+    def stamp(
+        command: str,
+        tool: str,
+        files: List[str] = [],
+        env_names: List[str] = [],
+        context: List[Any] = [],
+    ) -> str:
+        fingerprint = Fingerprint(command, [environment.env.get(n) for n in env_names], context)
+        fingerprint.add_tool(tool)
+        for filename in files:
+            fingerprint.add_file(filename)
+        return fingerprint.hexdigest()
+
+    @classmethod
+    def fresh_entry(cls, command: str, stamp: str) -> Optional[dict]:
+        with cls.lock:
+            entry = cls.entries().get(command)
+        if entry and entry['stamp'] == stamp and time.time() - entry['time'] < PROBE_TTL:
+            return entry
+        return None
+
+    @classmethod
+    def store(cls, values: Dict[str, Tuple[str, Optional[str]]]) -> None:
+        if not values:
+            return
+        with cls.lock:
+            for command, (stamp, value) in values.items():
+                cls.entries()[command] = dict(stamp=stamp, value=value, time=time.time())
+            cls.write_cache()
+
+    @classmethod
+    def cache_filename(cls) -> str:
+        return f'{environment.cache_path}/probes.json'
+
+    @classmethod
+    def entries(cls) -> Dict[str, dict]:
+        cache_filename = cls.cache_filename()
+        if cache_filename not in cls.caches:
+            try:
+                with open(cache_filename) as fp:
+                    cls.caches[cache_filename] = json.load(fp)
+            except (OSError, ValueError):
+                cls.caches[cache_filename] = {}
+        return cls.caches[cache_filename]
+
+    @classmethod
+    def write_cache(cls) -> None:
+        cache_filename = cls.cache_filename()
+        write_cache_file(cache_filename, json.dumps(cls.caches[cache_filename]))
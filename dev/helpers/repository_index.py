@@ -0,0 +1,129 @@
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+from dev import environment
+from dev.helpers.files import write_cache_file
+
+# Repositories live at most at src/host/organization/repository, nothing deeper is scanned
+MAX_DEPTH = 3
+
+# (mtime_ns, is_repository, children) of a directory below the base path
+Directory = Tuple[int, bool, List[str]]
+
+
+class RepositoryIndex:
+    """Persistent index of the repositories checked out below a base path.
+
+    Every directory up to MAX_DEPTH is recorded with its mtime. Refreshing stats each recorded
+    directory and only lists the ones whose mtime changed, so an unchanged tree costs one stat per
+    directory. Repositories are leaves, their content is never scanned.
+    """
+
+    def __init__(self, base_path: str, git_identifier: str = '.git') -> None:
+        self.base_path = os.path.abspath(base_path)
+        self.git_identifier = git_identifier
+        self.directories: Dict[str, Directory] = self.read_cache()
+        self.changed = False
+
+    def cache_filename(self) -> str:
+        return f'{environment.cache_path}/repositories.json'
+
+    def read_cache(self) -> Dict[str, Directory]:
+        try:
+            with open(self.cache_filename()) as fp:
+                data = json.load(fp)
+        except (OSError, ValueError):
+            return {}
+        if (data.get('base_path'), data.get('git_identifier')) != (
+            self.base_path,
+            self.git_identifier,
+        ):
+            return {}
+        return {path: tuple(directory) for path, directory in data['directories'].items()}
+
+    def write_cache(self) -> None:
+        data = dict(
+            base_path=self.base_path,
+            git_identifier=self.git_identifier,
+            directories=self.directories,
+        )
+        write_cache_file(self.cache_filename(), json.dumps(data))
+
+    def refresh(self) -> 'RepositoryIndex':
+        directories: Dict[str, Directory] = {}
+        self.visit('', 0, directories)
+        if directories.keys() != self.directories.keys():
+            self.changed = True
+        self.directories = directories
+        if self.changed:
+            self.write_cache()
+            self.changed = False
+        return self
+
+    def visit(self, relative_path: str, level: int, directories: Dict[str, Directory]) -> None:
+        path = os.path.join(self.base_path, relative_path)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return
+
+        directory = self.directories.get(relative_path)
+        if directory is None or directory[0] != mtime:
+            directory = self.scan(path, level, mtime)
+            self.changed = True
+        directories[relative_path] = directory
+
+        for child in directory[2]:
+            self.visit(os.path.join(relative_path, child), level + 1, directories)
+
+    def scan(self, path: str, level: int, mtime: int) -> Directory:
+        if level > 0 and os.path.isdir(os.path.join(path, self.git_identifier)):
+            return (mtime, True, [])
+        if level == MAX_DEPTH:
+            return (mtime, False, [])
+
+        try:
+            with os.scandir(path) as entries:
+                children = sorted(entry.name for entry in entries if entry.is_dir())
+        except OSError:
+            children = []
+        return (mtime, False, children)
+
+    def add(self, path: str) -> None:
+        """Record a repository right away, e.g. after cloning it."""
+        relative_path = os.path.relpath(os.path.abspath(path), self.base_path)
+        parts = relative_path.split(os.sep)
+        if relative_path.startswith('..') or len(parts) > MAX_DEPTH:
+            return
+
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return
+        self.directories[relative_path] = (mtime, True, [])
+
+        # Parents keep their recorded mtime, the next refresh still lists them for other changes
+        for level in range(len(parts)):
+            parent = os.path.join(*parts[:level]) if level else ''
+            parent_mtime, _, children = self.directories.get(parent, (0, False, []))
+            if parts[level] not in children:
+                children = sorted(children + [parts[level]])
+            self.directories[parent] = (parent_mtime, False, children)
+
+        self.write_cache()
+
+    def repositories(self) -> List[Tuple[str, Optional[str], Optional[str]]]:
+        """Returns (repository, host, organization) of every indexed repository."""
+        repositories: List[Tuple[str, Optional[str], Optional[str]]] = []
+        for relative_path, (_, is_repository, _) in self.directories.items():
+            if not is_repository:
+                continue
+            parts = relative_path.split(os.sep)
+            if len(parts) == 1:
+                repositories.append((parts[0], None, None))
+            elif len(parts) == 2:
+                repositories.append((parts[1], parts[0], None))
+            else:
+                repositories.append((parts[2], parts[0], parts[1]))
+        return repositories
@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+
+from dev import environment
+from dev.helpers.fingerprint import Fingerprint
+
+# Seconds to wait for another dev process holding the write lock of the database
+LOCK_TIMEOUT = 10.0
+
+# Runs older than this many days, or beyond the newest MAX_RUNS, are deleted
+MAX_AGE_DAYS = 90
+MAX_RUNS = 50_000
+
+COMMAND = 'command'
+TASK = 'task'
+
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+
+schema = '''
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    namespace TEXT NOT NULL,
+    command TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    args_hash TEXT NOT NULL,
+    args TEXT NOT NULL,
+    duration_ms REAL NOT NULL,
+    outcome TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_namespace ON runs (namespace, started);
+'''
+
+# (started, kind, name, args_hash, args, duration_ms, outcome) of a run not yet stored
+Run = Tuple[float, str, str, str, str, float, str]
+
+
+class RunHistoryHelper:
+    """Keeps the duration and outcome of every Devfile command and task run.
+
+    Runs are collected in memory while a command runs and stored together in a SQLite database
+    below the cache path once it finished, keyed by the environment name, command and a hash of
+    the task arguments. Old runs are deleted as new ones are stored.
+
+    The history is informational: when the database can not be used runs are dropped.
+    """
+
+    lock = threading.Lock()
+    pending: List[Run] = []
+
+    @classmethod
+    def database_filename(cls) -> str:
+        return f'{environment.cache_path}/runs.sqlite3'
+
+    @classmethod
+    def connect(cls) -> Any:
+        # Imported here, sqlite3 is only needed once a command finished
+        import sqlite3
+
+        filename = cls.database_filename()
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        connection = sqlite3.connect(filename, timeout=LOCK_TIMEOUT, isolation_level=None)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.executescript(schema)
+        return connection
+
+    @classmethod
+    def namespace(cls) -> str:
+        return getattr(environment, 'name', '')
+
+    @classmethod
+    def record(
+        cls, kind: str, name: str, args: Any, started: float, duration_ms: float, outcome: str
+    ) -> None:
+        label = str(args) if args is not None else ''
+        run = (started, kind, name, Fingerprint(args).hexdigest(), label, duration_ms, outcome)
+        with cls.lock:
+            cls.pending.append(run)
+
+    @classmethod
+    def store(cls, command: str) -> None:
+        import sqlite3
+
+        with cls.lock:
+            runs, cls.pending = cls.pending, []
+        if not runs:
+            return
+
+        namespace = cls.namespace()
+        try:
+            connection = cls.connect()
+            with connection:
+                connection.execute('BEGIN IMMEDIATE')
+                connection.executemany(
+                    'INSERT INTO runs (started, namespace, command, kind, name, args_hash, args, '
+                    'duration_ms, outcome) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    [(run[0], namespace, command, *run[1:]) for run in runs],
+                )
+                connection.execute(
+                    'DELETE FROM runs WHERE started < ?', (time.time() - MAX_AGE_DAYS * 86400,)
+                )
+                connection.execute(
+                    'DELETE FROM runs WHERE id <= (SELECT MAX(id) FROM runs) - ?', (MAX_RUNS,)
+                )
+            connection.close()
+        except (OSError, sqlite3.Error):
+            # The runs are dropped, a command succeeds or fails on its own
+            ...
+
+    @classmethod
+    def runs(
+        cls, since: float, namespace: Optional[str] = None
+    ) -> List[Tuple[float, str, str, str, str, float, str]]:
+        """Returns (started, command, kind, name, args, duration_ms, outcome) of the runs of
+        namespace since a time, oldest first."""
+        import sqlite3
+
+        try:
+            connection = cls.connect()
+            rows = connection.execute(
+                'SELECT started, command, kind, name, args, duration_ms, outcome FROM runs '
+                'WHERE namespace = ? AND started >= ? ORDER BY started',
+                (cls.namespace() if namespace is None else namespace, since),
+            ).fetchall()
+            connection.close()
+        except (OSError, sqlite3.Error):
+            return []
+        return rows
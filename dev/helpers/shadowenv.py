@@ -1,26 +1,19 @@
 import os
-from typing import Callable, Dict, List, Optional
+import shutil
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
 
+from dev import environment
 from dev.console import console
 from dev.helpers import current_shell, run_command
+from dev.helpers.files import atomic_write
 from dev.helpers.homebrew import HomebrewHelper
 from dev.helpers.parent_shell import ParentShellHelper
 
 SHADOWENV_CONFIG_DIRECTORY = '.shadowenv.d'
 
 
-def ensure_shadowenv_installed(func: Callable) -> Callable:
-    def inner(*args: str, **kwargs: str) -> None:
-        if HomebrewHelper.install_formula('shadowenv'):
-            ShadowenvHelper.install_init_script()
-        if not os.path.isdir(SHADOWENV_CONFIG_DIRECTORY):
-            os.mkdir(SHADOWENV_CONFIG_DIRECTORY)
-        func(*args, **kwargs)
-        run_command('shadowenv trust', silent=True)
-
-    return inner
-
-
 def append_to_file(filename: str, data: str) -> None:
     with open(filename, 'a+') as fp:
         fp.seek(0)
@@ -30,6 +23,78 @@ def append_to_file(filename: str, data: str) -> None:
 
 
 class ShadowenvHelper:
+    """Writes the shadowenv configuration of the current directory.
+
+    Changes are staged and committed together when the outermost session ends, or right away
+    outside a session. A commit only writes files whose content changed, each atomically, and runs
+    `shadowenv trust` once if anything changed.
+    """
+
+    lock = threading.RLock()
+    # Staged content by filename, None removes the file
+    staged: Dict[str, Optional[str]] = {}
+    sessions = 0
+
+    @classmethod
+    @contextmanager
+    def session(cls) -> Iterator[None]:
+        with cls.lock:
+            cls.sessions += 1
+        try:
+            yield
+        finally:
+            with cls.lock:
+                cls.sessions -= 1
+                if not cls.sessions:
+                    cls.commit()
+
+    @classmethod
+    def stage(cls, name: str, content: Optional[str]) -> None:
+        with cls.lock:
+            cls.staged[f'{SHADOWENV_CONFIG_DIRECTORY}/{name}'] = content
+            if not cls.sessions:
+                cls.commit()
+
+    @classmethod
+    def commit(cls) -> None:
+        with cls.lock:
+            staged, cls.staged = cls.staged, {}
+            if not staged:
+                return
+
+            if any(content is not None for content in staged.values()):
+                if HomebrewHelper.install_formula('shadowenv'):
+                    cls.install_init_script()
+                os.makedirs(SHADOWENV_CONFIG_DIRECTORY, exist_ok=True)
+
+            changed = False
+            for filename, content in staged.items():
+                changed = cls.write(filename, content) or changed
+
+            # Shadowenv only loads a directory trusted with its current content
+            if changed and shutil.which('shadowenv', path=environment.env.get('PATH')):
+                if os.listdir(SHADOWENV_CONFIG_DIRECTORY):
+                    run_command('shadowenv trust', silent=True)
+
+    @staticmethod
+    def write(filename: str, content: Optional[str]) -> bool:
+        """Writes or removes filename, returns whether that changed anything."""
+        if content is None:
+            if not os.path.exists(filename):
+                return False
+            os.unlink(filename)
+            return True
+
+        try:
+            with open(filename) as fp:
+                if fp.read() == content:
+                    return False
+        except FileNotFoundError:
+            ...
+
+        atomic_write(filename, content)
+        return True
+
     @classmethod
     def install_init_script(cls) -> None:
         home_path = os.environ.get('HOME')
@@ -50,7 +115,6 @@ class ShadowenvHelper:
             ParentShellHelper.run(f'source {home_path}/.profile')
 
     @classmethod
-    @ensure_shadowenv_installed
     def configure_provider(
         cls,
         provider: str,
@@ -58,31 +122,27 @@ class ShadowenvHelper:
         provider_path: Optional[str] = None,
         env_names: List[str] = ['PROVIDER_PATH'],
     ) -> None:
-        with open(f'{SHADOWENV_CONFIG_DIRECTORY}/500_{provider}.lisp', 'w+') as fp:
-            fp.write(f'(provide "{provider}" "{provider_version}")\n')
-            if provider_path and len(env_names) > 0:
-                for env_name in env_names:
-                    fp.write(f'(env/set "{env_name}" "{provider_path}")\n')
-                fp.write(
-                    f'(env/prepend-to-pathlist "PATH" (path-concat (env/get "{env_names[0]}") "bin"))\n'
-                )
+        content = f'(provide "{provider}" "{provider_version}")\n'
+        if provider_path and len(env_names) > 0:
+            for env_name in env_names:
+                content += f'(env/set "{env_name}" "{provider_path}")\n'
+            content += (
+                f'(env/prepend-to-pathlist "PATH" (path-concat (env/get "{env_names[0]}") "bin"))\n'
+            )
+        cls.stage(f'500_{provider}.lisp', content)
 
     @classmethod
-    @ensure_shadowenv_installed
     def set_environments(cls, environments: Dict[str, str]) -> None:
-        with open(f'{SHADOWENV_CONFIG_DIRECTORY}/400_environment.lisp', 'w+') as fp:
-            for k, v in environments.items():
-                console.print(f'=> Setting environment variable {k} to {v}', style='blue')
-                fp.write(f'(env/set "{k}" "{v}")\n')
+        content = ''
+        for k, v in environments.items():
+            console.print(f'=> Setting environment variable {k} to {v}', style='blue')
+            content += f'(env/set "{k}" "{v}")\n'
+        cls.stage('400_environment.lisp', content)
 
     @classmethod
     def unset_environments(cls) -> None:
-        path = f'{SHADOWENV_CONFIG_DIRECTORY}/400_environment.lisp'
-        if os.path.exists(path):
-            os.unlink(path)
+        cls.stage('400_environment.lisp', None)
 
     @classmethod
     def unconfigure_provider(cls, provider: str) -> None:
-        path = f'{SHADOWENV_CONFIG_DIRECTORY}/500_{provider}.lisp'
-        if os.path.exists(path):
-            os.unlink(path)
+        cls.stage(f'500_{provider}.lisp', None)
@@ -0,0 +1,87 @@
+import os
+import subprocess
+import threading
+from typing import Dict, Optional, Tuple
+
+KNOWN_SHELLS = {'bash', 'zsh', 'fish', 'sh', 'dash', 'ksh', 'tcsh', 'csh'}
+
+# Ancestors inspected for a shell, dev is usually a direct child of the shell function calling it
+MAX_DEPTH = 5
+
+
+def shell_name(command: str) -> Optional[str]:
+    # Login shells are named -zsh, ps may report a full path
+    name = os.path.basename(command.strip()).lstrip('-')
+    return name if name in KNOWN_SHELLS else None
+
+
+class ShellHelper:
+    """Detects the shell dev was started from by walking up its parent processes.
+
+    Processes are read from /proc where it exists and from `ps -p` elsewhere, falling back to
+    $SHELL when no shell is found. The answer is cached for the session, keyed by the parent
+    process.
+    """
+
+    proc_path = '/proc'
+    lock = threading.Lock()
+    cache: Dict[int, Optional[str]] = {}
+
+    @classmethod
+    def current(cls) -> Optional[str]:
+        ppid = os.getppid()
+        with cls.lock:
+            if ppid not in cls.cache:
+                cls.cache[ppid] = cls.detect(ppid)
+            return cls.cache[ppid]
+
+    @classmethod
+    def detect(cls, pid: int) -> Optional[str]:
+        for _ in range(MAX_DEPTH):
+            if pid <= 1:
+                break
+            process = cls.process(pid)
+            if process is None:
+                break
+            ppid, command = process
+            name = shell_name(command)
+            if name:
+                return name
+            pid = ppid
+
+        return shell_name(os.environ.get('SHELL', ''))
+
+    @classmethod
+    def process(cls, pid: int) -> Optional[Tuple[int, str]]:
+        """Returns the parent pid and the command name of a process."""
+        if os.path.isdir(cls.proc_path):
+            return cls.proc_process(pid)
+        return cls.ps_process(pid)
+
+    @classmethod
+    def proc_process(cls, pid: int) -> Optional[Tuple[int, str]]:
+        try:
+            with open(f'{cls.proc_path}/{pid}/comm') as fp:
+                command = fp.read().strip()
+            with open(f'{cls.proc_path}/{pid}/stat') as fp:
+                stat = fp.read()
+        except OSError:
+            return None
+        # The command in stat is in parentheses and may itself contain spaces or parentheses
+        fields = stat[stat.rindex(')') + 2 :].split()
+        return int(fields[1]), command
+
+    @staticmethod
+    def ps_process(pid: int) -> Optional[Tuple[int, str]]:
+        try:
+            output = subprocess.run(
+                ('ps', '-o', 'ppid=', '-o', 'comm=', '-p', str(pid)),
+                capture_output=True,
+                text=True,
+            ).stdout
+        except OSError:
+            return None
+        ppid, _, command = output.strip().partition(' ')
+        if not ppid.isdigit():
+            return None
+        return int(ppid), command.strip()
@@ -0,0 +1,166 @@
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Spans kept per process, a runaway loop of commands must not grow memory without bounds
+MAX_SPANS = 100_000
+
+
+class Span:
+    __slots__ = ('name', 'category', 'start', 'end', 'thread_id', 'thread_name', 'args')
+
+    def __init__(self, name: str, category: str, args: Dict[str, Any]) -> None:
+        thread = threading.current_thread()
+        self.name = name
+        self.category = category
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.thread_id = thread.ident or 0
+        self.thread_name = thread.name
+        self.args = args
+
+    @property
+    def duration(self) -> float:
+        return ((self.end or time.perf_counter()) - self.start) * 1000
+
+
+class TraceHelper:
+    """Records where the time of a dev invocation goes.
+
+    Spans are kept in memory for tasks, commands, Devfile loading and task module imports. They
+    cost a couple of clock reads each and are only written out when asked for, with
+    `dev --profile <command>` or DEV_TRACE=<file>. Traces use the Chrome trace event format and
+    open in https://ui.perfetto.dev.
+    """
+
+    lock = threading.Lock()
+    spans: List[Span] = []
+    local = threading.local()
+    origin = time.perf_counter()
+
+    @classmethod
+    @contextmanager
+    def span(cls, name: str, category: str, **args: Any) -> Iterator[Span]:
+        span = Span(name, category, args)
+        stack = cls.stack()
+        stack.append(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.args.setdefault('error', type(e).__name__)
+            raise
+        finally:
+            stack.pop()
+            cls.finish(span)
+
+    @classmethod
+    def start(cls, name: str, category: str, **args: Any) -> Span:
+        """Start a span outside of the stack of the thread, for coroutines which interleave."""
+        return Span(name, category, args)
+
+    @classmethod
+    def finish(cls, span: Span) -> None:
+        span.end = time.perf_counter()
+        with cls.lock:
+            if len(cls.spans) < MAX_SPANS:
+                cls.spans.append(span)
+
+    @classmethod
+    def stack(cls) -> List[Span]:
+        if not hasattr(cls.local, 'stack'):
+            cls.local.stack = []
+        return cls.local.stack
+
+    @classmethod
+    def annotate(cls, category: str, **args: Any) -> None:
+        """Add args to the innermost open span of this thread when it is of category."""
+        stack = cls.stack()
+        if stack and stack[-1].category == category:
+            stack[-1].args.update(args)
+
+    @classmethod
+    def elapsed(cls, start: float) -> float:
+        return round((time.perf_counter() - start) * 1000, 3)
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls.lock:
+            cls.spans = []
+
+    @classmethod
+    def events(cls) -> List[Dict[str, Any]]:
+        pid = os.getpid()
+        with cls.lock:
+            spans = list(cls.spans)
+
+        events: List[Dict[str, Any]] = []
+        threads: Dict[int, str] = {}
+        for span in sorted(spans, key=lambda s: s.start):
+            threads.setdefault(span.thread_id, span.thread_name)
+            events.append(
+                {
+                    'name': span.name,
+                    'cat': span.category,
+                    'ph': 'X',
+                    'ts': round((span.start - cls.origin) * 1_000_000),
+                    'dur': round(span.duration * 1000),
+                    'pid': pid,
+                    'tid': span.thread_id,
+                    'args': span.args,
+                }
+            )
+        for thread_id, thread_name in threads.items():
+            events.append(
+                {
+                    'name': 'thread_name',
+                    'ph': 'M',
+                    'pid': pid,
+                    'tid': thread_id,
+                    'args': {'name': thread_name},
+                }
+            )
+        return events
+
+    @classmethod
+    def write(cls, filename: str) -> None:
+        import json
+
+        from dev.helpers.files import atomic_write
+
+        trace = {'traceEvents': cls.events(), 'displayTimeUnit': 'ms'}
+        atomic_write(filename, json.dumps(trace, default=str))
+
+    @classmethod
+    def totals(cls) -> List[Tuple[str, str, int, float, float]]:
+        """Returns (category, name, calls, total ms, max ms) of the spans, slowest first."""
+        grouped: Dict[Tuple[str, str], List[float]] = defaultdict(list)
+        with cls.lock:
+            for span in cls.spans:
+                grouped[(span.category, span.name)].append(span.duration)
+        return sorted(
+            (
+                (category, name, len(durations), sum(durations), max(durations))
+                for (category, name), durations in grouped.items()
+            ),
+            key=lambda total: total[3],
+            reverse=True,
+        )
+
+    @classmethod
+    def render_summary(cls, limit: int = 20) -> Any:
+        from rich.table import Table
+
+        table = Table(title=f'Time spent, {cls.elapsed(cls.origin):.0f} ms in total')
+        table.add_column('Span', overflow='fold')
+        table.add_column('Kind')
+        table.add_column('Calls', justify='right')
+        table.add_column('Total ms', justify='right')
+        table.add_column('Max ms', justify='right')
+
+        for category, name, calls, total, longest in cls.totals()[:limit]:
+            table.add_row(name, category, str(calls), f'{total:.1f}', f'{longest:.1f}')
+
+        return table
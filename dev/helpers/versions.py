@@ -0,0 +1,111 @@
+import re
+from typing import List, Optional, Tuple
+
+version_pattern = re.compile(r'^v?(\d+(?:\.\d+)*)(?:[-.]?([0-9A-Za-z.-]+))?(?:\+.*)?$')
+comparator_pattern = re.compile(r'^(\^|~>|~|>=|<=|>|<|!=|=)?\s*v?([0-9A-Za-z.*+-]*)$')
+
+# (release numbers, prerelease) where a missing prerelease sorts after any prerelease
+Version = Tuple[Tuple[int, ...], Tuple[int, str]]
+
+
+def parse_version(version: str) -> Optional[Version]:
+    match = version_pattern.match(version.strip())
+    if not match:
+        return None
+    release, prerelease = match.groups()
+    return (
+        tuple(int(part) for part in release.split('.')),
+        (0, prerelease) if prerelease else (1, ''),
+    )
+
+
+def compare(left: Version, right: Version) -> int:
+    width = max(len(left[0]), len(right[0]))
+    left_release = left[0] + (0,) * (width - len(left[0]))
+    right_release = right[0] + (0,) * (width - len(right[0]))
+    left_key = (left_release, left[1])
+    right_key = (right_release, right[1])
+    return (left_key > right_key) - (left_key < right_key)
+
+
+def satisfies_comparator(version: Version, operator: str, bound: Version) -> bool:
+    result = compare(version, bound)
+    return {
+        '=': result == 0,
+        '!=': result != 0,
+        '>': result > 0,
+        '>=': result >= 0,
+        '<': result < 0,
+        '<=': result <= 0,
+    }[operator]
+
+
+def bump(release: Tuple[int, ...], index: int) -> Version:
+    # The smallest version above every version sharing the first index + 1 release numbers
+    return (release[:index] + (release[index] + 1,), (0, ''))
+
+
+def expand(operator: str, bound: str) -> Optional[List[Tuple[str, Version]]]:
+    """Turns a comparator of npm or RubyGems into plain comparisons, None when not understood."""
+    parts = bound.split('.')
+    wildcard = next((i for i, part in enumerate(parts) if part in ('x', 'X', '*')), None)
+    if wildcard is not None:
+        parts = parts[:wildcard]
+        if not parts:
+            return []
+        if operator not in ('', '='):
+            return None
+        release = tuple(int(part) for part in parts)
+        return [('>=', (release, (0, ''))), ('<', bump(release, len(release) - 1))]
+
+    version = parse_version(bound)
+    if version is None:
+        return None
+    release = version[0]
+
+    if operator == '^':
+        # Changes that do not modify the left-most non-zero number
+        index = next((i for i, part in enumerate(release) if part), len(release) - 1)
+        return [('>=', version), ('<', bump(release, index))]
+    if operator == '~':
+        return [('>=', version), ('<', bump(release, min(1, len(release) - 1)))]
+    if operator == '~>':
+        return [('>=', version), ('<', bump(release, max(0, len(release) - 2)))]
+    if operator == '' and len(release) < 3 and version[1] == (1, ''):
+        # npm treats a partial version like 1.2 as 1.2.x
+        return [('>=', version), ('<', bump(release, len(release) - 1))]
+    return [(operator or '=', version)]
+
+
+def satisfies(version: str, requirement: str) -> bool:
+    """Whether version satisfies a npm range (`^1.2`, `>=1 <2`, `1.x || 2.x`) or a RubyGems
+    requirement (`~> 2.3`, `>= 1, < 2`).
+
+    Requirements that can not be understood, like dist-tags, are satisfied by any version.
+    """
+    parsed_version = parse_version(version)
+    if parsed_version is None:
+        return False
+
+    for alternative in requirement.split('||'):
+        # `>= 1, < 2` and `>=1 <2` both list two comparators
+        alternative = re.sub(r'(\^|~>|~|>=|<=|>|<|!=|=)\s+', r'\1', alternative)
+        comparators = alternative.replace(',', ' ').split()
+        if not comparators:
+            return True
+
+        matched = True
+        for comparator in comparators:
+            match = comparator_pattern.match(comparator)
+            if not match:
+                return True
+            comparisons = expand(match.group(1) or '', match.group(2))
+            if comparisons is None:
+                return True
+            if not all(satisfies_comparator(parsed_version, o, b) for o, b in comparisons):
+                matched = False
+                break
+        if matched:
+            return True
+
+    return False
@@ -7,12 +7,14 @@
 # Author: Steen Lumholt -- with additions by Guido.
 
 import os
+import selectors
+import signal
+import sys
 import termios
 from os import close, waitpid
-from select import select
 from termios import tcgetattr, tcsetattr
 from tty import setraw
-from typing import Callable, Optional, Tuple
+from typing import Callable, List, Optional, Tuple
 
 __all__ = ["fork", "spawn", "waitstatus_to_exitcode"]
 
@@ -22,6 +24,17 @@ STDERR_FILENO = 2
 
 CHILD = 0
 
+# Read in large chunks so chatty children (docker-compose logs -f, pip -v) do not cost one
+# syscall round trip per kilobyte, and write at most this much to stdout at once.
+READ_SIZE = 64 * 1024
+WRITE_COALESCE_SIZE = 256 * 1024
+
+# posix_spawn starts the child without copying the page tables of the interpreter like fork()
+# does, which gets slower the more dev has imported. The child becomes a session leader and
+# acquires the pty as controlling terminal by opening it. Only Linux does so on open(), BSDs and
+# macOS require a TIOCSCTTY ioctl which posix_spawn can not issue, they keep forking.
+USE_POSIX_SPAWN = hasattr(os, 'posix_spawnp') and sys.platform == 'linux'
+
 
 def fork() -> Tuple[int, int]:
     """fork() -> (pid, master_fd)
@@ -63,6 +76,44 @@ def fork() -> Tuple[int, int]:
     return pid, master_fd
 
 
+def _posix_spawn(
+    argv: Tuple[str, ...], env: Optional[dict] = None, executable: Optional[str] = None
+) -> Tuple[int, int]:
+    """_posix_spawn(argv, env, executable) -> (pid, master_fd)
+    Spawn argv as a session leader with a new pty as controlling terminal."""
+    if executable is None:
+        # posix_spawnp() searches the PATH of the parent, not the one of env like execvpe()
+        import shutil
+
+        path = os.pathsep.join(os.get_exec_path(env))
+        executable = shutil.which(argv[0], path=path)
+        if executable is None:
+            raise FileNotFoundError(argv[0])
+
+    master_fd, slave_fd = os.openpty()
+    try:
+        _set_window_size(slave_fd)
+        pid = os.posix_spawn(
+            executable,
+            argv,
+            os.environ if env is None else env,
+            file_actions=[
+                (os.POSIX_SPAWN_OPEN, STDIN_FILENO, os.ttyname(slave_fd), os.O_RDWR, 0),
+                (os.POSIX_SPAWN_DUP2, STDIN_FILENO, STDOUT_FILENO),
+                (os.POSIX_SPAWN_DUP2, STDIN_FILENO, STDERR_FILENO),
+            ],
+            setsid=True,
+            # Python ignores SIGPIPE, children expect the default like after subprocess.Popen
+            setsigdef=(signal.SIGPIPE,),
+        )
+    except BaseException:
+        os.close(master_fd)
+        raise
+    finally:
+        os.close(slave_fd)
+    return pid, master_fd
+
+
 def _writen(fd: int, data: bytes) -> None:
     """Write all the data to a descriptor."""
     while data:
@@ -72,7 +123,32 @@ def _writen(fd: int, data: bytes) -> None:
 
 def _read(fd: int) -> bytes:
     """Default read function."""
-    return os.read(fd, 1024)
+    return os.read(fd, READ_SIZE)
+
+
+class _Poller:
+    """Wait for readable descriptors using poll.
+
+    select() is limited to descriptors below FD_SETSIZE (1024). epoll and kqueue refuse regular
+    files and /dev/null, which stdin often is, and macOS does not support poll or kqueue on
+    terminals, so select() is kept there."""
+
+    def __init__(self, fds: List[int]) -> None:
+        if hasattr(selectors, 'PollSelector') and sys.platform != 'darwin':
+            self.selector: selectors.BaseSelector = selectors.PollSelector()
+        else:
+            self.selector = selectors.SelectSelector()
+        for fd in fds:
+            self.selector.register(fd, selectors.EVENT_READ)
+
+    def wait(self, timeout: Optional[float] = None) -> List[int]:
+        return [key.fd for key, _ in self.selector.select(timeout)]
+
+    def unregister(self, fd: int) -> None:
+        self.selector.unregister(fd)
+
+    def close(self) -> None:
+        self.selector.close()
 
 
 def _copy(
@@ -83,30 +159,53 @@ def _copy(
     """Parent copy loop.
     Copies
             pty master -> standard output   (master_read)
-            standard input -> pty master    (stdin_read)"""
+            standard input -> pty master    (stdin_read)
+
+    Output already available on the master is drained and written to standard output with a
+    single write, up to WRITE_COALESCE_SIZE bytes."""
     fds = [master_fd, STDIN_FILENO]
-    while fds:
-        rfds, _wfds, _xfds = select(fds, [], [])
+    poller = _poller(fds)
+    try:
+        while fds:
+            rfds = poller.wait()
 
-        if master_fd in rfds:
-            # Some OSes signal EOF by returning an empty byte string,
-            # some throw OSErrors.
-            try:
-                data = master_read(master_fd)
-            except OSError:
-                data = b""
-            if not data:  # Reached EOF.
-                return  # Assume the child process has exited and is
-                # unreachable, so we clean up.
-            else:
-                os.write(STDOUT_FILENO, data)
+            if master_fd in rfds:
+                chunks: List[bytes] = []
+                size = 0
+                eof = False
+                while True:
+                    # Some OSes signal EOF by returning an empty byte string,
+                    # some throw OSErrors.
+                    try:
+                        data = master_read(master_fd)
+                    except OSError:
+                        data = b""
+                    if not data:
+                        eof = True
+                        break
+                    chunks.append(data)
+                    size += len(data)
+                    if size >= WRITE_COALESCE_SIZE or master_fd not in poller.wait(0):
+                        break
+
+                if chunks:
+                    _writen(STDOUT_FILENO, b"".join(chunks))
+                if eof:  # Reached EOF.
+                    return  # Assume the child process has exited and is
+                    # unreachable, so we clean up.
+
+            if STDIN_FILENO in rfds:
+                data = stdin_read(STDIN_FILENO)
+                if not data:
+                    fds.remove(STDIN_FILENO)
+                    poller.unregister(STDIN_FILENO)
+                else:
+                    _writen(master_fd, data)
+    finally:
+        poller.close()
 
-        if STDIN_FILENO in rfds:
-            data = stdin_read(STDIN_FILENO)
-            if not data:
-                fds.remove(STDIN_FILENO)
-            else:
-                _writen(master_fd, data)
+
+_poller = _Poller
 
 
 def _set_window_size(fd):
@@ -124,18 +223,65 @@ def _set_window_size(fd):
         pass
 
 
+def _fork_exec(
+    argv: Tuple[str, ...],
+    env: Optional[dict] = None,
+    executed: Optional[Callable[[], None]] = None,
+) -> Tuple[int, int]:
+    if executed:
+        # Both ends are closed on exec, reading EOF tells the child is no longer a copy of us
+        exec_read_fd, exec_write_fd = os.pipe()
+
+    pid, master_fd = fork()
+    if pid == CHILD:
+        try:
+            os.execlpe(argv[0], *argv, env)
+        except OSError:
+            # Like a shell, report a command that can not be executed with exit code 127
+            os._exit(127)
+
+    if executed:
+        os.close(exec_write_fd)
+        while os.read(exec_read_fd, 1):
+            ...
+        os.close(exec_read_fd)
+        executed()
+
+    return pid, master_fd
+
+
 def spawn(
     argv: Tuple[str, ...],
     master_read: Callable[[int], bytes] = _read,
     stdin_read: Callable[[int], bytes] = _read,
     env: Optional[dict] = None,
+    executed: Optional[Callable[[], None]] = None,
+    executable: Optional[str] = None,
 ) -> int:
-    """Create a spawned process."""
-    pid, master_fd = fork()
-    if pid == CHILD:
-        os.execlpe(argv[0], *argv, env)
+    """Create a spawned process.
+
+    executed is called once the child replaced itself with argv, or failed to. executable is the
+    path of argv[0], looked up on the PATH of env when not given."""
+    global USE_POSIX_SPAWN
+
+    pid: Optional[int] = None
+    if USE_POSIX_SPAWN and argv:
+        try:
+            # Returns once the child exec'd
+            pid, master_fd = _posix_spawn(argv, env, executable)
+        except NotImplementedError:
+            # Python was built without POSIX_SPAWN_SETSID
+            USE_POSIX_SPAWN = False
+        except OSError:
+            # Forking reports a command that can not be executed with exit code 127
+            ...
+        else:
+            if executed:
+                executed()
 
-    _set_window_size(master_fd)
+    if pid is None:
+        pid, master_fd = _fork_exec(argv, env, executed)
+        _set_window_size(master_fd)
 
     try:
         mode = tcgetattr(STDIN_FILENO)
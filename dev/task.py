@@ -1,16 +1,25 @@
 import sys
-from typing import Any, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from schema import Schema, SchemaError
 
 from dev.console import error_console
 from dev.exceptions import TaskError
 from dev.helpers import camel_to_snake
+from dev.helpers.fingerprint import Fingerprint
+from dev.helpers.trace import TraceHelper
 
 
 class BaseTask:
     __schema__: Optional[Schema] = None
     __description__: Optional[str] = None
+    # Names of tasks that must finish before this one when they appear earlier in the same
+    # command. None means the task depends on everything before it and everything after depends
+    # on it, which is the safe default for tasks with unknown side effects (run, env, custom).
+    __depends_on__: Optional[List[str]] = None
+    # Tasks that may prompt, e.g. for a sudo password, run alone on the main thread with the
+    # terminal once the tasks already running finished. Their dependencies are unchanged.
+    __interactive__: bool = False
 
     def __init__(
         self, args: Optional[Any] = None, extra_args: Optional[Any] = None, direction: str = 'up'
@@ -19,21 +28,23 @@ class BaseTask:
         self.validate(args)
         self.run_and_catch(args, extra_args, direction)
 
-    def validate(self, args: Optional[Any]) -> None:
-        if not self.__schema__:
+    @classmethod
+    def validate(cls, args: Optional[Any]) -> None:
+        if not cls.__schema__:
             return
         try:
-            self.__schema__.validate(args)
+            cls.__schema__.validate(args)
         except SchemaError as e:
-            error_console.print(f'Failed to validate input to {self.task_name}: {e}', style='red')
+            error_console.print(f'Failed to validate input to {cls.__name__}: {e}', style='red')
             sys.exit(1)
 
     def run_and_catch(self, args: Optional[Any], extra_args: Optional[Any], direction: str) -> None:
         try:
-            if direction == 'down':
-                self.down(args, extra_args)
-            else:
-                self.up(args, extra_args)
+            with TraceHelper.span(self.task_name, 'task', direction=direction):
+                if direction == 'down':
+                    self.down(args, extra_args)
+                else:
+                    self.up(args, extra_args)
         except TaskError as e:
             error_console.print(
                 f'Failed to run [b]{self.task_name}[/] task: {e}',
@@ -47,6 +58,31 @@ class BaseTask:
     def down(self, args: Optional[Any], extra_args: Optional[Any]) -> None:
         ...
 
+    @classmethod
+    def fingerprint(cls, args: Optional[Any], extra_args: Optional[Any]) -> Optional[Fingerprint]:
+        # Files and tools deciding the outcome of up(), the arguments are always included. When
+        # unchanged since the last successful run the engine skips the task. None means the task
+        # always runs.
+        return None
+
+    @classmethod
+    def restore(cls, args: Optional[Any], extra_args: Optional[Any]) -> None:
+        # Called instead of up() when the task is skipped, re-applies changes a run makes to the
+        # environment of the current process (e.g. PATH) that later tasks rely on.
+        ...
+
+    @classmethod
+    def formulae(cls, args: Optional[Any]) -> List[str]:
+        # Homebrew formulae up() installs, the engine installs those of every task of a command
+        # with a single `brew install` before running them.
+        return []
+
+    @classmethod
+    def probes(cls, args: Optional[Any]) -> List[Dict[str, Any]]:
+        # ProbeHelper.output() keyword arguments of the probes up() and fingerprint() make, the
+        # engine runs those of the tasks up to the next barrier at the same time.
+        return []
+
     @classmethod
     def subclasses(cls) -> List[Tuple[str, Optional[str]]]:
         return [(camel_to_snake(c.__name__), c.__description__) for c in cls.__subclasses__()]
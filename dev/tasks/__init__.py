@@ -1,22 +1,30 @@
-from dev.tasks.docker_compose import DockerCompose
-from dev.tasks.docker_compose_exec import DockerComposeExec
-from dev.tasks.env import Env
-from dev.tasks.gem import Gem
-from dev.tasks.homebrew import Homebrew
-from dev.tasks.homebrew_cask import HomebrewCask
-from dev.tasks.hosts import Hosts
-from dev.tasks.mkcert import Mkcert
-from dev.tasks.nginx import Nginx
-from dev.tasks.node import Node
-from dev.tasks.npm import Npm
-from dev.tasks.pip import Pip
-from dev.tasks.podman_compose import PodmanCompose
-from dev.tasks.pypi import Pypi
-from dev.tasks.python import Python
-from dev.tasks.ruby import Ruby
-from dev.tasks.run import Run
-from dev.tasks.rust import Rust
-from dev.tasks.sticky_env import StickyEnv
+from importlib import import_module
+from typing import Any, Dict
+
+# Maps task names used in Devfiles to the module implementing them. Modules are imported on
+# first use so a command only pays for the tasks (and their dependencies) it actually runs.
+# Local tasks found in the devs/ directory are registered here by dev.helpers.load_local_taks().
+registry: Dict[str, str] = {
+    'docker_compose': 'dev.tasks.docker_compose',
+    'docker_compose_exec': 'dev.tasks.docker_compose_exec',
+    'env': 'dev.tasks.env',
+    'gem': 'dev.tasks.gem',
+    'homebrew': 'dev.tasks.homebrew',
+    'homebrew_cask': 'dev.tasks.homebrew_cask',
+    'hosts': 'dev.tasks.hosts',
+    'mkcert': 'dev.tasks.mkcert',
+    'nginx': 'dev.tasks.nginx',
+    'node': 'dev.tasks.node',
+    'npm': 'dev.tasks.npm',
+    'pip': 'dev.tasks.pip',
+    'podman_compose': 'dev.tasks.podman_compose',
+    'pypi': 'dev.tasks.pypi',
+    'python': 'dev.tasks.python',
+    'ruby': 'dev.tasks.ruby',
+    'run': 'dev.tasks.run',
+    'rust': 'dev.tasks.rust',
+    'sticky_env': 'dev.tasks.sticky_env',
+}
 
 __all__ = [
     'DockerCompose',
@@ -39,3 +47,12 @@ __all__ = [
     'Rust',
     'StickyEnv',
 ]
+
+
+def __getattr__(name: str) -> Any:
+    from dev.helpers import camel_to_snake
+
+    module_path = registry.get(camel_to_snake(name))
+    if name not in __all__ or not module_path:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    return getattr(import_module(module_path), name)
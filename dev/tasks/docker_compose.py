@@ -32,6 +32,7 @@ class DockerCompose(Task):
         )
     )
     __description__ = 'Manage docker-compose'
+    __depends_on__ = ['homebrew', 'homebrew_cask']
 
     def up(self, args: Optional[dict], extra_args: Optional[Any]) -> None:
         config, service, env = self.parse_args(args)
@@ -39,9 +40,7 @@ class DockerCompose(Task):
         flags = self.flags_from_config(config)
 
         run_command(f'docker-compose {flags} up -d {joined_services}'.strip(), env=env)
-        version = run_command(
-            "docker-compose -v | grep -o '\\d\\+.\\d\\+.\\d\\+'", output=True, silent=True
-        )
+        version = run_command('docker-compose -v', output=True, silent=True, match=r'\d+\.\d+\.\d+')
         ShadowenvHelper.configure_provider('docker-compose', version)
 
     def down(self, args: Optional[dict], extra_args: Optional[Any]) -> None:
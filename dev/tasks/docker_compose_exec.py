@@ -16,6 +16,7 @@ class DockerComposeExec(Task):
         }
     )
     __description__ = 'Run shell commands in docker-compose'
+    __depends_on__ = ['docker_compose']
 
     def up(self, args: Any, extra_args: Optional[Any]) -> None:
         env = args.get('env', {})
@@ -1,16 +1,21 @@
-from typing import Any, Optional
+import re
+import shlex
+from typing import Any, Dict, List, Optional
 
 from schema import Or, Schema
 
 from dev.console import console
-from dev.exceptions import NonZeroReturnCodeError
 from dev.helpers import run_command
+from dev.helpers.versions import satisfies
 from dev.task import Task
 
+gem_pattern = re.compile(r'^(\S+) \((.*)\)$')
+
 
 class Gem(Task):
     __schema__ = Schema(Or(str, [str]))
     __description__ = 'Run gem install'
+    __depends_on__ = ['homebrew', 'ruby']
 
     def up(self, args: Optional[Any], extra_args: Optional[Any]) -> None:
         if not args:
@@ -21,20 +26,33 @@ class Gem(Task):
         else:
             to_install = args
 
-        for pkg in to_install:
-            if self.already_installed(pkg):
-                continue
-            self.install_package(pkg)
-
-    def already_installed(self, package: str) -> bool:
-        try:
-            run_command(f'gem list ^{package}$ --quiet | grep "(" -q', silent=True)
-        except NonZeroReturnCodeError as e:
-            if e.code == 1:
-                return False
-            raise
-        return True
-
-    def install_package(self, package: str) -> None:
-        run_command(f'gem install {package}')
-        console.print(f'gem package [b]{package}[/] installed successfully', style='green')
+        installed = self.list_installed()
+        missing = [pkg for pkg in to_install if not self.already_installed(pkg, installed)]
+        if missing:
+            self.install_packages(missing)
+
+    def list_installed(self) -> Dict[str, List[str]]:
+        # One ruby startup for the whole inventory instead of one per gem
+        output = run_command('gem list --local', output=True, silent=True)
+        installed: Dict[str, List[str]] = {}
+        for line in (output or '').splitlines():
+            # rake (13.0.6, default: 13.0.3)
+            match = gem_pattern.match(line.strip())
+            if match:
+                name, versions = match.groups()
+                # Versions may carry a platform, 1.13.10 x86_64-darwin
+                installed[name] = [
+                    v.replace('default:', '').split()[0] for v in versions.split(',')
+                ]
+        return installed
+
+    def already_installed(self, package: str, installed: Dict[str, List[str]]) -> bool:
+        # rails and rails:~> 7.0 name a gem and a version requirement
+        name, _, requirement = package.partition(':')
+        versions = installed.get(name, [])
+        return any(satisfies(version, requirement) for version in versions)
+
+    def install_packages(self, packages: List[str]) -> None:
+        run_command(f'gem install {" ".join(shlex.quote(p) for p in packages)}')
+        for package in packages:
+            console.print(f'gem package [b]{package}[/] installed successfully', style='green')
@@ -1,4 +1,4 @@
-from typing import Any, Optional
+from typing import Any, List, Optional
 
 from schema import Or, Schema
 
@@ -9,13 +9,17 @@ from dev.task import Task
 class Homebrew(Task):
     __schema__ = Schema(Or(str, [str]))
     __description__ = 'Install formulas on macOS'
+    __depends_on__ = []
 
     def up(self, args: Optional[Any], extra_args: Optional[Any]) -> None:
+        HomebrewHelper.install_formulae(self.formulae(args))
+
+    @classmethod
+    def formulae(cls, args: Optional[Any]) -> List[str]:
         if not args:
-            return
+            return []
 
         if isinstance(args, str):
-            args = [args]
+            return [args]
 
-        for formula in args:
-            HomebrewHelper.install_formula(formula)
+        return args
@@ -9,6 +9,8 @@ from dev.task import Task
 class HomebrewCask(Task):
     __schema__ = Schema(Or(str, [str]))
     __description__ = 'Install cask formulas on macOS'
+    __depends_on__ = []
+    __interactive__ = True
 
     def up(self, args: Optional[Any], extra_args: Optional[Any]) -> None:
         if not args:
@@ -17,5 +19,4 @@ class HomebrewCask(Task):
         if isinstance(args, str):
             args = [args]
 
-        for cask in args:
-            HomebrewHelper.install_cask(cask)
+        HomebrewHelper.install_casks(args)
@@ -1,35 +1,110 @@
-from typing import Any, Optional
+import os
+import tempfile
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from schema import Schema
 
+from dev import environment
 from dev.console import console
-from dev.exceptions import NonZeroReturnCodeError
 from dev.helpers import run_command
+from dev.helpers.fingerprint import Fingerprint
 from dev.task import Task
 
 
+def block_markers(name: str) -> Tuple[str, str]:
+    return f'# BEGIN dev {name}', f'# END dev {name}'
+
+
+def parse_hosts(lines: List[str]) -> Set[Tuple[str, str]]:
+    """Returns the (address, host) pairs of hosts file lines, whatever their spacing."""
+    entries = set()
+    for line in lines:
+        fields = line.split('#', 1)[0].split()
+        for host in fields[1:]:
+            entries.add((fields[0], host))
+    return entries
+
+
+def reconcile(content: str, name: str, hosts: Dict[str, str]) -> str:
+    """Returns the hosts file content with the block managed for name holding the entries of hosts
+    that are not already present elsewhere in the file. An empty hosts removes the block."""
+    begin, end = block_markers(name)
+    lines = content.splitlines()
+
+    outside: List[str] = []
+    block_start: Optional[int] = None
+    inside = False
+    for line in lines:
+        if line.strip() == begin:
+            inside = True
+            block_start = len(outside)
+        elif line.strip() == end and inside:
+            inside = False
+        elif not inside:
+            outside.append(line)
+
+    existing = parse_hosts(outside)
+    block = [
+        f'{address:<20} {host}'
+        for host, address in hosts.items()
+        if (address, host) not in existing
+    ]
+    if block:
+        block = [begin] + block + [end]
+
+    if block_start is None:
+        block_start = len(outside)
+    new_lines = outside[:block_start] + block + outside[block_start:]
+    return '\n'.join(new_lines) + '\n' if new_lines else ''
+
+
 class Hosts(Task):
     __schema__ = Schema({str: str})
     __description__ = 'Configure hosts file'
+    __depends_on__ = []
+    __interactive__ = True
+
+    hosts_filename = '/etc/hosts'
 
     def up(self, args: Optional[Any], extra_args: Optional[Any]) -> None:
         if not args:
             return
+        self.apply(args)
 
-        hosts_to_write = []
+    def down(self, args: Optional[Any], extra_args: Optional[Any]) -> None:
+        if not args:
+            return
+        self.apply({})
 
-        for host, address in args.items():
-            data = f'{address:<20} {host}'
-            try:
-                run_command(f'grep -q "{data}" /etc/hosts', silent=True)
-            except NonZeroReturnCodeError as e:
-                if e.code != 1:
-                    raise
-                hosts_to_write.append(data)
+    def apply(self, hosts: Dict[str, str]) -> None:
+        with open(self.hosts_filename) as fp:
+            content = fp.read()
 
-        if not hosts_to_write:
+        new_content = reconcile(content, environment.name, hosts)
+        if new_content == content:
             return
 
-        data = '\n'.join(hosts_to_write)
-        console.print(f'=> Writing hosts to /etc/hosts:\n{data}', style='blue')
-        run_command(f'echo "{data}" >> /etc/hosts', sudo=True, silent=True)
+        console.print(
+            f'=> Updating hosts of [b]{environment.name}[/] in {self.hosts_filename}', style='blue'
+        )
+        self.write(new_content)
+
+    def write(self, content: str) -> None:
+        # Written next to the hosts file and moved over it, readers never see a partial file
+        fd, tmp_filename = tempfile.mkstemp(prefix='dev-hosts-')
+        try:
+            with os.fdopen(fd, 'w') as fp:
+                fp.write(content)
+            staged_filename = f'{self.hosts_filename}.dev-{os.getpid()}'
+            run_command(
+                f'install -m 644 {tmp_filename} {staged_filename} && '
+                f'mv -f {staged_filename} {self.hosts_filename}',
+                sudo=True,
+                silent=True,
+            )
+        finally:
+            os.unlink(tmp_filename)
+
+    @classmethod
+    def fingerprint(cls, args: Optional[Any], extra_args: Optional[Any]) -> Fingerprint:
+        return Fingerprint(environment.name).add_file(cls.hosts_filename)
@@ -1,10 +1,19 @@
-from dev.tasks.internal.cd import Cd
-from dev.tasks.internal.clone import Clone
-from dev.tasks.internal.help_command import HelpCommand
-from dev.tasks.internal.help_task import HelpTask
-from dev.tasks.internal.init import Init
-from dev.tasks.internal.open import Open
-from dev.tasks.internal.update import Update
+from importlib import import_module
+from typing import Any, Dict
+
+# Maps internal commands (dev cd, dev clone, ...) to the module implementing them, imported on
+# first use. See dev.tasks.registry.
+registry: Dict[str, str] = {
+    'cd': 'dev.tasks.internal.cd',
+    'clone': 'dev.tasks.internal.clone',
+    'help_command': 'dev.tasks.internal.help_command',
+    'help_task': 'dev.tasks.internal.help_task',
+    'init': 'dev.tasks.internal.init',
+    'open': 'dev.tasks.internal.open',
+    'stats': 'dev.tasks.internal.stats',
+    'sync': 'dev.tasks.internal.sync',
+    'update': 'dev.tasks.internal.update',
+}
 
 __all__ = [
     'Cd',
@@ -13,5 +22,16 @@ __all__ = [
     'HelpTask',
     'Open',
     'Init',
+    'Stats',
+    'Sync',
     'Update',
 ]
+
+
+def __getattr__(name: str) -> Any:
+    from dev.helpers import camel_to_snake
+
+    module_path = registry.get(camel_to_snake(name))
+    if name not in __all__ or not module_path:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    return getattr(import_module(module_path), name)
@@ -1,15 +1,17 @@
 import os
 import re
 import sys
+import time
 from pathlib import Path
-from typing import Generator, List, Optional
+from typing import Generator, List, Optional, Tuple
 
-from rich.prompt import IntPrompt
-from rich.table import Table
 from schema import Schema
 
 from dev.console import console, error_console
+from dev.helpers.frecency import Frecency
+from dev.helpers.fuzzy import Matcher, clear_winner
 from dev.helpers.parent_shell import ParentShellHelper
+from dev.helpers.repository_index import RepositoryIndex
 from dev.task import InternalTask
 
 repo_pattern = re.compile(r'[a-zA-Z0-9\-\_\.]+')
@@ -30,6 +32,11 @@ class SearchEntry:
             f'{Cd.base_path}/{self.host or str()}/{self.organization or str()}/{self.repository or str()}'
         )
 
+    @property
+    def key(self) -> str:
+        # Identifies the repository independently of where the checkouts live
+        return '/'.join(filter(None, (self.host, self.organization, self.repository)))
+
 
 class Cd(InternalTask):
     __schema__ = Schema([str])
@@ -47,29 +54,44 @@ class Cd(InternalTask):
             self.list_entries(self.base_path), key=lambda e: e.repository.lower()
         )
 
+        frecency = Frecency('cd')
+
         if not args or len(args) < 1:
             selectable_entries = search_entries
             selected_index = self.render_table(search_entries)
         else:
             arg = args[0]
             selected_index = 1
-            search_pattern = re.compile(f'.*{re.escape(arg)}.*')
+            ranked = self.rank(arg, search_entries, frecency)
 
-            selectable_entries = [
-                entry for entry in search_entries if self.match_search_term(entry, search_pattern)
-            ]
-            if len(selectable_entries) == 0:
+            if len(ranked) == 0:
                 error_console.print(
                     f'Could not find any repositories matching [b]{arg}[/]', style='red'
                 )
                 sys.exit(1)
 
-            if len(selectable_entries) > 1:
+            selectable_entries = [search_entries[index] for _, index in ranked]
+            if not clear_winner(ranked):
                 selected_index = self.render_table(selectable_entries)
 
-        ParentShellHelper.run(f'cd {selectable_entries[selected_index - 1].path}')
+        selected_entry = selectable_entries[selected_index - 1]
+        frecency.record(selected_entry.key)
+        ParentShellHelper.run(f'cd {selected_entry.path}')
+
+    def rank(
+        self, arg: str, entries: List[SearchEntry], frecency: Frecency
+    ) -> List[Tuple[float, int]]:
+        now = time.time()
+        return Matcher(arg).rank(
+            [(entry.repository, entry.organization or '', entry.host or '') for entry in entries],
+            lambda index: frecency.boost(entries[index].key, now),
+        )
 
     def render_table(self, entries: List[SearchEntry], default_selection: int = 1) -> int:
+        # Imported here to keep rich out of the common path where a single repository matches
+        from rich.prompt import IntPrompt
+        from rich.table import Table
+
         console.print('Found multiple matches, select which one you meant:', style='blue')
 
         table = Table(show_header=True, header_style="bold")
@@ -91,47 +113,7 @@ class Cd(InternalTask):
 
         return selected_index
 
-    def match_search_term(
-        self, entry: SearchEntry, search_pattern: re.Pattern
-    ) -> Optional[re.Match]:
-        return search_pattern.match(entry.repository)
-
-    def is_git_repo(self, path: Path) -> bool:
-        return (path / self.git_identifier).is_dir()
-
-    def list_entries(
-        self, parent: Path, grand_parent: Optional[Path] = None, level: int = 0
-    ) -> Generator[SearchEntry, None, None]:
-        level += 1
-        for child in Path(parent).iterdir():
-            if not child.is_dir():
-                continue
-
-            if not self.is_git_repo(child):
-                yield from self.list_entries(parent=child, grand_parent=parent, level=level)
-                continue
-
-            parent_dir = os.path.basename(parent)
-            child_dir = os.path.basename(child)
-
-            if level == 1:
-                # Repository without host and organization (src/repository-name)
-                # grand_parent_dir = None
-                #       parent_dir = src
-                #        child_dir = repository-name
-                yield SearchEntry(repository=child_dir)
-            elif level == 2:
-                # Repository without organization (src/example.com/repository-name)
-                # grand_parent_dir = src
-                #       parent_dir = example.com
-                #        child_dir = repository-name
-                yield SearchEntry(repository=child_dir, host=parent_dir)
-            elif level == 3:
-                # Repository with organization (src/example.com/company/repository-name)
-                # grand_parent_dir = example.com
-                #       parent_dir = company
-                #        child_dir = repository-name
-                grand_parent_dir = os.path.basename(str(grand_parent))
-                yield SearchEntry(
-                    repository=child_dir, host=grand_parent_dir, organization=parent_dir
-                )
+    def list_entries(self, parent: Path) -> Generator[SearchEntry, None, None]:
+        index = RepositoryIndex(str(parent), self.git_identifier).refresh()
+        for repository, host, organization in index.repositories():
+            yield SearchEntry(repository=repository, host=host, organization=organization)
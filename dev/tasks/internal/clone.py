@@ -1,21 +1,36 @@
+import asyncio
 import os
 import re
+import shlex
 from pathlib import Path
-from typing import Any, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
-from docopt import DocoptExit
+from docopt import DocoptExit, docopt
 from schema import Schema
 
-from dev.console import console
-from dev.exceptions import TaskError
-from dev.helpers import run_command
+from dev.console import console, error_console
+from dev.exceptions import NonZeroReturnCodeError, TaskError
+from dev.helpers import Capture, run_command
+from dev.helpers.async_command import limit_concurrent_commands, run_command_async
 from dev.helpers.git import GitHelper
 from dev.helpers.parent_shell import ParentShellHelper
+from dev.helpers.repository_index import RepositoryIndex
 from dev.task import InternalTask
 
 repo_pattern = re.compile(r'^[a-zA-Z0-9\-\_\.]+$')
 org_and_repo_pattern = re.compile(r'^([a-zA-Z0-9\-\_\.]+)/([a-zA-Z0-9\-\_\.]+)$')
 
+usage = """
+Usage:
+  clone [--jobs=<n>] [--filter=<spec>] [--reference=<dir>] [--manifest=<file>] [<repository>...]
+
+Options:
+  --jobs=<n>         Repositories cloned at the same time [default: 8]
+  --filter=<spec>    Partial clone, e.g. blob:none to fetch file contents on demand
+  --reference=<dir>  Borrow objects from a local repository used as an object cache
+  --manifest=<file>  Clone the repositories listed in a file, one per line
+"""
+
 
 class Clone(InternalTask):
     __schema__ = Schema([str])
@@ -24,19 +39,102 @@ class Clone(InternalTask):
     base_path: Path = Path(f"{os.environ['HOME']}/src")
 
     def up(self, args: Optional[Any], extra_args: Optional[Any]) -> None:
-        if not args or len(args) < 1 or len(args) > 1:
+        options = docopt(usage, argv=args or [], help=False)
+        repositories = options['<repository>']
+        if options['--manifest']:
+            repositories += self.read_manifest(options['--manifest'])
+        if not repositories:
             raise DocoptExit
 
-        clone_url, clone_dir = self.parse_arg(args[0])
+        clone_options = ''
+        if options['--filter']:
+            clone_options += f" --filter={shlex.quote(options['--filter'])}"
+        if options['--reference']:
+            # Clones still work, only slower, when the object cache is missing
+            clone_options += f" --reference-if-able={shlex.quote(options['--reference'])}"
+
+        if len(repositories) > 1 or options['--manifest']:
+            if not options['--jobs'].isdigit():
+                raise DocoptExit
+            self.clone_many(repositories, clone_options, int(options['--jobs']))
+            return
+
+        clone_url, clone_dir = self.parse_arg(repositories[0])
 
         if os.path.isdir(clone_dir):
             console.print(f'Already cloned in {clone_dir}')
         else:
             GitHelper.setup_config()
-            run_command(f'git clone {clone_url} {clone_dir}')
+            run_command(f'git clone{clone_options} {clone_url} {clone_dir}')
+            RepositoryIndex(str(self.base_path)).add(clone_dir)
 
         ParentShellHelper.run(f'cd {clone_dir}')
 
+    def read_manifest(self, filename: str) -> List[str]:
+        try:
+            with open(filename) as fp:
+                lines = [line.split('#', 1)[0].strip() for line in fp]
+        except OSError as e:
+            raise TaskError(f'Could not read manifest {filename}: {e.strerror}')
+        return [line for line in lines if line]
+
+    def clone_many(self, repositories: List[str], clone_options: str, jobs: int) -> None:
+        """Clone repositories concurrently, reporting each one as it finishes."""
+        clones: Dict[str, str] = {}
+        for repository in repositories:
+            clone_url, clone_dir = self.parse_arg(repository)
+            if os.path.isdir(clone_dir):
+                console.print(f'Already cloned in {clone_dir}')
+            else:
+                clones[clone_dir] = clone_url
+        if not clones:
+            return
+
+        GitHelper.setup_config()
+        index = RepositoryIndex(str(self.base_path))
+        failures: List[str] = []
+
+        console.print(f'Cloning {len(clones)} repositories, {jobs} at a time', style='blue')
+
+        async def clone_all() -> None:
+            limit_concurrent_commands(jobs)
+            clones_started = [
+                self.clone_quietly(url, clone_dir, clone_options)
+                for clone_dir, url in clones.items()
+            ]
+            for done, clone in enumerate(asyncio.as_completed(clones_started), 1):
+                clone_dir, error = await clone
+                progress = f'\\[{done}/{len(clones)}]'
+                if error is None:
+                    index.add(clone_dir)
+                    console.print(f'{progress} Cloned {clone_dir}')
+                else:
+                    failures.append(clone_dir)
+                    error_console.print(
+                        f'{progress} Failed to clone {clone_dir}: {error}', style='red'
+                    )
+
+        asyncio.run(clone_all())
+
+        if failures:
+            raise TaskError(f'Failed to clone {len(failures)} of {len(clones)} repositories')
+
+    async def clone_quietly(
+        self, clone_url: str, clone_dir: str, clone_options: str
+    ) -> Tuple[str, Optional[str]]:
+        # Progress of concurrent clones would interleave, only the last lines are kept to explain
+        # a failure
+        capture = Capture(tail=3)
+        try:
+            await run_command_async(
+                f'git clone --quiet{clone_options} {clone_url} {clone_dir} 2>&1',
+                silent=True,
+                capture=capture,
+            )
+        except NonZeroReturnCodeError as e:
+            return clone_dir, capture.value or f'exit code {e.code}'
+        return clone_dir, None
+
     def parse_arg(self, arg: str) -> Tuple[str, str]:
         repo_match = repo_pattern.match(arg)
         if repo_match:
@@ -5,6 +5,7 @@ from schema import Or, Schema
 
 from dev.config import config
 from dev.console import console
+from dev.helpers import import_tasks
 from dev.task import InternalTask
 
 
@@ -22,6 +23,7 @@ class HelpCommand(InternalTask):
         table.add_row('up', 'Setup your local environment')
         table.add_row('down', 'Shutdown your local environment')
 
+        import_tasks()
         for command, desc in InternalTask.subclasses():
             if command.startswith('help_'):
                 continue
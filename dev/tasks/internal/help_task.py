@@ -4,6 +4,7 @@ from rich.table import Table
 from schema import Or, Schema
 
 from dev.console import console
+from dev.helpers import import_tasks
 from dev.task import InternalTask, Task
 
 
@@ -18,6 +19,7 @@ class HelpTask(InternalTask):
         table.add_column('Task')
         table.add_column('Description')
 
+        import_tasks()
         for name, description in Task.subclasses():
             if name in InternalTask.tasks():
                 continue
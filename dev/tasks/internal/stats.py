@@ -0,0 +1,149 @@
+import math
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from docopt import DocoptExit, docopt
+from schema import Schema
+
+from dev import environment
+from dev.console import console
+from dev.helpers.run_history import COMMAND, FAILED, SKIPPED, TASK, RunHistoryHelper
+from dev.task import InternalTask
+
+usage = """
+Usage:
+  stats [--days=<n>] [--limit=<n>]
+
+Options:
+  --days=<n>     Days of runs shown, compared with the days before them [default: 7]
+  --limit=<n>    Tasks listed, slowest first [default: 15]
+"""
+
+# Changes of the median below this many percent are noise, not a trend
+TREND_THRESHOLD = 10
+
+
+def percentile(durations: List[float], percent: float) -> float:
+    # Nearest rank, durations must be sorted
+    return durations[max(0, math.ceil(percent / 100 * len(durations)) - 1)]
+
+
+def format_duration(duration_ms: float) -> str:
+    if duration_ms < 1000:
+        return f'{duration_ms:.0f} ms'
+    if duration_ms < 60_000:
+        return f'{duration_ms / 1000:.1f} s'
+    minutes, seconds = divmod(round(duration_ms / 1000), 60)
+    return f'{minutes}m {seconds:02d}s'
+
+
+def format_trend(recent: List[float], previous: List[float]) -> str:
+    if not recent or not previous:
+        return ''
+    baseline = percentile(previous, 50)
+    if not baseline:
+        return ''
+    change = (percentile(recent, 50) - baseline) / baseline * 100
+    if change > TREND_THRESHOLD:
+        return f'[red]{change:+.0f}%[/]'
+    if change < -TREND_THRESHOLD:
+        return f'[green]{change:+.0f}%[/]'
+    return f'{change:+.0f}%'
+
+
+class Timings:
+    """Durations and outcomes of the runs of one command or task."""
+
+    def __init__(self) -> None:
+        self.recent: List[float] = []
+        self.previous: List[float] = []
+        self.runs = 0
+        self.failed = 0
+
+    def add(self, duration_ms: float, outcome: str, recent: bool) -> None:
+        if recent:
+            self.runs += 1
+            self.failed += outcome == FAILED
+        # A skipped task says nothing about how long it takes to run
+        if outcome != SKIPPED:
+            (self.recent if recent else self.previous).append(duration_ms)
+
+    def row(self) -> List[str]:
+        self.recent.sort()
+        self.previous.sort()
+        p50 = format_duration(percentile(self.recent, 50)) if self.recent else ''
+        p95 = format_duration(percentile(self.recent, 95)) if self.recent else ''
+        return [
+            str(self.runs),
+            str(self.failed or ''),
+            p50,
+            p95,
+            format_trend(self.recent, self.previous),
+        ]
+
+    @property
+    def slowest(self) -> float:
+        return percentile(sorted(self.recent), 95) if self.recent else 0
+
+
+class Stats(InternalTask):
+    __schema__ = Schema([str])
+    __description__ = 'Show how long commands and tasks took over time'
+
+    def up(self, args: Optional[Any], extra_args: Optional[Any]) -> None:
+        options = docopt(usage, argv=args or [], help=False)
+        if not options['--days'].isdigit() or not options['--limit'].isdigit():
+            raise DocoptExit
+        days = max(1, int(options['--days']))
+        limit = int(options['--limit'])
+
+        since = time.time() - days * 86400
+        commands: Dict[str, Timings] = defaultdict(Timings)
+        tasks: Dict[Tuple[str, str], Timings] = defaultdict(Timings)
+        for started, _, kind, name, arguments, duration_ms, outcome in RunHistoryHelper.runs(
+            since - days * 86400
+        ):
+            if kind == COMMAND:
+                timings = commands[name]
+            elif kind == TASK:
+                timings = tasks[(name, arguments)]
+            else:
+                continue
+            timings.add(duration_ms, outcome, started >= since)
+
+        name = getattr(environment, 'name', 'unknown')
+        if not any(timings.runs for timings in commands.values()):
+            console.print(f'No runs of [b]{name}[/] in the last {days} days', style='yellow')
+            return
+
+        self.render_commands(commands, name, days)
+        self.render_tasks(tasks, limit)
+
+    def render_commands(self, commands: Dict[str, Timings], name: str, days: int) -> None:
+        table = self.table(f'Commands of {name} in the last {days} days', 'Command')
+        table.caption = f'Trend compares the median with the {days} days before'
+        for command, timings in sorted(commands.items()):
+            if timings.runs:
+                table.add_row(command, *timings.row())
+        console.print(table)
+
+    def render_tasks(self, tasks: Dict[Tuple[str, str], Timings], limit: int) -> None:
+        table = self.table('Slowest tasks', 'Task')
+        table.add_column('Arguments', overflow='ellipsis', max_width=40)
+        ranked = sorted(tasks.items(), key=lambda item: item[1].slowest, reverse=True)
+        for (task, arguments), timings in [item for item in ranked if item[1].runs][:limit]:
+            table.add_row(task, *timings.row(), arguments)
+        console.print(table)
+
+    def table(self, title: str, name: str) -> Any:
+        from rich.table import Table
+
+        table = Table(title=title, show_header=True, header_style='bold')
+        table.add_column(name)
+        table.add_column('Runs', justify='right')
+        table.add_column('Failed', justify='right', style='red')
+        table.add_column('p50', justify='right')
+        table.add_column('p95', justify='right')
+        table.add_column('Trend', justify='right')
+        return table
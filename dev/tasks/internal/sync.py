@@ -0,0 +1,162 @@
+import os
+import signal
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, List, Optional, Tuple
+
+from docopt import DocoptExit, docopt
+from schema import Schema
+
+from dev import environment
+from dev.console import console
+from dev.exceptions import TaskError
+from dev.helpers.git_metadata import GitMetadata, UnsupportedLayout
+from dev.helpers.repository_index import RepositoryIndex
+from dev.task import InternalTask
+from dev.tasks.internal.cd import Cd, SearchEntry
+
+usage = """
+Usage:
+  sync [--jobs=<n>] [--timeout=<seconds>]
+
+Options:
+  --jobs=<n>             Repositories fetched at the same time [default: 16]
+  --timeout=<seconds>    Time allowed for each repository [default: 120]
+"""
+
+UP_TO_DATE = 'up to date'
+UPDATED = 'updated'
+FETCHED = 'fetched'
+FAILED = 'failed'
+
+# (path, status, details) of a synced repository
+SyncResult = Tuple[str, str, str]
+
+
+class GitTimeout(Exception):
+    ...
+
+
+def git(path: str, *args: str, timeout: float) -> Tuple[int, str]:
+    # A new session lets a timeout kill git together with the ssh it started, prompting for
+    # credentials would hang until the timeout
+    process = subprocess.Popen(
+        ('git', '-C', path, *args),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        env=dict(environment.env, GIT_TERMINAL_PROMPT='0'),
+        start_new_session=True,
+    )
+    try:
+        output, _ = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.communicate()
+        raise GitTimeout
+    return process.returncode, output.decode(errors='replace').strip()
+
+
+def default_branch(metadata: GitMetadata) -> Optional[str]:
+    remote_head = metadata.symbolic_ref('refs/remotes/origin/HEAD')
+    if remote_head:
+        return remote_head[len('refs/remotes/origin/') :]
+    for branch in ('main', 'master'):
+        if metadata.resolve(f'refs/remotes/origin/{branch}'):
+            return branch
+    return None
+
+
+class Sync(InternalTask):
+    __schema__ = Schema([str])
+    __description__ = 'Fetch every repository and fast-forward their default branch'
+
+    def up(self, args: Optional[Any], extra_args: Optional[Any]) -> None:
+        options = docopt(usage, argv=args or [], help=False)
+        if not options['--jobs'].isdigit() or not options['--timeout'].isdigit():
+            raise DocoptExit
+        jobs = max(1, int(options['--jobs']))
+        timeout = int(options['--timeout'])
+
+        index = RepositoryIndex(str(Cd.base_path), Cd.git_identifier).refresh()
+        paths = sorted(SearchEntry(*repository).path for repository in index.repositories())
+        results: List[SyncResult] = []
+
+        # Wall time is bounded by the slowest repositories of each batch of jobs, not their count
+        with console.status(f'Syncing {len(paths)} repositories') as status:
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                futures = [executor.submit(self.sync, path, timeout) for path in paths]
+                for done, future in enumerate(as_completed(futures), 1):
+                    results.append(future.result())
+                    status.update(f'Syncing {len(paths)} repositories ({done} done)')
+
+        self.render_summary(sorted(results))
+
+        failed = sum(1 for _, status, _ in results if status == FAILED)
+        if failed:
+            raise TaskError(f'Failed to sync {failed} of {len(results)} repositories')
+
+    def sync(self, path: str, timeout: float) -> SyncResult:
+        try:
+            exit_code, output = git(path, 'fetch', '--quiet', '--prune', 'origin', timeout=timeout)
+            if exit_code != 0:
+                return (path, FAILED, output.splitlines()[-1] if output else 'git fetch failed')
+            return self.fast_forward(path, timeout)
+        except GitTimeout:
+            return (path, FAILED, f'timed out after {timeout}s')
+        except (UnsupportedLayout, OSError) as e:
+            return (path, FAILED, str(e))
+
+    def fast_forward(self, path: str, timeout: float) -> SyncResult:
+        # Read after the fetch, the metadata is current
+        metadata = GitMetadata(path)
+        branch = default_branch(metadata)
+        if not branch:
+            return (path, FETCHED, 'no default branch on origin')
+
+        upstream = metadata.resolve(f'refs/remotes/origin/{branch}')
+        if metadata.resolve('HEAD') == upstream:
+            return (path, UP_TO_DATE, '')
+        if metadata.current_branch() != branch:
+            return (path, FETCHED, f'on {metadata.current_branch() or "detached HEAD"}')
+
+        exit_code, behind = git(
+            path, 'rev-list', '--count', f'HEAD..origin/{branch}', timeout=timeout
+        )
+        if exit_code == 0 and behind == '0':
+            # Local commits on top of origin, nothing to pull
+            return (path, FETCHED, f'{branch} is ahead of origin, not pushed')
+
+        _, changes = git(path, 'status', '--porcelain', '--untracked-files=no', timeout=timeout)
+        if changes:
+            return (path, FETCHED, f'{branch} has local changes')
+
+        exit_code, _ = git(
+            path, 'merge', '--ff-only', '--quiet', f'origin/{branch}', timeout=timeout
+        )
+        if exit_code != 0:
+            return (path, FETCHED, f'{branch} has diverged from origin')
+        return (path, UPDATED, f'{branch} fast-forwarded {behind} commits')
+
+    def render_summary(self, results: List[SyncResult]) -> None:
+        from rich.table import Table
+
+        up_to_date = sum(1 for _, status, _ in results if status == UP_TO_DATE)
+        table = Table(
+            show_header=True,
+            header_style="bold",
+            caption=f'{up_to_date} of {len(results)} repositories already up to date',
+        )
+        table.add_column("Repository")
+        table.add_column("Status")
+        table.add_column("Details")
+
+        styles = {UPDATED: 'green', FETCHED: 'yellow', FAILED: 'red'}
+        for path, status, details in results:
+            if status == UP_TO_DATE:
+                continue
+            table.add_row(
+                os.path.relpath(path, Cd.base_path), status, details, style=styles.get(status)
+            )
+
+        console.print(table)
@@ -1,11 +1,12 @@
 import os
-from typing import Any, Optional
+from typing import Any, List, Optional
 
 from schema import Schema
 
 from dev import environment
 from dev.console import console
 from dev.helpers import run_command
+from dev.helpers.fingerprint import Fingerprint
 from dev.helpers.hash_cache import HashCacheHelper
 from dev.helpers.homebrew import HomebrewHelper
 from dev.task import Task
@@ -20,13 +21,13 @@ class Mkcert(Task):
         }
     )
     __description__ = 'Generate self-signed certificates'
+    __depends_on__ = ['homebrew']
 
     def up(self, args: Optional[Any], extra_args: Optional[Any]) -> None:
         if not args:
             return
 
-        HomebrewHelper.install_formula('nss')
-        HomebrewHelper.install_formula('mkcert')
+        HomebrewHelper.install_formulae(self.formulae(args))
         run_command('mkcert -install', silent=True)
 
         if not args['names']:
@@ -51,3 +52,14 @@ class Mkcert(Task):
             ...
 
         run_command(f'mkcert -cert-file {crt} -key-file {key} {joined_names}')
+
+    @classmethod
+    def formulae(cls, args: Optional[Any]) -> List[str]:
+        return ['nss', 'mkcert'] if args else []
+
+    @classmethod
+    def fingerprint(cls, args: Optional[Any], extra_args: Optional[Any]) -> Optional[Fingerprint]:
+        if not args:
+            return None
+
+        return Fingerprint().add_tool('mkcert').add_file(args['key']).add_file(args['crt'])
@@ -1,10 +1,13 @@
 import os
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import jinja2
 from schema import Schema
 
+from dev import environment
+from dev.exceptions import NonZeroReturnCodeError, TaskError
 from dev.helpers import run_command
+from dev.helpers.files import atomic_write
 from dev.helpers.homebrew import HomebrewHelper
 from dev.task import Task
 
@@ -16,47 +19,122 @@ class Nginx(Task):
         }
     )
     __description__ = 'Configure and control nginx'
+    __depends_on__ = ['homebrew', 'hosts', 'mkcert']
+    __interactive__ = True
+
+    sudoers_path = '/private/etc/sudoers.d'
 
     def up(self, args: Optional[Any], extra_args: Optional[Any]) -> None:
         if not args:
             return
 
         HomebrewHelper.install_formula('nginx')
-        homebrew_prefix = run_command('brew --prefix', silent=True, output=True)
+        homebrew_prefix = HomebrewHelper.prefix()
+
+        previous = self.write_sites(args['sites'], f'{homebrew_prefix}/etc/nginx/servers')
+
+        self.install_sudoers(homebrew_prefix)
+
+        if not self.running(homebrew_prefix):
+            # Stop nginx if it is running as the user, we need root to bind 80 and 443
+            run_command('brew services stop nginx', silent=True, ok_exit_codes=[0, 1])
+            run_command('brew services stop nginx', sudo=True, wrap_sudo_in_shell=False)
+            run_command('brew services start nginx', sudo=True, wrap_sudo_in_shell=False)
+            return
+
+        if not previous:
+            return
 
-        template_loader = jinja2.FileSystemLoader(searchpath=".")
-        template_env = jinja2.Environment(loader=template_loader)
+        try:
+            run_command(f'{homebrew_prefix}/bin/nginx -t', sudo=True, wrap_sudo_in_shell=False)
+        except NonZeroReturnCodeError:
+            for filename, content in previous.items():
+                self.replace_file(filename, content)
+            raise TaskError('nginx rejected the new configuration, the previous one was restored')
 
-        for site in args['sites']:
+        # Graceful, running connections are served by the old workers until they finish
+        run_command(f'{homebrew_prefix}/bin/nginx -s reload', sudo=True, wrap_sudo_in_shell=False)
+
+    def write_sites(self, sites: List[str], servers_path: str) -> Dict[str, Optional[str]]:
+        """Render the site templates into servers_path, writing only the files whose content
+        changed. Returns the previous content of the written files, None for new ones."""
+        template_env = jinja2.Environment(
+            loader=jinja2.FileSystemLoader(searchpath='.'), bytecode_cache=self.bytecode_cache()
+        )
+
+        previous: Dict[str, Optional[str]] = {}
+        for site in sites:
             template = template_env.get_template(site)
             output = template.render(**self.get_variables(site))
 
-            filename = os.path.basename(site)
-            with open(f'{homebrew_prefix}/etc/nginx/servers/{filename}', 'w+') as fp:
-                fp.write(output)
+            filename = f'{servers_path}/{os.path.basename(site)}'
+            try:
+                with open(filename) as fp:
+                    current: Optional[str] = fp.read()
+            except FileNotFoundError:
+                current = None
+            if current == output:
+                continue
 
-        self.install_sudoers(homebrew_prefix)
+            self.replace_file(filename, output)
+            previous[filename] = current
+        return previous
+
+    def replace_file(self, filename: str, content: Optional[str]) -> None:
+        if content is None:
+            os.unlink(filename)
+            return
+        # Replaced atomically, nginx never reads a partially written file
+        atomic_write(filename, content)
+
+    @staticmethod
+    def bytecode_cache() -> Optional[jinja2.BytecodeCache]:
+        directory = f'{environment.cache_path}/jinja2'
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except OSError:
+            # Templates are compiled on every run instead
+            return None
+        return jinja2.FileSystemBytecodeCache(directory)
 
-        # Stop nginx if it is running as the user, we need root to bind 80 and 443
-        run_command('brew services stop nginx', silent=True, ok_exit_codes=[0, 1])
-        run_command('brew services stop nginx', sudo=True, wrap_sudo_in_shell=False)
-        run_command('brew services start nginx', sudo=True, wrap_sudo_in_shell=False)
+    @staticmethod
+    def running(homebrew_prefix: str) -> bool:
+        try:
+            with open(f'{homebrew_prefix}/var/run/nginx.pid') as fp:
+                pid = int(fp.read().strip())
+            os.kill(pid, 0)
+        except PermissionError:
+            # Running as root, which is how it should run
+            return True
+        except (OSError, ValueError):
+            return False
+        # Running as the user, it can not bind 80 and 443
+        return False
+
+    @classmethod
+    def formulae(cls, args: Optional[Any]) -> List[str]:
+        return ['nginx'] if args else []
 
     def install_sudoers(self, homebrew_prefix) -> None:
-        sudoers_target = '/private/etc/sudoers.d/brew_services_nginx'
-        if os.path.exists(sudoers_target):
-            return
+        # Named after what it allows, installs made before nginx was reloaded lack -t and -s
+        sudoers_target = f'{self.sudoers_path}/dev_nginx'
+        if not os.path.exists(sudoers_target):
+            with open('/tmp/dev_nginx', 'w+') as fp:
+                for command in [
+                    'brew services stop nginx',
+                    'brew services start nginx',
+                    'nginx -t',
+                    'nginx -s reload',
+                ]:
+                    fp.write(f'%staff ALL=(root) NOPASSWD: {homebrew_prefix}/bin/{command}\n')
 
-        with open('/tmp/brew_services_nginx', 'w+') as fp:
-            fp.write(
-                f'%staff ALL=(root) NOPASSWD: {homebrew_prefix}/bin/brew services stop nginx\n'
-            )
-            fp.write(
-                f'%staff ALL=(root) NOPASSWD: {homebrew_prefix}/bin/brew services start nginx\n'
-            )
+            run_command('chown root /tmp/dev_nginx', sudo=True)
+            run_command(f'mv /tmp/dev_nginx {sudoers_target}', sudo=True)
 
-        run_command('chown root /tmp/brew_services_nginx', sudo=True)
-        run_command(f'mv /tmp/brew_services_nginx {sudoers_target}', sudo=True)
+        # Written by earlier versions, dev_nginx allows everything it did
+        legacy_target = f'{self.sudoers_path}/brew_services_nginx'
+        if os.path.exists(legacy_target):
+            run_command(f'rm -f {legacy_target}', sudo=True)
 
     def get_variables(self, site: str) -> Dict[str, Any]:
         return {
@@ -1,23 +1,26 @@
 import os
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional
 
 from schema import Schema
 
 from dev import environment
 from dev.helpers import run_command
+from dev.helpers.fingerprint import Fingerprint
 from dev.helpers.homebrew import HomebrewHelper
-from dev.helpers.shadowenv import (
-    SHADOWENV_CONFIG_DIRECTORY,
-    ShadowenvHelper,
-    ensure_shadowenv_installed,
-)
+from dev.helpers.probe import ProbeHelper
+from dev.helpers.shadowenv import SHADOWENV_CONFIG_DIRECTORY, ShadowenvHelper
 from dev.task import Task
 
 
 class Node(Task):
     __schema__ = Schema(str)
     __description__ = 'Install a specific Node version'
+    __depends_on__ = ['homebrew']
+
+    ROOT_PROBE: Dict[str, Any] = dict(
+        command='nodenv root', tool='nodenv', env_names=['NODENV_ROOT']
+    )
 
     def init(self, version: str) -> None:
         self.node_path = self.get_node_path(version)
@@ -45,6 +48,28 @@ class Node(Task):
 
         self.init(version)
 
+    @classmethod
+    def formulae(cls, args: Optional[Any]) -> List[str]:
+        return ['nodenv'] if args else []
+
+    @classmethod
+    def fingerprint(cls, args: Optional[Any], extra_args: Optional[Any]) -> Optional[Fingerprint]:
+        if not args:
+            return None
+
+        return (
+            Fingerprint()
+            .add_tool('nodenv')
+            .add_file('.node-version')
+            .add_file(str(cls.get_node_path(args)))
+            .add_file(f'{SHADOWENV_CONFIG_DIRECTORY}/500_node.lisp')
+            .add_file(f'{SHADOWENV_CONFIG_DIRECTORY}/600_node_modules.lisp')
+        )
+
+    @classmethod
+    def restore(cls, args: Optional[Any], extra_args: Optional[Any]) -> None:
+        environment.prepend_path(f'{cls.get_node_path(args)}/bin')
+
     def install_node(self, version: str) -> None:
         if self.node_already_installed:
             return
@@ -59,15 +84,19 @@ class Node(Task):
     def node_already_installed(self) -> bool:
         return os.path.isdir(self.node_path)
 
-    def get_node_path(self, version: str) -> Path:
-        prefix = run_command('nodenv root', output=True, silent=True)
+    @classmethod
+    def probes(cls, args: Optional[Any]) -> List[Dict[str, Any]]:
+        return [cls.ROOT_PROBE]
+
+    @classmethod
+    def get_node_path(cls, version: str) -> Path:
+        prefix = ProbeHelper.output(**cls.ROOT_PROBE)
         return Path(f'{prefix}/versions/{version}')
 
     @classmethod
-    @ensure_shadowenv_installed
     def add_node_modules_bin_to_path(cls) -> None:
-        with open(f'{SHADOWENV_CONFIG_DIRECTORY}/600_node_modules.lisp', 'w+') as fp:
-            fp.write('(env/set "NODE_MODULES_PATH" "node_modules")\n')
-            fp.write(
-                '(env/prepend-to-pathlist "PATH" (path-concat (env/get "NODE_MODULES_PATH") ".bin"))\n'
-            )
+        ShadowenvHelper.stage(
+            '600_node_modules.lisp',
+            '(env/set "NODE_MODULES_PATH" "node_modules")\n'
+            '(env/prepend-to-pathlist "PATH" (path-concat (env/get "NODE_MODULES_PATH") ".bin"))\n',
+        )
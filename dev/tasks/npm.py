@@ -1,16 +1,25 @@
-from typing import Any, Optional
+import json
+import shlex
+from typing import Any, Dict, List, Optional, Tuple
 
 from schema import Or, Schema
 
 from dev.console import console
-from dev.exceptions import NonZeroReturnCodeError
 from dev.helpers import run_command
+from dev.helpers.versions import satisfies
 from dev.task import Task
 
 
+def split_package(package: str) -> Tuple[str, str]:
+    # typescript@^4.9 and @angular/cli@15 name a package and a version range
+    name, separator, version_range = package[1:].partition('@')
+    return package[0] + name, version_range if separator else ''
+
+
 class Npm(Task):
     __schema__ = Schema(Or(str, [str]))
     __description__ = 'Run npm install -g'
+    __depends_on__ = ['homebrew', 'node']
 
     def up(self, args: Optional[Any], extra_args: Optional[Any]) -> None:
         if not args:
@@ -21,20 +30,29 @@ class Npm(Task):
         else:
             to_install = args
 
-        for pkg in to_install:
-            if self.already_installed(pkg):
-                continue
-            self.install_package(pkg)
+        installed = self.list_installed()
+        missing = [pkg for pkg in to_install if not self.already_installed(pkg, installed)]
+        if missing:
+            self.install_packages(missing)
 
-    def already_installed(self, package: str) -> bool:
+    def list_installed(self) -> Dict[str, str]:
+        # One npm startup for the whole inventory instead of one per package
+        output = run_command(
+            'npm ls -g --json --depth=0', output=True, silent=True, ok_exit_codes=[0, 1]
+        )
         try:
-            run_command(f'npm list -g {package}', silent=True)
-        except NonZeroReturnCodeError as e:
-            if e.code == 1:
-                return False
-            raise
-        return True
-
-    def install_package(self, package: str) -> None:
-        run_command(f'npm install -g {package}')
-        console.print(f'npm package [b]{package}[/] installed successfully', style='green')
+            dependencies = json.loads(output or '{}').get('dependencies', {})
+        except ValueError:
+            dependencies = {}
+        return {name: dependency.get('version', '') for name, dependency in dependencies.items()}
+
+    def already_installed(self, package: str, installed: Dict[str, str]) -> bool:
+        name, version_range = split_package(package)
+        if name not in installed:
+            return False
+        return satisfies(installed[name], version_range)
+
+    def install_packages(self, packages: List[str]) -> None:
+        run_command(f'npm install -g {" ".join(shlex.quote(p) for p in packages)}')
+        for package in packages:
+            console.print(f'npm package [b]{package}[/] installed successfully', style='green')
@@ -1,42 +1,202 @@
+import glob
 import os
-from typing import Any, Optional
+import re
+import shlex
+import shutil
+from typing import Any, Dict, List, Optional, Tuple
 
 from schema import Or, Schema
 
+from dev import environment
 from dev.console import console
 from dev.exceptions import TaskError
 from dev.helpers import run_command
+from dev.helpers.fingerprint import Fingerprint
+from dev.helpers.hash_cache import HashCacheHelper
 from dev.task import Task
 
+include_pattern = re.compile(r'^(-r|--requirement|-c|--constraint)(?:\s*=?\s*)(\S+)$')
+pin_pattern = re.compile(
+    r'^(?P<name>[A-Za-z0-9][A-Za-z0-9._-]*)(?:\[[^\]]*\])?\s*==\s*(?P<version>[A-Za-z0-9.+!_-]+)$'
+)
+
+
+def normalize_name(name: str) -> str:
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+
+class Requirements:
+    """Requirement files with the files they include through -r and -c.
+
+    Lines pinning a distribution (`name==version`) can be checked against the installed
+    distributions without pip. Any other line (ranges, URLs, options, markers, hashes) makes the
+    files opaque and pip has to decide.
+    """
+
+    def __init__(self, filenames: List[str]) -> None:
+        self.filenames: List[str] = []
+        self.constraints: List[str] = []
+        self.pins: List[Tuple[str, str, str]] = []
+        self.opaque = False
+        for filename in filenames:
+            self.read(filename)
+
+    def read(self, filename: str, constraint: bool = False) -> None:
+        if filename in self.filenames:
+            return
+        self.filenames.append(filename)
+        if constraint:
+            self.constraints.append(filename)
+
+        with open(filename) as fp:
+            content = re.sub(r'\\\n', '', fp.read())
+
+        for raw_line in content.splitlines():
+            line = re.sub(r'(^|\s)#.*$', '', raw_line).strip()
+            if not line:
+                continue
+
+            include = include_pattern.match(line)
+            if include:
+                option, path = include.groups()
+                if not os.path.isabs(path):
+                    path = os.path.join(os.path.dirname(filename), path)
+                self.read(os.path.normpath(path), constraint or option in ('-c', '--constraint'))
+                continue
+
+            pin = pin_pattern.match(line)
+            if not pin:
+                self.opaque = True
+            elif not constraint:
+                self.pins.append((normalize_name(pin.group('name')), pin.group('version'), line))
+
+    def missing(self, installed: Dict[str, str]) -> List[str]:
+        """Returns the pins not satisfied by the installed distributions, as written."""
+        return [line for name, version, line in self.pins if installed.get(name) != version]
+
 
 class Pip(Task):
     __schema__ = Schema(Or(None, str, [str]))
     __description__ = 'Run pip install'
+    __depends_on__ = ['homebrew', 'python']
 
     pip_flags = '--disable-pip-version-check -q'
 
     def up(self, args: Optional[Any], extra_args: Optional[Any]) -> None:
-        if args is None:
-            to_install = ['requirements.txt']
-        elif isinstance(args, str):
-            to_install = [args]
-        else:
-            to_install = args
-
-        for pkg_or_filename in to_install:
+        filenames = []
+        for pkg_or_filename in self.parse_args(args):
             if pkg_or_filename.endswith('.txt'):
-                self.install_requirements(pkg_or_filename)
+                filenames.append(pkg_or_filename)
                 continue
             self.install_package(pkg_or_filename)
 
-    def install_requirements(self, filename: str) -> None:
-        if not os.path.exists(filename):
-            raise TaskError(f'{filename} does not exist')
-        run_command(f'pip {self.pip_flags} install -r {filename}')
+        if filenames:
+            self.install_requirements(filenames)
+
+    @classmethod
+    def fingerprint(cls, args: Optional[Any], extra_args: Optional[Any]) -> Fingerprint:
+        fingerprint = Fingerprint().add_tool('pip')
+        filenames = [f for f in cls.parse_args(args) if f.endswith('.txt')]
+        try:
+            # Files included through -r and -c change the outcome as much as the ones given
+            filenames = Requirements(filenames).filenames
+        except OSError:
+            # A missing file is fingerprinted as such, up() reports it
+            ...
+        for filename in filenames:
+            fingerprint.add_file(filename)
+        return fingerprint
+
+    @staticmethod
+    def parse_args(args: Optional[Any]) -> List[str]:
+        if args is None:
+            return ['requirements.txt']
+        if isinstance(args, str):
+            return [args]
+        return args
+
+    def install_requirements(self, filenames: List[str]) -> None:
+        for filename in filenames:
+            if not os.path.exists(filename):
+                raise TaskError(f'{filename} does not exist')
+
+        joined_filenames = '[/], [b]'.join(filenames)
+        requirements = Requirements(filenames)
+        site_packages = self.site_packages()
+        installed = None
+        if not requirements.opaque and site_packages is not None:
+            installed = self.installed_distributions(site_packages)
+
+        if installed is None:
+            # Only pip can tell whether anything is missing, unless these exact files were
+            # installed by this interpreter before
+            key = Fingerprint('pip', [os.path.abspath(f) for f in filenames]).hexdigest()
+            stamp = self.stamp(requirements)
+            if stamp and HashCacheHelper.read_hash(key) == stamp:
+                console.print(
+                    f'Python dependencies from [b]{joined_filenames}[/] already installed',
+                    style='green',
+                )
+                return
+            requirement_flags = ' '.join(f'-r {filename}' for filename in filenames)
+            run_command(f'pip {self.pip_flags} install {requirement_flags}')
+            if stamp:
+                HashCacheHelper.write_hash(key, stamp)
+        else:
+            missing = requirements.missing(installed)
+            if not missing:
+                console.print(
+                    f'Python dependencies from [b]{joined_filenames}[/] already installed',
+                    style='green',
+                )
+                return
+            constraint_flags = ''.join(f'-c {filename} ' for filename in requirements.constraints)
+            pins = ' '.join(shlex.quote(line) for line in missing)
+            run_command(f'pip {self.pip_flags} install {constraint_flags}{pins}')
+
         console.print(
-            f'Python dependencies from [b]{filename}[/] installed successfully', style='green'
+            f'Python dependencies from [b]{joined_filenames}[/] installed successfully',
+            style='green',
         )
 
     def install_package(self, package: str) -> None:
         run_command(f'pip {self.pip_flags} install {package}')
         console.print(f'Python package [b]{package}[/] installed successfully', style='green')
+
+    @staticmethod
+    def site_packages() -> Optional[str]:
+        # The site-packages of the environment the pip on PATH installs into, e.g. the virtualenv
+        # set up by the python task
+        pip = shutil.which('pip', path=environment.env.get('PATH'))
+        if not pip:
+            return None
+        prefix = os.path.dirname(os.path.dirname(os.path.realpath(pip)))
+        candidates = glob.glob(f'{prefix}/lib/python*/site-packages')
+        return candidates[0] if len(candidates) == 1 else None
+
+    @staticmethod
+    def installed_distributions(site_packages: str) -> Optional[Dict[str, str]]:
+        try:
+            from importlib.metadata import distributions
+        except ImportError:
+            # Python 3.7, leave it to pip
+            return None
+
+        installed = {}
+        for distribution in distributions(path=[site_packages]):
+            name = distribution.metadata['Name']
+            if name:
+                installed[normalize_name(name)] = distribution.version
+        return installed
+
+    @staticmethod
+    def stamp(requirements: Requirements) -> Optional[str]:
+        python = shutil.which('python', path=environment.env.get('PATH'))
+        if not python:
+            return None
+        return (
+            Fingerprint(os.path.realpath(python))
+            .add_file(python)
+            .add([HashCacheHelper.hash_file(filename) for filename in requirements.filenames])
+            .hexdigest()
+        )
@@ -1,23 +1,28 @@
 import os
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional
 
 from schema import Schema
 
 from dev import environment
 from dev.helpers import run_command
+from dev.helpers.fingerprint import Fingerprint
 from dev.helpers.homebrew import HomebrewHelper
-from dev.helpers.shadowenv import ShadowenvHelper
+from dev.helpers.probe import ProbeHelper
+from dev.helpers.shadowenv import SHADOWENV_CONFIG_DIRECTORY, ShadowenvHelper
 from dev.task import Task
 
 
 class Python(Task):
     __schema__ = Schema(str)
     __description__ = 'Install a specific Python version'
+    __depends_on__ = ['homebrew']
+
+    ROOT_PROBE: Dict[str, Any] = dict(command='pyenv root', tool='pyenv', env_names=['PYENV_ROOT'])
 
     def init(self, version: str) -> None:
         self.python_path = self.get_python_path(version)
-        self.virtualenv_path = self.get_virtualenv_path(version)
+        self.virtualenv_path = self.get_virtualenv_path(self.python_path)
 
     def up(self, args: Optional[Any], extra_args: Optional[Any]) -> None:
         if not args:
@@ -48,6 +53,29 @@ class Python(Task):
         if self.virtualenv_already_created:
             run_command(f'rm -rf {self.virtualenv_path}')
 
+    @classmethod
+    def formulae(cls, args: Optional[Any]) -> List[str]:
+        return ['pyenv'] if args else []
+
+    @classmethod
+    def fingerprint(cls, args: Optional[Any], extra_args: Optional[Any]) -> Optional[Fingerprint]:
+        if not args:
+            return None
+
+        virtualenv_path = cls.get_virtualenv_path(cls.get_python_path(args))
+        return (
+            Fingerprint()
+            .add_tool('pyenv')
+            .add_file('.python-version')
+            .add_file(f'{virtualenv_path}/bin/python')
+            .add_file(f'{SHADOWENV_CONFIG_DIRECTORY}/500_python.lisp')
+        )
+
+    @classmethod
+    def restore(cls, args: Optional[Any], extra_args: Optional[Any]) -> None:
+        virtualenv_path = cls.get_virtualenv_path(cls.get_python_path(args))
+        environment.prepend_path(f'{virtualenv_path}/bin')
+
     def install_python(self, version: str) -> None:
         if self.python_already_installed:
             return
@@ -68,9 +96,15 @@ class Python(Task):
     def virtualenv_already_created(self) -> bool:
         return os.path.isdir(self.virtualenv_path)
 
-    def get_python_path(self, version: str) -> Path:
-        prefix = run_command('pyenv root', output=True, silent=True)
+    @classmethod
+    def probes(cls, args: Optional[Any]) -> List[Dict[str, Any]]:
+        return [cls.ROOT_PROBE]
+
+    @classmethod
+    def get_python_path(cls, version: str) -> Path:
+        prefix = ProbeHelper.output(**cls.ROOT_PROBE)
         return Path(f'{prefix}/versions/{version}')
 
-    def get_virtualenv_path(self, version: str) -> Path:
-        return Path(f'{self.python_path}/virtualenvs/{environment.name}')
+    @staticmethod
+    def get_virtualenv_path(python_path: Path) -> Path:
+        return Path(f'{python_path}/virtualenvs/{environment.name}')
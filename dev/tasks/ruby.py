@@ -1,19 +1,24 @@
 import os
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional
 
 from schema import Or, Schema
 
 from dev import environment
 from dev.helpers import run_command
+from dev.helpers.fingerprint import Fingerprint
 from dev.helpers.homebrew import HomebrewHelper
-from dev.helpers.shadowenv import ShadowenvHelper
+from dev.helpers.probe import ProbeHelper
+from dev.helpers.shadowenv import SHADOWENV_CONFIG_DIRECTORY, ShadowenvHelper
 from dev.task import Task
 
 
 class Ruby(Task):
     __schema__ = Schema(Or(str, int, float))
     __description__ = 'Install a specific Ruby version'
+    __depends_on__ = ['homebrew']
+
+    ROOT_PROBE: Dict[str, Any] = dict(command='rbenv root', tool='rbenv', env_names=['RBENV_ROOT'])
 
     def init(self, version: str) -> None:
         self.ruby_path = self.get_ruby_path(version)
@@ -40,6 +45,27 @@ class Ruby(Task):
 
         self.init(version)
 
+    @classmethod
+    def formulae(cls, args: Optional[Any]) -> List[str]:
+        return ['rbenv'] if args else []
+
+    @classmethod
+    def fingerprint(cls, args: Optional[Any], extra_args: Optional[Any]) -> Optional[Fingerprint]:
+        if not args:
+            return None
+
+        return (
+            Fingerprint()
+            .add_tool('rbenv')
+            .add_file('.ruby-version')
+            .add_file(str(cls.get_ruby_path(args)))
+            .add_file(f'{SHADOWENV_CONFIG_DIRECTORY}/500_ruby.lisp')
+        )
+
+    @classmethod
+    def restore(cls, args: Optional[Any], extra_args: Optional[Any]) -> None:
+        environment.prepend_path(f'{cls.get_ruby_path(args)}/bin')
+
     def install_ruby(self, version: str) -> None:
         if self.ruby_already_installed:
             return
@@ -54,6 +80,11 @@ class Ruby(Task):
     def ruby_already_installed(self) -> bool:
         return os.path.isdir(self.ruby_path)
 
-    def get_ruby_path(self, version: str) -> Path:
-        prefix = run_command('rbenv root', output=True, silent=True)
+    @classmethod
+    def probes(cls, args: Optional[Any]) -> List[Dict[str, Any]]:
+        return [cls.ROOT_PROBE]
+
+    @classmethod
+    def get_ruby_path(cls, version: str) -> Path:
+        prefix = ProbeHelper.output(**cls.ROOT_PROBE)
         return Path(f'{prefix}/versions/{version}')
@@ -1,11 +1,14 @@
+import os
+import shlex
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, List, Optional
 
 from schema import Schema
 
 from dev import environment
 from dev.helpers import run_command
 from dev.helpers.homebrew import HomebrewHelper
+from dev.helpers.probe import ProbeHelper
 from dev.helpers.shadowenv import ShadowenvHelper
 from dev.task import Task
 
@@ -13,6 +16,7 @@ from dev.task import Task
 class Rust(Task):
     __schema__ = Schema(str)
     __description__ = 'Install a specific Rust version'
+    __depends_on__ = ['homebrew']
 
     def up(self, args: Optional[Any], extra_args: Optional[Any]) -> None:
         if not args:
@@ -20,10 +24,12 @@ class Rust(Task):
 
         version = args
 
-        if HomebrewHelper.install_formula('rustup-init'):
+        HomebrewHelper.install_formula('rustup-init')
+        # The formula may have been installed in a batch with others, check rustup itself
+        if not os.path.exists(self.cargo_bin('rustup')):
             run_command('rustup-init -y')
 
-        run_command(f'$HOME/.cargo/bin/rustup default {version}')
+        run_command(f'{shlex.quote(self.cargo_bin("rustup"))} default {version}')
         environment.prepend_path(f'{self.rust_path}/bin')
 
         ShadowenvHelper.configure_provider('rust', version, self.rust_path)
@@ -31,7 +37,34 @@ class Rust(Task):
     def down(self, args: Optional[Any], extra_args: Optional[Any]) -> None:
         ...
 
+    @classmethod
+    def formulae(cls, args: Optional[Any]) -> List[str]:
+        return ['rustup-init'] if args else []
+
     @property
     def rust_path(self) -> Path:
-        prefix = run_command('$HOME/.cargo/bin/rustc --print sysroot', output=True, silent=True)
+        # The sysroot follows the toolchain rustup picks: RUSTUP_TOOLCHAIN, else a rust-toolchain
+        # file in the working directory or a parent, else a `rustup override` of the directory or
+        # the default toolchain, both kept in the settings file.
+        # Spelled out rather than $HOME/..., a command without shell syntax skips starting bash
+        cwd = os.getcwd()
+        prefix = ProbeHelper.output(
+            f'{shlex.quote(self.cargo_bin("rustc"))} --print sysroot',
+            tool=self.cargo_bin('rustc'),
+            files=[os.path.expanduser('~/.rustup/settings.toml')] + self.toolchain_files(cwd),
+            env_names=['RUSTUP_TOOLCHAIN'],
+            context=[cwd],
+        )
         return Path(f'{prefix}/bin')
+
+    @staticmethod
+    def toolchain_files(directory: str) -> List[str]:
+        return [
+            os.path.join(path, name)
+            for path in [directory, *map(str, Path(directory).parents)]
+            for name in ('rust-toolchain', 'rust-toolchain.toml')
+        ]
+
+    @staticmethod
+    def cargo_bin(name: str) -> str:
+        return os.path.expanduser(f'~/.cargo/bin/{name}')
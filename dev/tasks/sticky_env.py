@@ -2,7 +2,8 @@ from typing import Any, Optional
 
 from schema import Schema
 
-from dev.helpers.shadowenv import ShadowenvHelper
+from dev.helpers.fingerprint import Fingerprint
+from dev.helpers.shadowenv import SHADOWENV_CONFIG_DIRECTORY, ShadowenvHelper
 from dev.task import Task
 
 
@@ -19,3 +20,7 @@ class StickyEnv(Task):
         if not args:
             return
         ShadowenvHelper.unset_environments()
+
+    @classmethod
+    def fingerprint(cls, args: Optional[Any], extra_args: Optional[Any]) -> Fingerprint:
+        return Fingerprint().add_file(f'{SHADOWENV_CONFIG_DIRECTORY}/400_environment.lisp')
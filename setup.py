@@ -26,7 +26,6 @@ setuptools.setup(
         "License :: OSI Approved :: MIT License",
     ],
     packages=setuptools.find_packages(include=['dev*']),
-    namespace_packages=['dev'],
     install_requires=install_requires,
     package_data={'dev': ['data/dev-init.sh']},
     entry_points={
@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+from dev.helpers import run_command
+from dev.helpers.argv import command_argv, popen_args, split_command
+
+
+@pytest.mark.parametrize(
+    'command, argv',
+    [
+        ('git branch --show-current', ['git', 'branch', '--show-current']),
+        (
+            'git config --global url."git@github.com:".insteadOf "https://github.com/"',
+            [
+                'git',
+                'config',
+                '--global',
+                'url.git@github.com:.insteadOf',
+                'https://github.com/',
+            ],
+        ),
+        ("echo 'a b'", ['echo', 'a b']),
+    ],
+)
+def test_split_command(command, argv):
+    assert split_command(command) == argv
+
+
+@pytest.mark.parametrize(
+    'command',
+    [
+        'ps | head -2',
+        'cd requirements && pip-compile',
+        'echo $HOME',
+        'rm -rf dist/*',
+        'git clone repo 2>&1',
+        'FOO=1 env',
+        'time sleep 1',
+        'exit 3',
+        'not-a-command-anywhere --version',
+        "echo 'unbalanced",
+        '',
+    ],
+)
+def test_split_command_needs_shell(command):
+    assert split_command(command) is None
+    assert command_argv(command) == ('bash', '-c', command)
+
+
+def test_split_command_uses_path_of_env(tmp_path):
+    tool = tmp_path / 'tool'
+    tool.write_text('#!/bin/sh\necho tool\n')
+    tool.chmod(0o755)
+
+    assert split_command('tool --version', {'PATH': str(tmp_path)}) == ['tool', '--version']
+    assert split_command('tool --version', {'PATH': '/nonexistent'}) is None
+
+
+def test_run_command_with_and_without_shell():
+    assert run_command('echo "a  b"', output=True, silent=True) == 'a  b'
+    assert run_command('printf "%s" $0', output=True, silent=True) == 'bash'
+
+
+def test_popen_args():
+    args = popen_args('git --version')
+    shell_args = popen_args('echo $HOME')
+
+    assert args['args'] == ['git', '--version']
+    assert os.path.isabs(args['executable'])
+    assert os.path.basename(args['executable']) == 'git'
+    assert args['close_fds'] is False
+    assert shell_args['args'] == ('bash', '-c', 'echo $HOME')
+    assert os.path.basename(shell_args['executable']) == 'bash'
@@ -0,0 +1,152 @@
+import asyncio
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+from dev.exceptions import CommandTimeoutError, NonZeroReturnCodeError
+from dev.helpers import async_command, task_context
+from dev.helpers.async_command import limit_concurrent_commands, run_command_async
+from dev.helpers.capture import Capture
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_output():
+    assert run(run_command_async('printf "a\\nb\\nc"', output=True, silent=True)) == 'a\nb\nc'
+    assert run(run_command_async('seq 100', output=True, silent=True, head=1, tail=1)) == '1\n100'
+    assert run(run_command_async('true', silent=True)) is None
+
+
+def test_match_stops_command():
+    start = time.perf_counter()
+
+    version = run(
+        run_command_async('echo v1.2.3; sleep 5', output=True, silent=True, match=r'\d+\.\d+')
+    )
+
+    assert version == '1.2'
+    assert time.perf_counter() - start < 2
+
+
+def test_failure():
+    with pytest.raises(NonZeroReturnCodeError) as e:
+        run(run_command_async('exit 3', silent=True))
+
+    assert e.value.code == 3
+    assert run(run_command_async('exit 3', silent=True, ok_exit_codes=[0, 3])) is None
+
+
+def test_failure_keeps_capture():
+    capture = Capture(tail=1)
+
+    with pytest.raises(NonZeroReturnCodeError):
+        run(run_command_async('seq 3; exit 1', silent=True, capture=capture))
+
+    assert capture.value == '3'
+
+
+@patch('dev.helpers.async_command.console.print')
+def test_prints_output(console_print_mock):
+    task_context.name = 'pip'
+    try:
+        run(run_command_async('echo hello'))
+    finally:
+        task_context.name = None
+
+    assert [c.args[0] for c in console_print_mock.call_args_list] == [
+        '\\[pip] => Running command: echo hello',
+        '[pip] hello',
+    ]
+
+
+def test_concurrent():
+    async def sleep_twice():
+        return await asyncio.gather(
+            run_command_async('sleep 0.3', silent=True), run_command_async('sleep 0.3', silent=True)
+        )
+
+    start = time.perf_counter()
+    run(sleep_twice())
+
+    assert time.perf_counter() - start < 0.55
+
+
+def test_limit_concurrent_commands():
+    async def sleep_twice():
+        limit_concurrent_commands(1)
+        return await asyncio.gather(
+            run_command_async('sleep 0.2', silent=True), run_command_async('sleep 0.2', silent=True)
+        )
+
+    start = time.perf_counter()
+    run(sleep_twice())
+
+    assert time.perf_counter() - start >= 0.4
+
+
+def test_concurrency_limit(monkeypatch):
+    monkeypatch.setattr(async_command, 'MAX_CONCURRENT_COMMANDS', 1)
+
+    async def sleep_twice():
+        return await asyncio.gather(
+            run_command_async('sleep 0.2', silent=True), run_command_async('sleep 0.2', silent=True)
+        )
+
+    start = time.perf_counter()
+    run(sleep_twice())
+
+    assert time.perf_counter() - start >= 0.4
+
+
+def test_timeout_kills_process_group(tmp_path):
+    pid_file = tmp_path / 'pid'
+
+    with pytest.raises(CommandTimeoutError) as e:
+        run(run_command_async(f'sleep 5 & echo $! > {pid_file}; wait', silent=True, timeout=0.3))
+
+    assert e.value.timeout == 0.3
+    assert_killed(int(pid_file.read_text()))
+
+
+def test_timeout_after_output_closed():
+    start = time.perf_counter()
+
+    with pytest.raises(CommandTimeoutError):
+        run(run_command_async('exec >&- 2>&-; sleep 5', silent=True, timeout=0.3))
+
+    assert time.perf_counter() - start < 2
+
+
+def test_cancel_kills_process_group(tmp_path):
+    pid_file = tmp_path / 'pid'
+
+    async def cancel():
+        task = asyncio.ensure_future(
+            run_command_async(f'sleep 5 & echo $! > {pid_file}; wait', silent=True)
+        )
+        await asyncio.sleep(0.3)
+        task.cancel()
+        await task
+
+    with pytest.raises(asyncio.CancelledError):
+        run(cancel())
+
+    assert_killed(int(pid_file.read_text()))
+
+
+def assert_killed(pid):
+    # The killed sleep is a zombie until its parent, a killed bash, is reaped by init
+    for _ in range(50):
+        try:
+            with open(f'/proc/{pid}/stat') as fp:
+                if fp.read().rsplit(')', 1)[1].split()[0] == 'Z':
+                    return
+        except FileNotFoundError:
+            return
+        time.sleep(0.02)
+    os.kill(pid, 9)
+    pytest.fail(f'{pid} is still running')
@@ -0,0 +1,79 @@
+import time
+
+import pytest
+
+from dev.exceptions import NonZeroReturnCodeError
+from dev.helpers import run_command
+from dev.helpers.capture import Capture
+
+
+def test_capture_head_and_tail():
+    capture = Capture(head=2, tail=2)
+    for i in range(10):
+        capture.feed(str(i))
+
+    assert capture.value == '0\n1\n8\n9'
+    assert capture.dropped == 6
+
+
+def test_capture_default_keeps_everything():
+    capture = Capture()
+    for i in range(20_000):
+        capture.feed(str(i))
+
+    assert capture.value == '\n'.join(str(i) for i in range(20_000))
+    assert capture.dropped == 0
+
+
+def test_capture_tail_only():
+    capture = Capture(tail=2)
+    for i in range(10):
+        capture.feed(str(i))
+
+    assert capture.value == '8\n9'
+    assert capture.dropped == 8
+
+
+def test_capture_write_partial_lines():
+    capture = Capture(head=3)
+    capture.write('first\r\nsec')
+    capture.write('ond\nthi')
+    capture.close()
+
+    assert capture.value == 'first\nsecond\nthi'
+
+
+def test_capture_match():
+    capture = Capture(match=r'\d+\.\d+\.\d+')
+
+    assert capture.feed('Docker Compose') is False
+    assert capture.feed('Docker Compose version v2.17.3, build 1') is True
+    assert capture.value == '2.17.3'
+
+
+def test_capture_first_match():
+    capture = Capture(match=r'https?://\S+')
+
+    capture.write('Serving on http://127.0.0.1:8000\nReloading at http://127.0.0.1:8001\n')
+    capture.close()
+
+    assert capture.value == 'http://127.0.0.1:8000'
+
+
+def test_run_command_failure():
+    with pytest.raises(NonZeroReturnCodeError):
+        run_command('echo a; exit 3', output=True, silent=True)
+
+
+def test_run_command_head():
+    assert run_command('seq 1 1000', output=True, silent=True, head=1) == '1'
+
+
+def test_run_command_match_stops_command():
+    start = time.perf_counter()
+    output = run_command(
+        'echo version 1.2.3; sleep 10', output=True, silent=True, match=r'\d+\.\d+\.\d+'
+    )
+
+    assert output == '1.2.3'
+    assert time.perf_counter() - start < 5
@@ -0,0 +1,33 @@
+import os
+
+import pytest
+
+from dev.helpers.files import atomic_write, write_cache_file
+
+
+def test_atomic_write(tmp_path):
+    filename = tmp_path / 'cache' / 'file.json'
+
+    atomic_write(str(filename), '{}')
+    atomic_write(str(filename), b'[]')
+
+    assert filename.read_text() == '[]'
+    assert os.listdir(filename.parent) == ['file.json']
+
+
+def test_atomic_write_failure_removes_tmp_file(tmp_path):
+    # Replacing a directory fails after the temporary file was written
+    (tmp_path / 'file').mkdir()
+
+    with pytest.raises(OSError):
+        atomic_write(str(tmp_path / 'file'), 'data')
+
+    assert os.listdir(tmp_path) == ['file']
+
+
+def test_write_cache_file_ignores_errors(tmp_path):
+    (tmp_path / 'file').mkdir()
+
+    write_cache_file(str(tmp_path / 'file'), 'data')
+
+    assert os.listdir(tmp_path) == ['file']
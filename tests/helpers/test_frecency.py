@@ -0,0 +1,38 @@
+from unittest.mock import patch
+
+import pytest
+
+from dev.helpers.frecency import MAX_BOOST, Frecency
+
+
+@pytest.fixture(autouse=True)
+def cache_path(tmp_path):
+    with patch('dev.helpers.frecency.environment.cache_path', str(tmp_path)):
+        yield
+
+
+def test_record_persists():
+    Frecency('cd').record('github.com/acme/api')
+
+    frecency = Frecency('cd')
+    assert frecency.score('github.com/acme/api') > 0
+    assert frecency.score('github.com/acme/web') == 0
+
+
+@patch('dev.helpers.frecency.time.time')
+def test_score_decays(time_mock):
+    time_mock.return_value = 1000.0
+    frecency = Frecency('cd')
+    frecency.record('api')
+    frecency.record('api')
+
+    assert frecency.score('api') == 8.0
+    assert frecency.score('api', now=1000.0 + 2 * 24 * 60 * 60) == 2.0
+    assert frecency.score('api', now=1000.0 + 30 * 24 * 60 * 60) == 0.5
+
+
+def test_boost_is_capped():
+    frecency = Frecency('cd')
+    frecency.entries['api'] = [1000, 1e12]
+
+    assert frecency.boost('api', now=1e12) == MAX_BOOST
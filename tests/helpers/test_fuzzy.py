@@ -0,0 +1,59 @@
+from dev.helpers.fuzzy import Matcher, clear_winner
+
+candidates = [
+    ('api', 'acme', 'github.com'),
+    ('api-gateway', 'acme', 'github.com'),
+    ('payments-api', 'acme', 'github.com'),
+    ('rapid', 'other', 'gitlab.com'),
+    ('a-p-i', 'other', 'gitlab.com'),
+    ('web', 'api', 'example.com'),
+    ('website', 'Acme', ''),
+]
+
+
+def ranked_names(query, boost=None):
+    return [candidates[index][0] for _, index in Matcher(query).rank(candidates, boost)]
+
+
+def test_rank_by_kind_of_match():
+    assert ranked_names('api') == [
+        'api',
+        'web',
+        'api-gateway',
+        'payments-api',
+        'rapid',
+        'a-p-i',
+    ]
+
+
+def test_rank_single_character_matches_start_only():
+    assert ranked_names('w') == ['web', 'website']
+
+
+def test_rank_empty_query():
+    named = [candidate[0] for candidate in candidates]
+    assert ranked_names('') == named
+    assert ranked_names('/') == named
+    assert not clear_winner(Matcher('').rank(candidates))
+
+
+def test_rank_with_scope():
+    assert ranked_names('acme/web') == ['website']
+    assert ranked_names('other/api') == ['rapid', 'a-p-i']
+    assert ranked_names('gitlab/') == ['rapid', 'a-p-i']
+
+
+def test_rank_with_boosts():
+    boosts = [0.0, 0.0, 0.0, 30.0, 0.0, 0.0, 0.0]
+
+    assert ranked_names('api', boosts.__getitem__)[:3] == ['api', 'web', 'rapid']
+
+
+def test_rank_without_match():
+    assert ranked_names('xyz') == []
+
+
+def test_clear_winner():
+    assert clear_winner(Matcher('api-gateway').rank(candidates))
+    assert not clear_winner(Matcher('ap').rank(candidates))
+    assert not clear_winner([])
@@ -0,0 +1,153 @@
+import os
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+from dev.helpers.git import GitHelper
+from dev.helpers.git_metadata import GitMetadata, UnsupportedLayout, parse_config
+
+
+def git(cwd, *args):
+    return subprocess.run(
+        ['git', *args], cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+@pytest.fixture
+def repository(tmp_path, monkeypatch):
+    monkeypatch.setenv('HOME', str(tmp_path))
+    monkeypatch.setenv('GIT_CONFIG_NOSYSTEM', '1')
+    path = tmp_path / 'repository'
+    path.mkdir()
+    git(path, 'init', '-q', '-b', 'main')
+    git(path, 'config', 'user.name', 'Dev')
+    git(path, 'config', 'user.email', 'dev@example.com')
+    git(path, 'remote', 'add', 'origin', 'git@github.com:acme/api.git')
+    git(path, 'commit', '-q', '--allow-empty', '-m', 'Initial')
+    return path
+
+
+def test_head(repository):
+    metadata = GitMetadata(str(repository))
+
+    assert metadata.current_branch() == 'main'
+    assert metadata.resolve('HEAD') == git(repository, 'rev-parse', 'HEAD')
+    assert metadata.get('remote.origin.url') == 'git@github.com:acme/api.git'
+    assert metadata.get('Remote.Origin.URL') == 'git@github.com:acme/api.git'
+
+
+def test_subdirectory_and_detached_head(repository):
+    os.makedirs(repository / 'a' / 'b')
+    git(repository, 'checkout', '-q', '--detach')
+
+    metadata = GitMetadata(str(repository / 'a' / 'b'))
+
+    assert metadata.current_branch() == ''
+    assert metadata.resolve('HEAD') == git(repository, 'rev-parse', 'HEAD')
+
+
+def test_packed_refs(repository):
+    git(repository, 'checkout', '-q', '-b', 'feature')
+    git(repository, 'pack-refs', '--all')
+    assert not os.path.exists(repository / '.git' / 'refs' / 'heads' / 'feature')
+
+    metadata = GitMetadata(str(repository))
+
+    assert metadata.current_branch() == 'feature'
+    assert metadata.resolve('HEAD') == git(repository, 'rev-parse', 'HEAD')
+    assert metadata.resolve('refs/heads/missing') is None
+
+
+def test_worktree(repository, tmp_path):
+    worktree = tmp_path / 'worktree'
+    git(repository, 'worktree', 'add', '-q', '-b', 'other', str(worktree))
+
+    metadata = GitMetadata(str(worktree))
+
+    assert metadata.current_branch() == 'other'
+    assert metadata.resolve('HEAD') == git(worktree, 'rev-parse', 'HEAD')
+    assert metadata.get('remote.origin.url') == 'git@github.com:acme/api.git'
+
+
+def test_include(repository, tmp_path):
+    (tmp_path / 'included').write_text('[remote "origin"]\n\turl = "git@example.com:x/y.git"\n')
+    git(repository, 'config', 'include.path', '../../included')
+
+    metadata = GitMetadata(str(repository))
+
+    assert metadata.get('remote.origin.url') == git(
+        repository, 'config', '--get', 'remote.origin.url'
+    )
+
+
+def test_parse_config(tmp_path):
+    filename = tmp_path / 'config'
+    filename.write_text(
+        '# comment\n'
+        '[core]\n'
+        '\tbare = false ; comment\n'
+        '\tlogAllRefUpdates\n'
+        '[branch "feature/a\\"b"]\n'
+        '\tmerge = "refs/heads/# not a comment"\n'
+        '[alias] co = checkout\n'
+    )
+
+    assert parse_config(str(filename)) == {
+        'core.bare': ['false'],
+        'core.logallrefupdates': ['true'],
+        'branch.feature/a"b.merge': ['refs/heads/# not a comment'],
+        'alias.co': ['checkout'],
+    }
+
+
+def test_unsupported(repository):
+    git(repository, 'config', 'includeIf.gitdir:~/.path', '/dev/null')
+
+    with pytest.raises(UnsupportedLayout):
+        GitMetadata(str(repository)).config
+
+
+@patch('dev.helpers.git.run_command')
+def test_git_helper(run_command, repository, monkeypatch):
+    monkeypatch.chdir(repository)
+    monkeypatch.setattr(GitHelper, 'repositories', {})
+
+    assert GitHelper.current_branch() == 'main'
+    assert GitHelper.get_remote_origin() == ('github.com', 'acme', 'api')
+    assert GitHelper.get_remote_origin() == ('github.com', 'acme', 'api')
+    run_command.assert_not_called()
+
+
+@patch('dev.helpers.git.run_command', return_value='main')
+def test_git_helper_fallback(run_command, repository, monkeypatch):
+    git(repository, 'config', 'includeIf.onbranch:main.path', '/dev/null')
+    monkeypatch.chdir(repository)
+    monkeypatch.setattr(GitHelper, 'repositories', {})
+
+    assert GitHelper.current_branch() == 'main'
+    GitHelper.remote_origin_url()
+
+    run_command.assert_called_once_with(
+        'git config --get remote.origin.url',
+        output=True,
+        silent=True,
+        ok_exit_codes=[0, 1],
+        head=1,
+    )
+
+
+@patch('dev.helpers.git.run_command', return_value='')
+def test_setup_config(run_command, tmp_path, monkeypatch):
+    monkeypatch.setenv('HOME', str(tmp_path))
+    monkeypatch.setenv('XDG_CONFIG_HOME', str(tmp_path / '.config'))
+
+    GitHelper.setup_config()
+    run_command.assert_called_once()
+
+    run_command.reset_mock()
+    (tmp_path / '.gitconfig').write_text(
+        '[url "git@github.com:"]\n\tinsteadOf = https://github.com/\n'
+    )
+    GitHelper.setup_config()
+    run_command.assert_not_called()
@@ -0,0 +1,98 @@
+import hashlib
+import os
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from dev.helpers.hash_cache import HashCacheHelper
+
+
+@pytest.fixture(autouse=True)
+def cache_path(tmp_path):
+    with patch('dev.helpers.hash_cache.environment.cache_path', str(tmp_path / 'cache')):
+        yield tmp_path / 'cache'
+
+
+def test_read_and_write_hash():
+    assert HashCacheHelper.read_hash('key') is None
+
+    HashCacheHelper.write_hash('key', 'a')
+    HashCacheHelper.write_hash('key', 'b')
+
+    assert HashCacheHelper.read_hash('key') == 'b'
+
+
+def test_hashes_are_scoped_to_the_environment():
+    HashCacheHelper.write_hash('key', 'a')
+
+    with patch('dev.helpers.hash_cache.environment.name', 'other', create=True):
+        assert HashCacheHelper.read_hash('key') is None
+
+
+def test_legacy_hashes_imported(cache_path):
+    legacy = cache_path / 'project'
+    legacy.mkdir(parents=True)
+    key = HashCacheHelper.hash_data('names')
+    (legacy / key).write_text(HashCacheHelper.hash_data('a b'))
+    (cache_path / 'jinja2').mkdir()
+    (cache_path / 'jinja2' / 'template.py').write_text('')
+
+    with patch('dev.helpers.hash_cache.environment.name', 'project', create=True):
+        assert not HashCacheHelper.changed('names', data='a b')
+    with patch('dev.helpers.hash_cache.environment.name', 'jinja2', create=True):
+        assert HashCacheHelper.read_hash('template.py') is None
+
+
+def test_changed_data():
+    assert HashCacheHelper.changed('names', data='a b')
+    assert not HashCacheHelper.changed('names', data='a b')
+    assert HashCacheHelper.changed('names', data='a b c')
+
+    with pytest.raises(RuntimeError):
+        HashCacheHelper.changed('names')
+
+
+def test_hash_file(tmp_path):
+    filename = tmp_path / 'file'
+    filename.write_bytes(b'x' * 3_000_000)
+
+    assert HashCacheHelper.hash_file(str(filename)) == hashlib.sha1(b'x' * 3_000_000).hexdigest()
+
+    with patch('builtins.open') as open_mock:
+        HashCacheHelper.hash_file(str(filename))
+    open_mock.assert_not_called()
+
+    filename.write_bytes(b'y')
+    assert HashCacheHelper.hash_file(str(filename)) == hashlib.sha1(b'y').hexdigest()
+
+
+def test_changed_file(tmp_path):
+    filename = tmp_path / 'file'
+    filename.write_text('a')
+
+    assert HashCacheHelper.changed('file', filename=str(filename))
+    assert not HashCacheHelper.changed('file', filename=str(filename))
+
+
+def test_unusable_database(cache_path):
+    cache_path.parent.mkdir(exist_ok=True)
+    cache_path.write_text('not a directory')
+
+    HashCacheHelper.write_hash('key', 'a')
+    assert HashCacheHelper.read_hash('key') is None
+
+
+def test_concurrent_writes():
+    def write(index):
+        for round in range(20):
+            HashCacheHelper.write_hash(f'{index}', f'{round}')
+
+    threads = [threading.Thread(target=write, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [HashCacheHelper.read_hash(f'{index}') for index in range(8)] == ['19'] * 8
+    assert os.path.exists(HashCacheHelper.database_filename())
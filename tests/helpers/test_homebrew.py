@@ -0,0 +1,54 @@
+import os
+from unittest.mock import patch
+
+import pytest
+
+from dev.helpers.homebrew import HomebrewHelper
+
+
+@pytest.fixture(autouse=True)
+def prefix(tmp_path):
+    (tmp_path / 'opt' / 'pyenv').mkdir(parents=True)
+    (tmp_path / 'Caskroom' / 'iterm2').mkdir(parents=True)
+    with patch(
+        'dev.helpers.homebrew.HomebrewHelper.prefix', return_value=str(tmp_path)
+    ), patch.dict(HomebrewHelper.index, clear=True):
+        yield tmp_path
+
+
+@patch('dev.helpers.homebrew.os.scandir', wraps=os.scandir)
+def test_already_installed_scans_once(scandir_mock):
+    assert HomebrewHelper.already_installed('pyenv')
+    assert HomebrewHelper.already_installed('homebrew/core/pyenv')
+    assert not HomebrewHelper.already_installed('nodenv')
+
+    scandir_mock.assert_called_once()
+
+
+def test_cask_already_installed():
+    assert HomebrewHelper.cask_already_installed('iterm2')
+    assert not HomebrewHelper.cask_already_installed('docker')
+
+
+@patch('dev.helpers.homebrew.run_command')
+def test_install_formulae_batches_missing(run_command_mock, prefix):
+    def install(command):
+        for formula in command.split()[2:]:
+            (prefix / 'opt' / formula).mkdir()
+
+    run_command_mock.side_effect = install
+
+    assert HomebrewHelper.install_formulae(['pyenv', 'nodenv', 'rbenv', 'nodenv']) == [
+        'nodenv',
+        'rbenv',
+    ]
+    assert HomebrewHelper.install_formula('rbenv') is False
+
+    run_command_mock.assert_called_once_with('brew install nodenv rbenv')
+
+
+@patch('dev.helpers.homebrew.run_command')
+def test_install_casks_batches_missing(run_command_mock):
+    HomebrewHelper.install_casks(['iterm2', 'docker', 'slack'])
+
+    run_command_mock.assert_called_once_with('brew install --cask docker slack')
@@ -0,0 +1,94 @@
+import os
+from unittest.mock import patch
+
+import pytest
+
+from dev.helpers.probe import PROBE_TTL, ProbeHelper
+
+
+@pytest.fixture
+def tool(tmp_path):
+    path = tmp_path / 'bin' / 'brew'
+    path.parent.mkdir()
+    path.write_text('#!/bin/sh\n')
+    path.chmod(0o755)
+    env = dict(PATH=str(path.parent))
+    with patch('dev.helpers.probe.environment.cache_path', str(tmp_path / 'cache')), patch(
+        'dev.helpers.probe.environment.env', env
+    ), patch.dict(ProbeHelper.caches, clear=True):
+        yield path
+
+
+@patch('dev.helpers.probe.run_command', return_value='/opt/homebrew')
+def test_output_memoized(run_command_mock, tool):
+    assert ProbeHelper.output('brew --prefix', tool='brew') == '/opt/homebrew'
+    assert ProbeHelper.output('brew --prefix', tool='brew') == '/opt/homebrew'
+
+    run_command_mock.assert_called_once_with('brew --prefix', output=True, silent=True, head=1)
+
+
+@patch('dev.helpers.probe.run_command', return_value='/opt/homebrew')
+def test_output_cached_between_runs(run_command_mock, tool):
+    ProbeHelper.output('brew --prefix', tool='brew')
+    ProbeHelper.caches.clear()
+    ProbeHelper.output('brew --prefix', tool='brew')
+
+    run_command_mock.assert_called_once()
+
+
+@patch('dev.helpers.probe.run_command', return_value='/opt/homebrew')
+def test_output_tool_changed(run_command_mock, tool):
+    ProbeHelper.output('brew --prefix', tool='brew')
+
+    stat = os.stat(tool)
+    os.utime(tool, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    ProbeHelper.output('brew --prefix', tool='brew')
+
+    assert run_command_mock.call_count == 2
+
+
+@patch('dev.helpers.probe.run_command', return_value='/opt/homebrew')
+def test_output_env_changed(run_command_mock, tool):
+    ProbeHelper.output('brew --prefix', tool='brew', env_names=['HOMEBREW_PREFIX'])
+    with patch.dict('dev.helpers.probe.environment.env', HOMEBREW_PREFIX='/usr/local'):
+        ProbeHelper.output('brew --prefix', tool='brew', env_names=['HOMEBREW_PREFIX'])
+
+    assert run_command_mock.call_count == 2
+
+
+@patch('dev.helpers.probe.run_command', return_value='/toolchain')
+def test_output_context_changed(run_command_mock, tool):
+    ProbeHelper.output('rustc --print sysroot', tool='brew', context=['/src/a'])
+    ProbeHelper.output('rustc --print sysroot', tool='brew', context=['/src/a'])
+    ProbeHelper.output('rustc --print sysroot', tool='brew', context=['/src/b'])
+
+    assert run_command_mock.call_count == 2
+
+
+@patch('dev.helpers.probe.time.time')
+@patch('dev.helpers.probe.run_command', return_value='/opt/homebrew')
+def test_output_expired(run_command_mock, time_mock, tool):
+    time_mock.return_value = 1000
+    ProbeHelper.output('brew --prefix', tool='brew')
+    time_mock.return_value = 1000 + PROBE_TTL
+    ProbeHelper.output('brew --prefix', tool='brew')
+
+    assert run_command_mock.call_count == 2
+
+
+def test_prefetch(tool):
+    probes = [
+        dict(command='echo /opt/homebrew', tool='brew'),
+        dict(command='echo /opt/pyenv', tool='brew', env_names=['PYENV_ROOT']),
+        dict(command='exit 1', tool='brew'),
+    ]
+    with patch.dict('dev.helpers.probe.environment.env', PATH=f'{tool.parent}:/bin:/usr/bin'):
+        ProbeHelper.prefetch(probes)
+
+    with patch('dev.helpers.probe.run_command', return_value='') as run_command_mock:
+        assert ProbeHelper.output(**probes[0]) == '/opt/homebrew'
+        assert ProbeHelper.output(**probes[1]) == '/opt/pyenv'
+        # Failed probes are not stored, output() runs them again
+        ProbeHelper.output(**probes[2])
+
+    run_command_mock.assert_called_once_with('exit 1', output=True, silent=True, head=1)
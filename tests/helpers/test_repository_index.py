@@ -0,0 +1,82 @@
+import os
+from unittest.mock import patch
+
+import pytest
+
+from dev.helpers.repository_index import RepositoryIndex
+
+
+@pytest.fixture
+def src(tmp_path):
+    for path in [
+        'root/.git',
+        'example.com/onprem/.git',
+        'github.com/acme/one/.git',
+        'github.com/acme/two/.git',
+        'github.com/acme/two/node_modules/dep/.git',
+        'github.com/acme/vendored/deep/tree/.git',
+    ]:
+        os.makedirs(tmp_path / 'src' / path)
+    with patch('dev.helpers.repository_index.environment.cache_path', str(tmp_path / 'cache')):
+        yield tmp_path / 'src'
+
+
+def touch_directory(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+
+def test_refresh(src):
+    index = RepositoryIndex(str(src)).refresh()
+
+    assert sorted(index.repositories()) == [
+        ('one', 'github.com', 'acme'),
+        ('onprem', 'example.com', None),
+        ('root', None, None),
+        ('two', 'github.com', 'acme'),
+    ]
+
+
+@patch('dev.helpers.repository_index.os.scandir', wraps=os.scandir)
+def test_refresh_incremental(scandir_mock, src):
+    RepositoryIndex(str(src)).refresh()
+    scandir_mock.reset_mock()
+
+    RepositoryIndex(str(src)).refresh()
+    scandir_mock.assert_not_called()
+
+    os.makedirs(src / 'github.com' / 'acme' / 'three' / '.git')
+    index = RepositoryIndex(str(src)).refresh()
+
+    scandir_mock.assert_called_once_with(os.path.join(str(src), 'github.com/acme'))
+    assert ('three', 'github.com', 'acme') in index.repositories()
+
+
+def test_refresh_directory_becomes_repository(src):
+    os.makedirs(src / 'github.com' / 'acme' / 'new')
+    RepositoryIndex(str(src)).refresh()
+
+    os.makedirs(src / 'github.com' / 'acme' / 'new' / '.git')
+    index = RepositoryIndex(str(src)).refresh()
+
+    assert ('new', 'github.com', 'acme') in index.repositories()
+
+
+def test_refresh_removed_repository(src):
+    RepositoryIndex(str(src)).refresh()
+
+    os.rename(src / 'root', src.parent / 'root')
+    index = RepositoryIndex(str(src)).refresh()
+
+    assert ('root', None, None) not in index.repositories()
+
+
+def test_add(src):
+    RepositoryIndex(str(src)).refresh()
+
+    os.makedirs(src / 'gitlab.com' / 'acme' / 'cloned' / '.git')
+    RepositoryIndex(str(src)).add(str(src / 'gitlab.com' / 'acme' / 'cloned'))
+
+    index = RepositoryIndex(str(src))
+    assert ('cloned', 'gitlab.com', 'acme') in index.repositories()
+    assert ('cloned', 'gitlab.com', 'acme') in index.refresh().repositories()
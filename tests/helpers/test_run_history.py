@@ -0,0 +1,53 @@
+import time
+from unittest.mock import patch
+
+import pytest
+
+from dev.helpers import run_history
+from dev.helpers.run_history import COMMAND, FAILED, SUCCEEDED, TASK, RunHistoryHelper
+
+
+@pytest.fixture(autouse=True)
+def cache_path(tmp_path):
+    with patch('dev.helpers.run_history.environment.cache_path', str(tmp_path / 'cache')), patch(
+        'dev.helpers.run_history.environment.name', 'app', create=True
+    ), patch.object(RunHistoryHelper, 'pending', []):
+        yield tmp_path / 'cache'
+
+
+def test_store():
+    now = time.time()
+    RunHistoryHelper.record(TASK, 'pip', ['requirements.txt'], now, 1200.0, SUCCEEDED)
+    RunHistoryHelper.record(COMMAND, 'up', None, now, 1500.0, FAILED)
+
+    RunHistoryHelper.store('up')
+
+    assert RunHistoryHelper.pending == []
+    assert RunHistoryHelper.runs(now - 1) == [
+        (now, 'up', TASK, 'pip', "['requirements.txt']", 1200.0, SUCCEEDED),
+        (now, 'up', COMMAND, 'up', '', 1500.0, FAILED),
+    ]
+    assert RunHistoryHelper.runs(now - 1, namespace='other') == []
+    assert RunHistoryHelper.runs(now + 1) == []
+
+
+def test_retention(monkeypatch):
+    monkeypatch.setattr(run_history, 'MAX_RUNS', 3)
+    now = time.time()
+    RunHistoryHelper.record(COMMAND, 'old', None, now - 91 * 86400, 1.0, SUCCEEDED)
+    for index in range(5):
+        RunHistoryHelper.record(COMMAND, f'test {index}', None, now + index, 1.0, SUCCEEDED)
+
+    RunHistoryHelper.store('test')
+
+    assert [run[3] for run in RunHistoryHelper.runs(0)] == ['test 2', 'test 3', 'test 4']
+
+
+def test_unusable_database(cache_path):
+    cache_path.parent.mkdir(exist_ok=True)
+    cache_path.write_text('not a directory')
+    RunHistoryHelper.record(COMMAND, 'up', None, time.time(), 1.0, SUCCEEDED)
+
+    RunHistoryHelper.store('up')
+
+    assert RunHistoryHelper.runs(0) == []
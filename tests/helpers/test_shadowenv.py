@@ -0,0 +1,63 @@
+import os
+from unittest.mock import patch
+
+import pytest
+
+from dev.helpers.shadowenv import ShadowenvHelper
+
+
+@pytest.fixture(autouse=True)
+def project(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with patch('dev.helpers.shadowenv.HomebrewHelper.install_formula', return_value=False), patch(
+        'dev.helpers.shadowenv.shutil.which', return_value='/usr/local/bin/shadowenv'
+    ):
+        yield tmp_path / '.shadowenv.d'
+
+
+@patch('dev.helpers.shadowenv.run_command')
+def test_session(run_command_mock, project):
+    with ShadowenvHelper.session():
+        ShadowenvHelper.configure_provider('python', '3.11.2', '/venv', env_names=['VIRTUAL_ENV'])
+        ShadowenvHelper.configure_provider('node', '18.14.0')
+        ShadowenvHelper.set_environments({'DEBUG': '1'})
+        assert not project.exists()
+
+    assert sorted(os.listdir(project)) == [
+        '400_environment.lisp',
+        '500_node.lisp',
+        '500_python.lisp',
+    ]
+    assert (project / '500_python.lisp').read_text() == (
+        '(provide "python" "3.11.2")\n'
+        '(env/set "VIRTUAL_ENV" "/venv")\n'
+        '(env/prepend-to-pathlist "PATH" (path-concat (env/get "VIRTUAL_ENV") "bin"))\n'
+    )
+    run_command_mock.assert_called_once_with('shadowenv trust', silent=True)
+
+
+@patch('dev.helpers.shadowenv.run_command')
+def test_unchanged_files_are_not_written(run_command_mock, project):
+    ShadowenvHelper.configure_provider('node', '18.14.0')
+    mtime = os.stat(project / '500_node.lisp').st_mtime_ns
+    run_command_mock.reset_mock()
+
+    with ShadowenvHelper.session():
+        ShadowenvHelper.configure_provider('node', '18.14.0')
+
+    assert os.stat(project / '500_node.lisp').st_mtime_ns == mtime
+    run_command_mock.assert_not_called()
+
+
+@patch('dev.helpers.shadowenv.run_command')
+def test_unconfigure(run_command_mock, project):
+    ShadowenvHelper.configure_provider('node', '18.14.0')
+    ShadowenvHelper.set_environments({'DEBUG': '1'})
+    run_command_mock.reset_mock()
+
+    with ShadowenvHelper.session():
+        ShadowenvHelper.unconfigure_provider('node')
+        ShadowenvHelper.unconfigure_provider('missing')
+
+    assert os.listdir(project) == ['400_environment.lisp']
+    run_command_mock.assert_called_once_with('shadowenv trust', silent=True)
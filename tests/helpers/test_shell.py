@@ -0,0 +1,65 @@
+from unittest.mock import patch
+
+import pytest
+
+from dev.helpers.shell import ShellHelper
+
+
+def add_process(proc, pid, ppid, command):
+    (proc / str(pid)).mkdir()
+    (proc / str(pid) / 'comm').write_text(f'{command}\n')
+    (proc / str(pid) / 'stat').write_text(f'{pid} ({command}) S {ppid} {pid} {pid} 0 -1 4194304\n')
+
+
+@pytest.fixture
+def proc(tmp_path, monkeypatch):
+    monkeypatch.setattr(ShellHelper, 'proc_path', str(tmp_path))
+    monkeypatch.setattr(ShellHelper, 'cache', {})
+    monkeypatch.delenv('SHELL', raising=False)
+    return tmp_path
+
+
+@patch('dev.helpers.shell.os.getppid', return_value=300)
+def test_parent_shell(getppid_mock, proc):
+    add_process(proc, 100, 1, 'login')
+    add_process(proc, 200, 100, '-zsh')
+    add_process(proc, 300, 200, 'bash')
+
+    assert ShellHelper.current() == 'bash'
+
+
+@patch('dev.helpers.shell.os.getppid', return_value=300)
+def test_skips_intermediate_processes(getppid_mock, proc):
+    add_process(proc, 200, 1, '-zsh')
+    add_process(proc, 300, 200, 'dev (wrapper)')
+
+    assert ShellHelper.current() == 'zsh'
+
+
+@patch('dev.helpers.shell.os.getppid', return_value=300)
+def test_falls_back_to_shell_variable(getppid_mock, proc, monkeypatch):
+    add_process(proc, 300, 1, 'python3')
+    monkeypatch.setenv('SHELL', '/usr/local/bin/fish')
+
+    assert ShellHelper.current() == 'fish'
+
+
+@patch('dev.helpers.shell.os.getppid', return_value=300)
+def test_cached(getppid_mock, proc):
+    add_process(proc, 300, 1, 'bash')
+
+    assert ShellHelper.current() == 'bash'
+    (proc / '300' / 'comm').write_text('zsh\n')
+    assert ShellHelper.current() == 'bash'
+
+
+@patch('dev.helpers.shell.subprocess.run')
+@patch('dev.helpers.shell.os.getppid', return_value=300)
+def test_without_proc(getppid_mock, run_mock, proc, monkeypatch):
+    monkeypatch.setattr(ShellHelper, 'proc_path', str(proc / 'missing'))
+    run_mock.return_value.stdout = '  200 -zsh\n'
+
+    assert ShellHelper.current() == 'zsh'
+    run_mock.assert_called_once_with(
+        ('ps', '-o', 'ppid=', '-o', 'comm=', '-p', '300'), capture_output=True, text=True
+    )
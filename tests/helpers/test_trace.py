@@ -0,0 +1,100 @@
+import json
+import threading
+
+import pytest
+
+from dev.exceptions import NonZeroReturnCodeError
+from dev.helpers import run_command
+from dev.helpers.trace import TraceHelper
+
+
+@pytest.fixture(autouse=True)
+def spans():
+    TraceHelper.reset()
+    yield
+    TraceHelper.reset()
+
+
+def test_span():
+    with TraceHelper.span('Pip', 'task', direction='up'):
+        with TraceHelper.span('pip install', 'command') as span:
+            TraceHelper.annotate('command', exit_code=0)
+            TraceHelper.annotate('task', ignored=True)
+        TraceHelper.annotate('task', skipped=False)
+
+    command, task = TraceHelper.spans
+    assert (command.name, command.category, command.args) == (
+        'pip install',
+        'command',
+        {'exit_code': 0},
+    )
+    assert task.args == {'direction': 'up', 'skipped': False}
+    assert task.start <= command.start <= span.end <= task.end
+
+
+def test_span_records_errors():
+    with pytest.raises(SystemExit):
+        with TraceHelper.span('Pip', 'task'):
+            raise SystemExit(1)
+
+    assert TraceHelper.spans[0].args == {'error': 'SystemExit'}
+
+
+def test_annotate_outside_span():
+    TraceHelper.annotate('command', exit_code=0)
+
+    assert TraceHelper.spans == []
+
+
+def test_write(tmp_path):
+    def run():
+        with TraceHelper.span('sleep 1', 'command'):
+            ...
+
+    with TraceHelper.span('Run', 'task'):
+        thread = threading.Thread(target=run, name='worker')
+        thread.start()
+        thread.join()
+
+    TraceHelper.write(str(tmp_path / 'traces' / 'trace.json'))
+
+    events = json.loads((tmp_path / 'traces' / 'trace.json').read_text())['traceEvents']
+    assert [(e['name'], e['ph']) for e in events] == [
+        ('Run', 'X'),
+        ('sleep 1', 'X'),
+        ('thread_name', 'M'),
+        ('thread_name', 'M'),
+    ]
+    assert events[0]['tid'] != events[1]['tid']
+    assert events[3]['args'] == {'name': 'worker'}
+    assert events[0]['ts'] <= events[1]['ts']
+
+
+def test_totals():
+    for _ in range(3):
+        with TraceHelper.span('echo', 'command'):
+            ...
+    with TraceHelper.span('Run', 'task'):
+        ...
+
+    totals = TraceHelper.totals()
+
+    assert {(category, name, calls) for category, name, calls, _, _ in totals} == {
+        ('command', 'echo', 3),
+        ('task', 'Run', 1),
+    }
+    assert totals[0][3] >= totals[1][3]
+
+
+def test_run_command_span():
+    run_command('printf hello', output=True, silent=True)
+    with pytest.raises(NonZeroReturnCodeError):
+        run_command('exit 3', silent=True)
+
+    captured, failed = TraceHelper.spans
+    assert captured.name == 'printf hello'
+    assert captured.args['exit_code'] == 0
+    assert captured.args['output_bytes'] == 5
+    assert captured.args['spawn_ms'] >= 0
+    assert failed.args['exit_code'] == 3
+    assert failed.args['error'] == 'NonZeroReturnCodeError'
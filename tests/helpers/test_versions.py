@@ -0,0 +1,35 @@
+import pytest
+
+from dev.helpers.versions import satisfies
+
+
+@pytest.mark.parametrize(
+    'version,requirement,expected',
+    [
+        ('4.9.5', '', True),
+        ('4.9.5', '4.9.5', True),
+        ('4.9.4', '4.9.5', False),
+        ('1.2.7', '1.2', True),
+        ('1.3.0', '1.2', False),
+        ('1.2.3', '^1.0.0', True),
+        ('2.0.0', '^1.0.0', False),
+        ('0.2.5', '^0.2.3', True),
+        ('0.3.0', '^0.2.3', False),
+        ('1.2.9', '~1.2.3', True),
+        ('1.3.0', '~1.2.3', False),
+        ('2.1.0', '1.x || 2.x', True),
+        ('3.0.0', '1.x || 2.x', False),
+        ('1.5.0', '>=1 <2', True),
+        ('2.0.0', '>=1 <2', False),
+        ('2.0.0-beta.1', '^1.0.0', False),
+        ('4.9.5', 'latest', True),
+        ('7.0.4', '~> 7.0', True),
+        ('8.0.0', '~> 7.0', False),
+        ('7.0.9', '~> 7.0.4', True),
+        ('7.1.0', '~> 7.0.4', False),
+        ('1.5.0', '>= 1, < 2', True),
+        ('1.0.0', '!= 1.0.0', False),
+    ],
+)
+def test_satisfies(version, requirement, expected):
+    assert satisfies(version, requirement) == expected
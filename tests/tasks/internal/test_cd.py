@@ -1,4 +1,5 @@
 import os
+import tempfile
 from unittest import TestCase
 from unittest.mock import call, patch
 
@@ -12,7 +13,13 @@ class TestCd(TestCase):
     def setUp(self):
         Cd.base_path = '/dummy'  # type: ignore
 
-    @patch('dev.tasks.internal.cd.IntPrompt')
+        cache_path = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_path.cleanup)
+        cache_path_patch = patch('dev.helpers.frecency.environment.cache_path', cache_path.name)
+        cache_path_patch.start()
+        self.addCleanup(cache_path_patch.stop)
+
+    @patch('rich.prompt.IntPrompt')
     @patch('dev.tasks.internal.cd.ParentShellHelper')
     @patch('dev.tasks.internal.cd.Cd.list_entries')
     def test_up_without_arg(self, list_entries_mock, parent_shell_mock, int_prompt_mock):
@@ -26,12 +33,32 @@ class TestCd(TestCase):
         int_prompt_mock.ask.assert_called_once()
         parent_shell_mock.run.assert_called_once_with('cd /dummy/github.com/acme/b')
 
-    @patch('dev.tasks.internal.cd.IntPrompt')
+    @patch('rich.prompt.IntPrompt')
+    @patch('dev.tasks.internal.cd.ParentShellHelper')
+    @patch('dev.tasks.internal.cd.Cd.list_entries')
+    @patch('dev.tasks.internal.cd.Frecency.record')
+    def test_up_empty_query(
+        self, record_mock, list_entries_mock, parent_shell_mock, int_prompt_mock
+    ):
+        int_prompt_mock.ask.return_value = 2
+        list_entries_mock.return_value = [
+            SearchEntry(host='github.com', organization='acme', repository='a'),
+            SearchEntry(host='github.com', organization='acme', repository='b'),
+        ]
+
+        for query in ['', '/']:
+            Cd([query], extra_args=[])
+
+        self.assertEqual(int_prompt_mock.ask.call_count, 2)
+        parent_shell_mock.run.assert_has_calls([call('cd /dummy/github.com/acme/b')] * 2)
+
+    @patch('rich.prompt.IntPrompt')
     @patch('dev.tasks.internal.cd.ParentShellHelper')
     @patch('dev.tasks.internal.cd.Cd.list_entries')
-    @patch('dev.tasks.internal.cd.Table.add_row')
+    @patch('rich.table.Table.add_row')
+    @patch('dev.tasks.internal.cd.Frecency.record')
     def test_up_fuzzy_search(
-        self, add_row_mock, list_entries_mock, parent_shell_mock, int_prompt_mock
+        self, record_mock, add_row_mock, list_entries_mock, parent_shell_mock, int_prompt_mock
     ):
         list_entries_mock.return_value = [
             SearchEntry(repository='abc', host='github.com', organization='acme'),
@@ -50,33 +77,62 @@ class TestCd(TestCase):
         parent_shell_mock.run.reset_mock()
 
         int_prompt_mock.ask.return_value = 2
-        Cd(['b'], extra_args=[])
+        Cd(['bc'], extra_args=[])
 
         int_prompt_mock.ask.assert_called_once()
         add_row_mock.assert_has_calls(
             [
-                call('1', 'abc', 'acme', 'github.com', '/dummy/github.com/acme/abc'),
-                call('2', 'bcd', 'acme', 'github.com', '/dummy/github.com/acme/bcd'),
+                call('1', 'bcd', 'acme', 'github.com', '/dummy/github.com/acme/bcd'),
+                call('2', 'abc', 'acme', 'github.com', '/dummy/github.com/acme/abc'),
             ]
         )
-        parent_shell_mock.run.assert_has_calls([call('cd /dummy/github.com/acme/bcd')])
+        parent_shell_mock.run.assert_has_calls([call('cd /dummy/github.com/acme/abc')])
 
         int_prompt_mock.ask.reset_mock()
         add_row_mock.reset_mock()
         parent_shell_mock.run.reset_mock()
 
-        int_prompt_mock.ask.return_value = 3
+        # A single character only matches the start of a name
         Cd(['c'], extra_args=[])
 
-        int_prompt_mock.ask.assert_called_once()
-        add_row_mock.assert_has_calls(
-            [
-                call('1', 'abc', 'acme', 'github.com', '/dummy/github.com/acme/abc'),
-                call('2', 'bcd', 'acme', 'github.com', '/dummy/github.com/acme/bcd'),
-                call('3', 'cde', 'acme', 'github.com', '/dummy/github.com/acme/cde'),
-            ]
-        )
-        parent_shell_mock.run.assert_has_calls([call('cd /dummy/github.com/acme/cde')])
+        int_prompt_mock.ask.assert_not_called()
+        parent_shell_mock.run.assert_called_once_with('cd /dummy/github.com/acme/cde')
+
+    @patch('rich.prompt.IntPrompt')
+    @patch('dev.tasks.internal.cd.ParentShellHelper')
+    @patch('dev.tasks.internal.cd.Cd.list_entries')
+    def test_up_clear_winner(self, list_entries_mock, parent_shell_mock, int_prompt_mock):
+        list_entries_mock.return_value = [
+            SearchEntry(repository='api', host='github.com', organization='acme'),
+            SearchEntry(repository='api-gateway', host='github.com', organization='acme'),
+            SearchEntry(repository='api', host='github.com', organization='other'),
+        ]
+
+        Cd(['acme/api'], extra_args=[])
+
+        int_prompt_mock.ask.assert_not_called()
+        parent_shell_mock.run.assert_called_once_with('cd /dummy/github.com/acme/api')
+
+    @patch('rich.prompt.IntPrompt')
+    @patch('dev.tasks.internal.cd.ParentShellHelper')
+    @patch('dev.tasks.internal.cd.Cd.list_entries')
+    @patch('rich.table.Table.add_row')
+    def test_up_frecency(self, add_row_mock, list_entries_mock, parent_shell_mock, int_prompt_mock):
+        list_entries_mock.return_value = [
+            SearchEntry(repository='web', host='github.com', organization='acme'),
+            SearchEntry(repository='web-legacy', host='github.com', organization='acme'),
+        ]
+
+        int_prompt_mock.ask.return_value = 2
+        Cd(['we'], extra_args=[])
+        parent_shell_mock.run.assert_called_once_with('cd /dummy/github.com/acme/web-legacy')
+
+        add_row_mock.reset_mock()
+        int_prompt_mock.ask.return_value = 1
+        Cd(['we'], extra_args=[])
+
+        # Selected before, now listed first
+        self.assertEqual(add_row_mock.call_args_list[0].args[1], 'web-legacy')
 
     @patch('dev.tasks.internal.cd.Cd.list_entries')
     @patch('dev.tasks.internal.cd.error_console.print')
@@ -92,7 +148,7 @@ class TestCd(TestCase):
             'Could not find any repositories matching [b]d[/]', style='red'
         )
 
-    @patch('dev.tasks.internal.cd.IntPrompt')
+    @patch('rich.prompt.IntPrompt')
     @patch('dev.tasks.internal.cd.Cd.list_entries')
     @patch('dev.tasks.internal.cd.error_console.print')
     def test_up_select_out_of_range(self, console_print_mock, list_entries_mock, int_prompt_mock):
@@ -104,13 +160,14 @@ class TestCd(TestCase):
         int_prompt_mock.ask.return_value = 3
 
         with pytest.raises(SystemExit):
-            Cd(['b'], extra_args=[])
+            Cd(['bc'], extra_args=[])
 
         console_print_mock.assert_called_once_with('Answer must be in interval 1 to 2', style='red')
 
-    @patch('dev.tasks.internal.cd.IntPrompt')
-    @patch('dev.tasks.internal.cd.Table.add_row')
+    @patch('rich.prompt.IntPrompt')
+    @patch('rich.table.Table.add_row')
     @patch('dev.tasks.internal.cd.SearchEntry.path')
+    @patch('dev.helpers.repository_index.environment.cache_path', '/nonexistent/cache')
     def test_up_list_entries(self, path_mock, add_row_mock, int_prompt_mock):
         Cd.git_identifier = ".fakegit"
         Cd.base_path = os.path.abspath(f'{root_path}/../tests/data/src')  # type: ignore
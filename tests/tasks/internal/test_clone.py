@@ -1,9 +1,11 @@
+import tempfile
 from unittest import TestCase
 from unittest.mock import patch
 
 import docopt
 import pytest
 
+from dev.exceptions import NonZeroReturnCodeError
 from dev.tasks.internal.clone import Clone
 
 
@@ -15,10 +17,11 @@ class TestClone(TestCase):
         with pytest.raises(docopt.DocoptExit):
             Clone([], extra_args=[])
 
+    @patch('dev.tasks.internal.clone.RepositoryIndex')
     @patch('dev.tasks.internal.clone.ParentShellHelper')
     @patch('dev.tasks.internal.clone.GitHelper')
     @patch('dev.tasks.internal.clone.run_command')
-    def test_up(self, run_command_mock, git_helper_mock, parent_shell_mock):
+    def test_up(self, run_command_mock, git_helper_mock, parent_shell_mock, repository_index_mock):
         git_helper_mock.get_remote_origin.return_value = ('github.com', 'a', 'b')
 
         Clone(['c'], extra_args=[])
@@ -29,6 +32,8 @@ class TestClone(TestCase):
             'git clone https://github.com/a/c.git /dummy/github.com/a/c'
         )
         parent_shell_mock.run.assert_called_once_with('cd /dummy/github.com/a/c')
+        repository_index_mock.assert_called_once_with('/dummy')
+        repository_index_mock().add.assert_called_once_with('/dummy/github.com/a/c')
 
         git_helper_mock.parse_url.assert_not_called()
 
@@ -154,3 +159,71 @@ class TestClone(TestCase):
         run_command_mock.assert_not_called()
         parent_shell_mock.run.assert_not_called()
         get_remote_origin_mock.assert_not_called()
+
+    @patch('dev.tasks.internal.clone.console.print')
+    @patch('dev.tasks.internal.clone.RepositoryIndex')
+    @patch('dev.tasks.internal.clone.ParentShellHelper')
+    @patch('dev.tasks.internal.clone.GitHelper')
+    @patch('dev.tasks.internal.clone.run_command_async')
+    def test_up_many(
+        self,
+        run_command_async_mock,
+        git_helper_mock,
+        parent_shell_mock,
+        repository_index_mock,
+        console_print_mock,
+    ):
+        Clone(['--jobs=2', '--filter=blob:none', 'c/d', 'c/e'], extra_args=[])
+
+        git_helper_mock.setup_config.assert_called_once_with()
+        commands = sorted(call.args[0] for call in run_command_async_mock.call_args_list)
+        assert commands == [
+            'git clone --quiet --filter=blob:none https://github.com/c/d.git '
+            '/dummy/github.com/c/d 2>&1',
+            'git clone --quiet --filter=blob:none https://github.com/c/e.git '
+            '/dummy/github.com/c/e 2>&1',
+        ]
+        repository_index_mock.assert_called_once_with('/dummy')
+        assert sorted(call.args[0] for call in repository_index_mock().add.call_args_list) == [
+            '/dummy/github.com/c/d',
+            '/dummy/github.com/c/e',
+        ]
+        parent_shell_mock.run.assert_not_called()
+
+    @patch('dev.tasks.internal.clone.error_console.print')
+    @patch('dev.tasks.internal.clone.console.print')
+    @patch('dev.tasks.internal.clone.RepositoryIndex')
+    @patch('dev.tasks.internal.clone.GitHelper')
+    @patch('dev.tasks.internal.clone.run_command_async')
+    def test_up_manifest_with_failure(
+        self,
+        run_command_async_mock,
+        git_helper_mock,
+        repository_index_mock,
+        console_print_mock,
+        error_print_mock,
+    ):
+        def clone(command, silent, capture):
+            if '/c/e' in command:
+                capture.feed('fatal: repository not found')
+                raise NonZeroReturnCodeError(128, command)
+            return None
+
+        run_command_async_mock.side_effect = clone
+
+        with tempfile.NamedTemporaryFile('w', suffix='.txt') as manifest:
+            manifest.write('# Team repositories\nc/d\n\nc/e  # archived soon\n')
+            manifest.flush()
+            with pytest.raises(SystemExit):
+                Clone([f'--manifest={manifest.name}', '--reference=/cache'], extra_args=[])
+
+        assert run_command_async_mock.call_count == 2
+        assert '--reference-if-able=/cache' in run_command_async_mock.call_args.args[0]
+        repository_index_mock().add.assert_called_once_with('/dummy/github.com/c/d')
+        clone_error, task_error = error_print_mock.call_args_list
+        assert clone_error.args[0].endswith(
+            'Failed to clone /dummy/github.com/c/e: fatal: repository not found'
+        )
+        assert task_error.args[0] == (
+            'Failed to run [b]Clone[/] task: Failed to clone 1 of 2 repositories'
+        )
@@ -0,0 +1,77 @@
+import time
+from unittest.mock import patch
+
+import pytest
+
+from dev.helpers.run_history import COMMAND, FAILED, SKIPPED, SUCCEEDED, TASK
+from dev.tasks.internal.stats import Stats, format_duration, format_trend, percentile
+
+
+def test_percentile():
+    durations = [float(duration) for duration in range(1, 101)]
+
+    assert percentile(durations, 50) == 50
+    assert percentile(durations, 95) == 95
+    assert percentile([7.0], 95) == 7
+
+
+def test_format_duration():
+    assert format_duration(850) == '850 ms'
+    assert format_duration(12_340) == '12.3 s'
+    assert format_duration(252_000) == '4m 12s'
+
+
+def test_format_trend():
+    assert format_trend([130.0], [100.0]) == '[red]+30%[/]'
+    assert format_trend([50.0], [100.0]) == '[green]-50%[/]'
+    assert format_trend([105.0], [100.0]) == '+5%'
+    assert format_trend([105.0], []) == ''
+
+
+@pytest.fixture
+def runs():
+    now = time.time()
+    day = 86400
+    with patch('dev.tasks.internal.stats.RunHistoryHelper.runs') as runs_mock, patch(
+        'dev.tasks.internal.stats.environment.name', 'app', create=True
+    ):
+        runs_mock.return_value = [
+            (now - 10 * day, 'up', TASK, 'pip', 'requirements.txt', 1000.0, SUCCEEDED),
+            (now - 10 * day, 'up', COMMAND, 'up', '', 2000.0, SUCCEEDED),
+            (now - day, 'up', TASK, 'pip', 'requirements.txt', 3000.0, SUCCEEDED),
+            (now - day, 'up', TASK, 'npm', 'yarn', 1.0, SKIPPED),
+            (now - day, 'up', COMMAND, 'up', '', 4000.0, SUCCEEDED),
+            (now, 'up', TASK, 'pip', 'requirements.txt', 500.0, FAILED),
+            (now, 'up', COMMAND, 'up', '', 600.0, FAILED),
+        ]
+        yield runs_mock
+
+
+@patch('dev.tasks.internal.stats.console.print')
+def test_stats(console_print_mock, runs):
+    Stats([], extra_args=[])
+
+    commands, tasks = [c.args[0] for c in console_print_mock.call_args_list]
+    assert commands.title == 'Commands of app in the last 7 days'
+    assert [list(column.cells) for column in commands.columns] == [
+        ['up'],
+        ['2'],
+        ['1'],
+        ['600 ms'],
+        ['4.0 s'],
+        ['[green]-70%[/]'],
+    ]
+    assert [list(column.cells) for column in tasks.columns][0] == ['pip', 'npm']
+    assert list(tasks.columns[-1].cells) == ['requirements.txt', 'yarn']
+    assert list(tasks.columns[3].cells) == ['500 ms', '']
+
+
+@patch('dev.tasks.internal.stats.console.print')
+def test_stats_without_runs(console_print_mock, runs):
+    runs.return_value = []
+
+    Stats(['--days=30'], extra_args=[])
+
+    console_print_mock.assert_called_once_with(
+        'No runs of [b]app[/] in the last 30 days', style='yellow'
+    )
@@ -0,0 +1,90 @@
+import os
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+from dev.tasks.internal.cd import Cd
+from dev.tasks.internal.sync import FAILED, FETCHED, UP_TO_DATE, UPDATED, GitTimeout, Sync
+
+
+def git(cwd, *args):
+    return subprocess.run(
+        ['git', *args], cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+def commit(path, message):
+    git(
+        path,
+        '-c',
+        'user.name=Dev',
+        '-c',
+        'user.email=dev@example.com',
+        'commit',
+        '-q',
+        '--allow-empty',
+        '-m',
+        message,
+    )
+
+
+@pytest.fixture
+def src(tmp_path, monkeypatch):
+    monkeypatch.setenv('HOME', str(tmp_path))
+    monkeypatch.setenv('GIT_CONFIG_NOSYSTEM', '1')
+    monkeypatch.setattr(Cd, 'base_path', tmp_path / 'src')
+    monkeypatch.setattr(Cd, 'git_identifier', '.git')
+
+    acme = tmp_path / 'src' / 'example.com' / 'acme'
+    upstream = tmp_path / 'upstream'
+    upstream.mkdir()
+    git(upstream, 'init', '-q', '-b', 'main')
+    commit(upstream, 'Initial')
+
+    for name in ['behind', 'current', 'ahead', 'dirty', 'feature', 'broken']:
+        git(tmp_path, 'clone', '-q', str(upstream), str(acme / name))
+
+    commit(upstream, 'Second')
+    commit(upstream, 'Third')
+
+    git(acme / 'current', 'pull', '-q')
+    git(acme / 'ahead', 'pull', '-q')
+    commit(acme / 'ahead', 'Local')
+    (acme / 'dirty' / '.keep').write_text('')
+    git(acme / 'dirty', 'add', '.keep')
+    git(acme / 'feature', 'checkout', '-q', '-b', 'feature')
+    git(acme / 'broken', 'remote', 'set-url', 'origin', str(tmp_path / 'missing'))
+
+    with patch('dev.helpers.repository_index.environment.cache_path', str(tmp_path / 'cache')):
+        yield acme
+
+
+@patch('dev.task.error_console.print')
+@patch('dev.tasks.internal.sync.Sync.render_summary')
+def test_up(render_summary_mock, error_console_print_mock, src):
+    with pytest.raises(SystemExit):
+        Sync(['--jobs=2'], extra_args=[])
+
+    results = {
+        os.path.basename(path): (status, details)
+        for path, status, details in render_summary_mock.call_args.args[0]
+    }
+    assert results['behind'] == (UPDATED, 'main fast-forwarded 2 commits')
+    assert results['current'] == (UP_TO_DATE, '')
+    assert results['ahead'] == (FETCHED, 'main is ahead of origin, not pushed')
+    assert results['dirty'] == (FETCHED, 'main has local changes')
+    assert results['feature'] == (FETCHED, 'on feature')
+    assert results['broken'][0] == FAILED
+
+    assert git(src / 'behind', 'rev-parse', 'HEAD') == git(src / 'current', 'rev-parse', 'HEAD')
+    error_console_print_mock.assert_called_once_with(
+        'Failed to run [b]Sync[/] task: Failed to sync 1 of 6 repositories', style='red'
+    )
+
+
+@patch('dev.tasks.internal.sync.git')
+def test_sync_timeout(git_mock):
+    git_mock.side_effect = GitTimeout
+
+    assert Sync.sync(Sync.__new__(Sync), '/dummy', 5) == ('/dummy', FAILED, 'timed out after 5s')
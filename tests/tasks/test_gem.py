@@ -0,0 +1,42 @@
+from unittest.mock import patch
+
+from dev.tasks.gem import Gem
+
+gem_list_output = '''
+*** LOCAL GEMS ***
+
+bundler (2.4.6, default: 2.3.26)
+nokogiri (1.14.2 x86_64-darwin)
+rails (7.0.4)
+'''
+
+
+@patch('dev.tasks.gem.run_command')
+def test_up(run_command_mock):
+    run_command_mock.return_value = gem_list_output
+
+    Gem(
+        ['bundler', 'rails:~> 7.0', 'nokogiri:>= 1.14, < 2', 'rake', 'rubocop:1.45.1'],
+        extra_args=[],
+    )
+
+    assert run_command_mock.call_count == 2
+    run_command_mock.assert_called_with('gem install rake rubocop:1.45.1')
+
+
+@patch('dev.tasks.gem.run_command')
+def test_up_outdated(run_command_mock):
+    run_command_mock.return_value = gem_list_output
+
+    Gem(['rails:~> 7.1', 'bundler:2.3.26'], extra_args=[])
+
+    run_command_mock.assert_called_with("gem install 'rails:~> 7.1'")
+
+
+@patch('dev.tasks.gem.run_command')
+def test_up_already_installed(run_command_mock):
+    run_command_mock.return_value = gem_list_output
+
+    Gem('rails', extra_args=[])
+
+    run_command_mock.assert_called_once_with('gem list --local', output=True, silent=True)
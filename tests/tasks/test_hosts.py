@@ -0,0 +1,79 @@
+import re
+from unittest.mock import patch
+
+import pytest
+
+from dev.tasks.hosts import Hosts, reconcile
+
+system_hosts = '127.0.0.1\tlocalhost\n255.255.255.255 broadcasthost\n'
+
+
+def test_reconcile():
+    content = reconcile(system_hosts, 'app', {'app.test': '127.0.0.1', 'localhost': '127.0.0.1'})
+
+    assert content == (
+        system_hosts + '# BEGIN dev app\n' '127.0.0.1            app.test\n' '# END dev app\n'
+    )
+    assert reconcile(content, 'app', {'app.test': '127.0.0.1', 'localhost': '127.0.0.1'}) == content
+
+
+def test_reconcile_replaces_block_in_place():
+    content = (
+        '# BEGIN dev app\n127.0.0.1 old.test\n# END dev app\n'
+        '# BEGIN dev other\n127.0.0.1 other.test\n# END dev other\n'
+    )
+
+    assert reconcile(content, 'app', {'new.test': '10.0.0.1'}) == (
+        '# BEGIN dev app\n10.0.0.1             new.test\n# END dev app\n'
+        '# BEGIN dev other\n127.0.0.1 other.test\n# END dev other\n'
+    )
+    assert (
+        reconcile(content, 'app', {})
+        == '# BEGIN dev other\n127.0.0.1 other.test\n# END dev other\n'
+    )
+
+
+def test_reconcile_ignores_spacing_of_existing_entries():
+    content = '127.0.0.1     app.test   api.test # added by hand\n'
+
+    assert reconcile(content, 'app', {'app.test': '127.0.0.1', 'api.test': '127.0.0.1'}) == content
+
+
+@pytest.fixture
+def hosts_file(tmp_path):
+    filename = tmp_path / 'hosts'
+    filename.write_text(system_hosts)
+    with patch.object(Hosts, 'hosts_filename', str(filename)), patch(
+        'dev.tasks.hosts.environment.name', 'app', create=True
+    ):
+        yield filename
+
+
+@patch('dev.tasks.hosts.run_command')
+def test_up(run_command_mock, hosts_file):
+    Hosts({'app.test': '127.0.0.1'}, extra_args=[])
+
+    run_command_mock.assert_called_once()
+    assert re.fullmatch(
+        rf'install -m 644 \S+ {hosts_file}.dev-(\d+) && mv -f {hosts_file}.dev-\1 {hosts_file}',
+        run_command_mock.call_args.args[0],
+    )
+    assert run_command_mock.call_args.kwargs == {'sudo': True, 'silent': True}
+
+
+@patch('dev.tasks.hosts.run_command')
+def test_up_unchanged(run_command_mock, hosts_file):
+    hosts_file.write_text(system_hosts + '127.0.0.1 app.test\n')
+
+    Hosts({'app.test': '127.0.0.1'}, extra_args=[])
+
+    run_command_mock.assert_not_called()
+
+
+@patch('dev.tasks.hosts.Hosts.write')
+def test_down(write_mock, hosts_file):
+    hosts_file.write_text(system_hosts + '# BEGIN dev app\n127.0.0.1 app.test\n# END dev app\n')
+
+    Hosts({'app.test': '127.0.0.1'}, extra_args=[], direction='down')
+
+    write_mock.assert_called_once_with(system_hosts)
@@ -0,0 +1,90 @@
+from unittest.mock import call, patch
+
+import pytest
+
+from dev.exceptions import NonZeroReturnCodeError
+from dev.tasks.nginx import Nginx
+
+
+@pytest.fixture
+def prefix(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'nginx').mkdir()
+    (tmp_path / 'nginx' / 'app.conf').write_text('root {{ repo_base_path }};\n')
+    (tmp_path / 'homebrew' / 'etc' / 'nginx' / 'servers').mkdir(parents=True)
+
+    with patch('dev.tasks.nginx.HomebrewHelper') as homebrew_helper_mock, patch(
+        'dev.tasks.nginx.Nginx.install_sudoers'
+    ), patch('dev.tasks.nginx.environment.cache_path', str(tmp_path / 'cache')):
+        homebrew_helper_mock.prefix.return_value = str(tmp_path / 'homebrew')
+        yield tmp_path / 'homebrew'
+
+
+@patch('dev.tasks.nginx.Nginx.running', return_value=True)
+@patch('dev.tasks.nginx.run_command')
+def test_up(run_command_mock, running_mock, prefix, tmp_path):
+    Nginx({'sites': ['nginx/app.conf']}, extra_args=[])
+
+    assert (prefix / 'etc' / 'nginx' / 'servers' / 'app.conf').read_text() == f'root {tmp_path};'
+    run_command_mock.assert_has_calls(
+        [
+            call(f'{prefix}/bin/nginx -t', sudo=True, wrap_sudo_in_shell=False),
+            call(f'{prefix}/bin/nginx -s reload', sudo=True, wrap_sudo_in_shell=False),
+        ]
+    )
+    assert list((tmp_path / 'cache' / 'jinja2').iterdir())
+
+    run_command_mock.reset_mock()
+    Nginx({'sites': ['nginx/app.conf']}, extra_args=[])
+
+    run_command_mock.assert_not_called()
+
+
+@patch('dev.tasks.nginx.Nginx.running', return_value=False)
+@patch('dev.tasks.nginx.run_command')
+def test_up_not_running(run_command_mock, running_mock, prefix):
+    Nginx({'sites': ['nginx/app.conf']}, extra_args=[])
+
+    run_command_mock.assert_has_calls(
+        [
+            call('brew services stop nginx', silent=True, ok_exit_codes=[0, 1]),
+            call('brew services stop nginx', sudo=True, wrap_sudo_in_shell=False),
+            call('brew services start nginx', sudo=True, wrap_sudo_in_shell=False),
+        ]
+    )
+
+
+@patch('dev.task.error_console.print')
+@patch('dev.tasks.nginx.Nginx.running', return_value=True)
+@patch('dev.tasks.nginx.run_command')
+def test_up_invalid_configuration(run_command_mock, running_mock, console_print_mock, prefix):
+    server = prefix / 'etc' / 'nginx' / 'servers' / 'app.conf'
+    server.write_text('previous')
+    run_command_mock.side_effect = NonZeroReturnCodeError(1, 'nginx -t')
+
+    with pytest.raises(SystemExit):
+        Nginx({'sites': ['nginx/app.conf']}, extra_args=[])
+
+    assert server.read_text() == 'previous'
+    console_print_mock.assert_called_once_with(
+        'Failed to run [b]Nginx[/] task: nginx rejected the new configuration, the previous one '
+        'was restored',
+        style='red',
+    )
+
+
+@patch('dev.tasks.nginx.run_command')
+def test_install_sudoers_removes_legacy_file(run_command_mock, tmp_path):
+    (tmp_path / 'brew_services_nginx').write_text('')
+
+    with patch('dev.tasks.nginx.Nginx.sudoers_path', str(tmp_path)):
+        Nginx.install_sudoers(Nginx, '/opt/homebrew')
+
+    assert '/opt/homebrew/bin/nginx -s reload' in open('/tmp/dev_nginx').read()
+    run_command_mock.assert_has_calls(
+        [
+            call('chown root /tmp/dev_nginx', sudo=True),
+            call(f'mv /tmp/dev_nginx {tmp_path}/dev_nginx', sudo=True),
+            call(f'rm -f {tmp_path}/brew_services_nginx', sudo=True),
+        ]
+    )
@@ -0,0 +1,50 @@
+import json
+from unittest.mock import patch
+
+from dev.tasks.npm import Npm, split_package
+
+npm_ls_output = json.dumps(
+    {
+        'dependencies': {
+            'typescript': {'version': '4.9.5'},
+            '@angular/cli': {'version': '15.1.0'},
+        }
+    }
+)
+
+
+def test_split_package():
+    assert split_package('typescript') == ('typescript', '')
+    assert split_package('typescript@^4.9') == ('typescript', '^4.9')
+    assert split_package('@angular/cli') == ('@angular/cli', '')
+    assert split_package('@angular/cli@>=15 <16') == ('@angular/cli', '>=15 <16')
+
+
+@patch('dev.tasks.npm.run_command')
+def test_up(run_command_mock):
+    run_command_mock.return_value = npm_ls_output
+
+    Npm(['typescript@^4.9', '@angular/cli', 'eslint', 'prettier@2'], extra_args=[])
+
+    assert run_command_mock.call_count == 2
+    run_command_mock.assert_called_with('npm install -g eslint prettier@2')
+
+
+@patch('dev.tasks.npm.run_command')
+def test_up_outdated(run_command_mock):
+    run_command_mock.return_value = npm_ls_output
+
+    Npm(['typescript@5', '@angular/cli@~15.1.0'], extra_args=[])
+
+    run_command_mock.assert_called_with('npm install -g typescript@5')
+
+
+@patch('dev.tasks.npm.run_command')
+def test_up_already_installed(run_command_mock):
+    run_command_mock.return_value = npm_ls_output
+
+    Npm('typescript', extra_args=[])
+
+    run_command_mock.assert_called_once_with(
+        'npm ls -g --json --depth=0', output=True, silent=True, ok_exit_codes=[0, 1]
+    )
@@ -1,37 +1,124 @@
+import sys
 from unittest.mock import call, patch
 
 import pytest
 
-from dev.tasks.pip import Pip
+from dev.tasks.pip import Pip, Requirements
+
+
+@pytest.fixture(autouse=True)
+def requirements(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'requirements').mkdir()
+    (tmp_path / 'requirements' / 'base.txt').write_text('docopt==0.6.2\n    # via -r base.in\n')
+    (tmp_path / 'requirements' / 'development.txt').write_text(
+        '-r base.txt\n-c constraints.txt\nPytest[testing] == 7.2.1  # tests\n'
+    )
+    (tmp_path / 'requirements' / 'constraints.txt').write_text('rich==13.3.1\n')
+    (tmp_path / 'requirements.txt').write_text('requests>=2\n')
+
+
+@pytest.fixture
+def site_packages(tmp_path):
+    path = tmp_path / 'venv' / 'lib' / 'python3.11' / 'site-packages'
+    for name, version in [('docopt', '0.6.2'), ('pytest', '7.2.0')]:
+        dist_info = path / f'{name}-{version}.dist-info'
+        dist_info.mkdir(parents=True)
+        (dist_info / 'METADATA').write_text(
+            f'Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n'
+        )
+    with patch('dev.tasks.pip.Pip.site_packages', return_value=str(path)):
+        yield path
+
+
+def test_requirements():
+    requirements = Requirements(['requirements/development.txt'])
+
+    assert requirements.filenames == [
+        'requirements/development.txt',
+        'requirements/base.txt',
+        'requirements/constraints.txt',
+    ]
+    assert requirements.constraints == ['requirements/constraints.txt']
+    assert requirements.pins == [
+        ('docopt', '0.6.2', 'docopt==0.6.2'),
+        ('pytest', '7.2.1', 'Pytest[testing] == 7.2.1'),
+    ]
+    assert not requirements.opaque
+    assert Requirements(['requirements.txt']).opaque
+
+
+def test_fingerprint_includes(tmp_path):
+    fingerprint = Pip.fingerprint('requirements/development.txt', []).hexdigest()
+    assert Pip.fingerprint('requirements/development.txt', []).hexdigest() == fingerprint
+
+    for included in ['base.txt', 'constraints.txt']:
+        (tmp_path / 'requirements' / included).write_text(f'# {included} changed\n')
+        changed = Pip.fingerprint('requirements/development.txt', []).hexdigest()
+        assert changed != fingerprint
+        fingerprint = changed
+
+
+def test_fingerprint_missing_file():
+    assert Pip.fingerprint('missing.txt', []).hexdigest() != Pip.fingerprint(None, []).hexdigest()
 
 
 @patch('dev.tasks.pip.run_command')
-def test_up(run_command_mock):
+def test_up(run_command_mock, site_packages):
     Pip('requirements/base.txt', extra_args=[])
 
-    run_command_mock.assert_has_calls(
-        [
-            call('pip --disable-pip-version-check -q install -r requirements/base.txt'),
-        ]
+    run_command_mock.assert_not_called()
+
+
+@patch('dev.tasks.pip.run_command')
+def test_up_list(run_command_mock, site_packages):
+    Pip(['requirements/base.txt', 'requirements/development.txt'], extra_args=[])
+
+    run_command_mock.assert_called_once_with(
+        "pip --disable-pip-version-check -q install -c requirements/constraints.txt "
+        "'Pytest[testing] == 7.2.1'"
     )
 
 
+@patch('dev.tasks.pip.Pip.stamp', return_value='stamp')
+@patch('dev.tasks.pip.HashCacheHelper.write_hash')
+@patch('dev.tasks.pip.HashCacheHelper.read_hash', return_value=None)
+@patch('dev.tasks.pip.Pip.site_packages', return_value=None)
 @patch('dev.tasks.pip.run_command')
-def test_up_list(run_command_mock):
+def test_up_list_without_site_packages(
+    run_command_mock, site_packages_mock, read_hash_mock, write_hash_mock, stamp_mock
+):
     Pip(['requirements/base.txt', 'requirements/development.txt'], extra_args=[])
 
-    run_command_mock.assert_has_calls(
-        [
-            call('pip --disable-pip-version-check -q install -r requirements/base.txt'),
-            call('pip --disable-pip-version-check -q install -r requirements/development.txt'),
-        ]
+    run_command_mock.assert_called_once_with(
+        'pip --disable-pip-version-check -q install '
+        '-r requirements/base.txt -r requirements/development.txt'
     )
+    write_hash_mock.assert_called_once()
 
 
-@patch('dev.tasks.pip.os.path.exists')
+@patch('dev.tasks.pip.Pip.stamp', return_value='stamp')
+@patch('dev.tasks.pip.HashCacheHelper.write_hash')
+@patch('dev.tasks.pip.HashCacheHelper.read_hash', return_value=None)
 @patch('dev.tasks.pip.run_command')
-def test_up_default(run_command_mock, path_exists_mock):
-    path_exists_mock.return_value = True
+def test_up_without_importlib_metadata(
+    run_command_mock, read_hash_mock, write_hash_mock, stamp_mock, site_packages
+):
+    # Python 3.7 has no importlib.metadata
+    with patch.dict(sys.modules, {'importlib.metadata': None}):
+        Pip('requirements/base.txt', extra_args=[])
+
+    run_command_mock.assert_called_once_with(
+        'pip --disable-pip-version-check -q install -r requirements/base.txt'
+    )
+
+
+@patch('dev.tasks.pip.Pip.stamp', return_value='stamp')
+@patch('dev.tasks.pip.HashCacheHelper.write_hash')
+@patch('dev.tasks.pip.HashCacheHelper.read_hash')
+@patch('dev.tasks.pip.run_command')
+def test_up_default(run_command_mock, read_hash_mock, write_hash_mock, stamp_mock, site_packages):
+    read_hash_mock.return_value = None
 
     Pip(None, extra_args=[])
 
@@ -40,6 +127,14 @@ def test_up_default(run_command_mock, path_exists_mock):
             call('pip --disable-pip-version-check -q install -r requirements.txt'),
         ]
     )
+    write_hash_mock.assert_called_once_with(write_hash_mock.call_args.args[0], 'stamp')
+
+    read_hash_mock.return_value = 'stamp'
+    run_command_mock.reset_mock()
+
+    Pip(None, extra_args=[])
+
+    run_command_mock.assert_not_called()
 
 
 @patch('dev.task.error_console.print')
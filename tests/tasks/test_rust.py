@@ -0,0 +1,16 @@
+from unittest.mock import patch
+
+from dev.tasks.rust import Rust
+
+
+@patch('dev.tasks.rust.ProbeHelper.output', return_value='/toolchain')
+def test_rust_path_follows_toolchain_overrides(probe_mock, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    assert str(Rust.rust_path.fget(Rust)) == '/toolchain/bin'
+
+    files = probe_mock.call_args.kwargs['files']
+    assert str(tmp_path / 'rust-toolchain.toml') in files
+    assert str(tmp_path.parent / 'rust-toolchain') in files
+    assert '/rust-toolchain.toml' in files
+    assert probe_mock.call_args.kwargs['context'] == [str(tmp_path)]
@@ -1,3 +1,4 @@
+import json
 import sys
 from unittest.mock import call, patch
 
@@ -70,10 +71,60 @@ def test_down_command(resolve_mock):
     resolve_mock.assert_called_once_with('down', None)
 
 
+@patch('dev.cli.error_console.print')
+@patch('dev.cli.config.resolve_tasks', return_value={})
+def test_profile(resolve_mock, console_print_mock, tmp_path, monkeypatch):
+    monkeypatch.setenv('DEV_TRACE', str(tmp_path / 'trace.json'))
+    monkeypatch.setenv('INVOKED_VIA_SHELL', '1')
+
+    main(args=docopt_args({'<command>': 'up', '--profile': True}))
+
+    assert json.loads((tmp_path / 'trace.json').read_text())['traceEvents'] is not None
+    assert console_print_mock.call_count == 2
+    assert str(tmp_path / 'trace.json') in console_print_mock.call_args.args[0]
+
+
+@patch('dev.cli.write_trace')
+@patch('dev.cli.config.resolve_tasks', return_value={})
+def test_profile_after_command(resolve_mock, write_trace_mock):
+    from docopt import docopt
+
+    from dev import cli
+
+    for argv, extra_args, profile in [
+        (['--profile', 'up'], [], True),
+        (['up', '--profile'], [], True),
+        (['up', '--profile', '--', 'a'], ['a'], True),
+        (['up', '--', '--profile'], ['--profile'], False),
+        (['up', '--profile', '--'], [], True),
+    ]:
+        main(args=docopt(cli.__doc__, argv=argv, options_first=True))
+
+        resolve_mock.assert_called_with('up', extra_args)
+        write_trace_mock.assert_called_with(profile)
+
+
+@patch('dev.cli.config.resolve_tasks', return_value={})
+def test_extra_args_without_separator(resolve_mock):
+    from docopt import DocoptExit, docopt
+
+    from dev import cli
+
+    with pytest.raises(DocoptExit):
+        main(args=docopt(cli.__doc__, argv=['up', 'foo'], options_first=True))
+    resolve_mock.assert_not_called()
+
+    main(args=docopt(cli.__doc__, argv=['up', '--', 'foo'], options_first=True))
+    resolve_mock.assert_called_with('up', ['foo'])
+    main(args=docopt(cli.__doc__, argv=['sync', '--jobs=2'], options_first=True))
+    resolve_mock.assert_called_with('sync', ['--jobs=2'])
+
+
 def docopt_args(patch):
     args = {
         '--commands': False,
         '--help': False,
+        '--profile': False,
         '--tasks': False,
         '--version': False,
         '<command>': None,
@@ -0,0 +1,72 @@
+import os
+from unittest.mock import patch
+
+import pytest
+
+from dev import environment
+from dev.config import ConfigParser
+
+devfile = '''
+name: example
+version: 1
+
+up:
+  - python: 3.11.2
+  - pip: requirements.txt
+commands:
+  test: py.test
+'''
+
+
+@pytest.fixture(autouse=True)
+def restore_name():
+    with patch.object(environment, 'name', environment.name):
+        yield
+
+
+@pytest.fixture
+def devfile_path(tmp_path):
+    path = tmp_path / 'Devfile'
+    path.write_text(devfile)
+    with patch('dev.config.environment.cache_path', str(tmp_path / 'cache')):
+        yield path
+
+
+def test_load(devfile_path):
+    config = ConfigParser(str(devfile_path))
+
+    assert config.devfile['name'] == 'example'
+    assert [(t.name, t.args) for t in config.tasks['up']] == [
+        ('python', '3.11.2'),
+        ('pip', 'requirements.txt'),
+    ]
+    assert [(t.name, t.args) for t in config.tasks['test']] == [('run', 'py.test')]
+
+
+@patch('dev.config.ConfigParser.load_devfile', wraps=ConfigParser.load_devfile, autospec=True)
+def test_load_from_cache(load_devfile_mock, devfile_path):
+    ConfigParser(str(devfile_path))
+    config = ConfigParser(str(devfile_path))
+
+    load_devfile_mock.assert_called_once()
+    assert [(t.name, t.args) for t in config.tasks['test']] == [('run', 'py.test')]
+
+
+@patch('dev.config.ConfigParser.load_devfile', wraps=ConfigParser.load_devfile, autospec=True)
+def test_load_after_change(load_devfile_mock, devfile_path):
+    ConfigParser(str(devfile_path))
+
+    devfile_path.write_text(devfile.replace('py.test', 'py.test --cov=dev'))
+    stat = os.stat(devfile_path)
+    os.utime(devfile_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    config = ConfigParser(str(devfile_path))
+
+    assert load_devfile_mock.call_count == 2
+    assert [(t.name, t.args) for t in config.tasks['test']] == [('run', 'py.test --cov=dev')]
+
+
+def test_load_missing(tmp_path):
+    config = ConfigParser(str(tmp_path / 'Devfile'))
+
+    assert config.devfile == {}
+    assert config.tasks == {'up': [], 'down': []}
@@ -0,0 +1,278 @@
+import threading
+import time
+from unittest.mock import call, patch
+
+import pytest
+
+from dev.config import ConfigTask
+from dev.engine import Engine, TaskNode
+from dev.exceptions import NonZeroReturnCodeError
+from dev.helpers import task_context
+from dev.helpers.fingerprint import Fingerprint
+from dev.task import Task
+
+calls = []
+
+
+class FakeTask(Task):
+    __depends_on__ = []
+
+    def up(self, args, extra_args):
+        time.sleep(args.get('sleep', 0))
+        calls.append((args['name'], getattr(task_context, 'name', None)))
+        if args.get('fail'):
+            raise NonZeroReturnCodeError(args['fail'], args['name'])
+
+
+class Homebrew(FakeTask):
+    ...
+
+
+class Python(FakeTask):
+    __depends_on__ = ['homebrew']
+
+
+class Pip(FakeTask):
+    __depends_on__ = ['python']
+
+
+class Node(FakeTask):
+    __depends_on__ = ['homebrew']
+
+
+class Run(FakeTask):
+    __depends_on__ = None
+
+
+fake_tasks = {'homebrew': Homebrew, 'python': Python, 'pip': Pip, 'node': Node, 'run': Run}
+
+
+@pytest.fixture(autouse=True)
+def task_to_class_mock():
+    calls.clear()
+    with patch('dev.engine.task_to_class', side_effect=fake_tasks.__getitem__):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def prefetch_mock():
+    with patch('dev.engine.ProbeHelper.prefetch') as prefetch_mock:
+        yield prefetch_mock
+
+
+def tasks(*names, **args):
+    return [ConfigTask(name, dict(name=name, **args.get(name, {}))) for name in names]
+
+
+def test_build_graph():
+    engine = Engine(tasks('homebrew', 'python', 'pip', 'node', 'run', 'pip'), jobs=4)
+
+    assert [n.depends_on for n in engine.nodes] == [
+        set(),
+        {0},
+        {1},
+        {0},
+        {0, 1, 2, 3},
+        {1, 4},
+    ]
+
+
+def test_build_graph_compose_after_casks():
+    from dev.tasks.docker_compose import DockerCompose
+    from dev.tasks.homebrew_cask import HomebrewCask
+    from dev.tasks.podman_compose import PodmanCompose
+
+    real_tasks = {
+        'homebrew_cask': HomebrewCask,
+        'docker_compose': DockerCompose,
+        'podman_compose': PodmanCompose,
+    }
+    with patch.dict(fake_tasks, real_tasks):
+        engine = Engine(tasks('homebrew_cask', 'node', 'docker_compose', 'podman_compose'), jobs=4)
+
+    assert [n.depends_on for n in engine.nodes] == [set(), set(), {0}, {0}]
+
+
+def test_run_sequential_in_main_thread():
+    Engine(tasks('homebrew', 'python', 'pip', 'run'), jobs=4).run()
+
+    assert calls == [('homebrew', None), ('python', None), ('pip', None), ('run', None)]
+
+
+def test_run_independent_tasks_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+
+    class Blocking(FakeTask):
+        def up(self, args, extra_args):
+            # Deadlocks unless both tasks run at the same time
+            barrier.wait()
+            super().up(args, extra_args)
+
+    with patch.dict(fake_tasks, {'python': Blocking, 'node': Blocking}):
+        Engine(tasks('python', 'node'), jobs=2).run()
+
+    assert sorted(calls) == [('node', 'node'), ('python', 'python')]
+
+
+def test_run_interactive_task_alone_in_main_thread():
+    running = []
+
+    class Tracked(FakeTask):
+        def up(self, args, extra_args):
+            running.append(args['name'])
+            calls.append((tuple(running), None))
+            super().up(args, extra_args)
+            running.remove(args['name'])
+
+    class Hosts(Tracked):
+        __interactive__ = True
+
+    with patch.dict(fake_tasks, {'python': Tracked, 'hosts': Hosts, 'node': Tracked}):
+        Engine(tasks('python', 'node', 'hosts', python={'sleep': 0.1}), jobs=4).run()
+
+    assert (('hosts',), None) in calls
+    assert ('hosts', None) in calls
+
+
+def test_run_with_single_job():
+    Engine(tasks('python', 'node'), jobs=1).run()
+
+    assert calls == [('python', None), ('node', None)]
+
+
+def test_run_failure_order():
+    engine = Engine(
+        tasks('python', 'node', 'pip', python={'sleep': 0.1, 'fail': 2}, node={'fail': 1}),
+        jobs=2,
+    )
+
+    with pytest.raises(NonZeroReturnCodeError) as e:
+        engine.run()
+
+    # Both failed, the one defined first in the Devfile is raised even though it finished last
+    assert e.value.code == 2
+    assert [name for name, _ in calls] == ['node', 'python']
+
+
+@patch('dev.engine.RunHistoryHelper.record')
+def test_run_records_history(record_mock):
+    with pytest.raises(NonZeroReturnCodeError):
+        Engine(tasks('python', 'node', node={'fail': 1}), jobs=1).run()
+    Engine(tasks('python'), direction='down').run()
+
+    assert [(c.args[:3], c.args[5]) for c in record_mock.call_args_list] == [
+        (('task', 'python', {'name': 'python'}), 'succeeded'),
+        (('task', 'node', {'name': 'node', 'fail': 1}), 'failed'),
+        (('task', 'python (down)', {'name': 'python'}), 'succeeded'),
+    ]
+
+
+class Cached(FakeTask):
+    @classmethod
+    def fingerprint(cls, args, extra_args):
+        return Fingerprint(args.get('input'))
+
+    @classmethod
+    def restore(cls, args, extra_args):
+        calls.append(('restore', None))
+
+
+@patch('dev.task.error_console.print')
+@patch('dev.engine.HomebrewHelper.install_formulae')
+def test_run_validates_args_before_fingerprint(install_formulae_mock, error_console_print_mock):
+    from dev.tasks.mkcert import Mkcert
+
+    with patch.dict(fake_tasks, {'mkcert': Mkcert}):
+        with pytest.raises(SystemExit):
+            Engine([ConfigTask('mkcert', {'key': 'key.pem'})]).run()
+
+    install_formulae_mock.assert_not_called()
+    assert error_console_print_mock.call_args.args[0].startswith(
+        'Failed to validate input to Mkcert'
+    )
+
+    engine = Engine([])
+    with pytest.raises(SystemExit):
+        engine.fingerprint(Mkcert, TaskNode(0, ConfigTask('mkcert', ['key.pem']), set(), False))
+
+
+@patch('dev.engine.HashCacheHelper.write_hash')
+@patch('dev.engine.HashCacheHelper.read_hash')
+def test_run_skips_unchanged_fingerprint(read_hash_mock, write_hash_mock):
+    hashes = {}
+    read_hash_mock.side_effect = hashes.get
+    write_hash_mock.side_effect = hashes.__setitem__
+
+    with patch.dict(fake_tasks, {'python': Cached}):
+        Engine(tasks('python', python={'input': 'a'})).run()
+        Engine(tasks('python', python={'input': 'a'})).run()
+
+        assert calls == [('python', None), ('restore', None)]
+
+        calls.clear()
+        Engine(tasks('python', python={'input': 'b'})).run()
+
+        assert calls == [('python', None)]
+
+
+@patch('dev.engine.HashCacheHelper.write_hash')
+@patch('dev.engine.HashCacheHelper.read_hash')
+def test_run_failure_does_not_store_fingerprint(read_hash_mock, write_hash_mock):
+    read_hash_mock.return_value = None
+
+    with patch.dict(fake_tasks, {'python': Cached}):
+        with pytest.raises(NonZeroReturnCodeError):
+            Engine(tasks('python', python={'fail': 1})).run()
+
+    write_hash_mock.assert_not_called()
+
+
+class Brewed(FakeTask):
+    @classmethod
+    def formulae(cls, args):
+        return [f"{args['name']}-formula"]
+
+
+@patch('dev.engine.HomebrewHelper.install_formulae')
+def test_run_installs_formulae_in_one_batch(install_formulae_mock):
+    with patch.dict(fake_tasks, {'python': Brewed, 'node': Brewed}):
+        Engine(tasks('homebrew', 'python', 'node')).run()
+        Engine(tasks('python'), direction='down').run()
+
+    install_formulae_mock.assert_called_once_with(['python-formula', 'node-formula'])
+
+
+@patch('dev.engine.HomebrewHelper.install_formulae')
+def test_run_installs_formulae_after_barrier(install_formulae_mock):
+    install_formulae_mock.side_effect = lambda formulae: calls.append((formulae, None))
+
+    with patch.dict(fake_tasks, {'python': Brewed, 'node': Brewed}):
+        Engine(tasks('python', 'run', 'homebrew', 'node'), jobs=1).run()
+
+    assert calls == [
+        (['python-formula'], None),
+        ('python', None),
+        ('run', None),
+        (['node-formula'], None),
+        ('homebrew', None),
+        ('node', None),
+    ]
+
+
+class Probed(FakeTask):
+    __depends_on__ = ['homebrew']
+
+    @classmethod
+    def probes(cls, args):
+        return [dict(command=f"{args['name']} root", tool=args['name'])]
+
+
+@patch('dev.engine.HomebrewHelper.install_formulae')
+def test_run_prefetches_probes_per_segment(install_formulae_mock, prefetch_mock):
+    with patch.dict(fake_tasks, {'python': Probed, 'node': Probed}):
+        Engine(tasks('python', 'node', 'run', 'node'), jobs=1).run()
+
+    assert prefetch_mock.call_args_list == [
+        call([dict(command='python root', tool='python'), dict(command='node root', tool='node')]),
+        call([dict(command='node root', tool='node')]),
+    ]
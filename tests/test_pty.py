@@ -6,8 +6,10 @@ import signal
 import socket
 import struct
 import sys
+import tempfile
 import tty
 import unittest
+from unittest import mock
 from test.support import reap_children, verbose
 
 from dev import pty
@@ -195,6 +197,52 @@ class PtyTest(unittest.TestCase):
     def test_spawn_doesnt_hang(self):
         pty.spawn((sys.executable, '-c', 'print("hi there")'))
 
+    def test_spawn_executed(self):
+        executed = []
+        status = pty.spawn((sys.executable, '-c', 'pass'), executed=lambda: executed.append(True))
+        self.assertEqual(executed, [True])
+        self.assertEqual(pty.waitstatus_to_exitcode(status), 0)
+
+    def test_spawn_session_leader_with_controlling_tty(self):
+        code = (
+            'import os, sys\n'
+            'if os.getsid(0) != os.getpid(): sys.exit(1)\n'
+            'if not os.isatty(1) or not os.isatty(2): sys.exit(2)\n'
+            'os.close(os.open("/dev/tty", os.O_RDWR))\n'
+            'sys.exit(4)\n'
+        )
+        for use_posix_spawn in {False, pty.USE_POSIX_SPAWN}:
+            with self.subTest(use_posix_spawn=use_posix_spawn):
+                with mock.patch.object(pty, 'USE_POSIX_SPAWN', use_posix_spawn):
+                    status = pty.spawn((sys.executable, '-c', code))
+                self.assertEqual(pty.waitstatus_to_exitcode(status), 4)
+
+    def test_spawn_missing_command(self):
+        status = pty.spawn(('dev-missing-command',))
+        self.assertEqual(pty.waitstatus_to_exitcode(status), 127)
+
+    def test_posix_spawn_searches_path_of_env(self):
+        with tempfile.TemporaryDirectory() as directory:
+            executable = os.path.join(directory, 'dev-test-tool')
+            with open(executable, 'w') as fp:
+                fp.write('#!/bin/sh\n')
+            os.chmod(executable, 0o755)
+            env = dict(os.environ, PATH=directory)
+
+            with mock.patch.object(os, 'posix_spawn', return_value=12345) as posix_spawn:
+                pid, master_fd = pty._posix_spawn(('dev-test-tool', '-v'), env)
+            os.close(master_fd)
+            self.assertEqual(pid, 12345)
+            self.assertEqual(
+                posix_spawn.call_args[0][:3], (executable, ('dev-test-tool', '-v'), env)
+            )
+
+            # Not on the PATH of the parent
+            with mock.patch.object(os, 'posix_spawn') as posix_spawn:
+                with self.assertRaises(FileNotFoundError):
+                    pty._posix_spawn(('dev-test-tool',))
+            posix_spawn.assert_not_called()
+
 
 class SmallPtyTests(unittest.TestCase):
     """These tests don't spawn children or hang."""
@@ -205,15 +253,15 @@ class SmallPtyTests(unittest.TestCase):
         self.orig_pty_close = pty.close
         self.orig_pty__copy = pty._copy
         self.orig_pty_fork = pty.fork
-        self.orig_pty_select = pty.select
+        self.orig_pty_poller = pty._poller
         self.orig_pty_setraw = pty.setraw
         self.orig_pty_tcgetattr = pty.tcgetattr
         self.orig_pty_tcsetattr = pty.tcsetattr
         self.orig_pty_waitpid = pty.waitpid
         self.fds = []  # A list of file descriptors to close.
         self.files = []
-        self.select_rfds_lengths = []
-        self.select_rfds_results = []
+        self.poller_fds = []
+        self.poller_results = []
         self.tcsetattr_mode_setting = None
 
     def tearDown(self):
@@ -222,7 +270,7 @@ class SmallPtyTests(unittest.TestCase):
         pty.close = self.orig_pty_close
         pty._copy = self.orig_pty__copy
         pty.fork = self.orig_pty_fork
-        pty.select = self.orig_pty_select
+        pty._poller = self.orig_pty_poller
         pty.setraw = self.orig_pty_setraw
         pty.tcgetattr = self.orig_pty_tcgetattr
         pty.tcsetattr = self.orig_pty_tcsetattr
@@ -248,11 +296,25 @@ class SmallPtyTests(unittest.TestCase):
         self.files.extend(socketpair)
         return socketpair
 
-    def _mock_select(self, rfds, wfds, xfds, timeout=0):
-        # This will raise IndexError when no more expected calls exist.
-        # This ignores the timeout
-        self.assertEqual(self.select_rfds_lengths.pop(0), len(rfds))
-        return self.select_rfds_results.pop(0), [], []
+    def _make_mock_poller(self):
+        test = self
+
+        class MockPoller:
+            def __init__(self, fds):
+                test.poller_fds = list(fds)
+
+            def wait(self, timeout=None):
+                # This will raise IndexError when no more expected calls exist.
+                # This ignores the timeout
+                return test.poller_results.pop(0)
+
+            def unregister(self, fd):
+                test.poller_fds.remove(fd)
+
+            def close(self):
+                ...
+
+        return MockPoller
 
     def _make_mock_fork(self, pid):
         def mock_fork():
@@ -276,11 +338,11 @@ class SmallPtyTests(unittest.TestCase):
         os.write(masters[1], b'from master')
         os.write(write_to_stdin_fd, b'from stdin')
 
-        # Expect two select calls, the last one will cause IndexError
-        pty.select = self._mock_select
-        self.select_rfds_lengths.append(2)
-        self.select_rfds_results.append([mock_stdin_fd, masters[0]])
-        self.select_rfds_lengths.append(2)
+        # Expect a wait, a non-blocking check for more output on master and a second wait
+        # which will cause IndexError
+        pty._poller = self._make_mock_poller()
+        self.poller_results.append([mock_stdin_fd, masters[0]])
+        self.poller_results.append([])
 
         with self.assertRaises(IndexError):
             pty._copy(masters[0])
@@ -303,15 +365,65 @@ class SmallPtyTests(unittest.TestCase):
         socketpair[1].close()
         os.close(write_to_stdin_fd)
 
-        pty.select = self._mock_select
-        self.select_rfds_lengths.append(2)
-        self.select_rfds_results.append([mock_stdin_fd, masters[0]])
-        # We expect that both fds were removed from the fds list as they
-        # both encountered an EOF before the second select call.
-        self.select_rfds_lengths.append(0)
+        pty._poller = self._make_mock_poller()
+        self.poller_results.append([mock_stdin_fd, masters[0]])
 
-        # We expect the function to return without error.
+        # We expect the function to return without error on EOF from master.
         self.assertEqual(pty._copy(masters[0]), None)
+        self.assertEqual(self.poller_results, [])
+
+    def test__copy_coalesces_output(self):
+        """Test that output available on master is written to stdout at once."""
+        read_from_stdout_fd, mock_stdout_fd = self._pipe()
+        pty.STDOUT_FILENO = mock_stdout_fd
+        mock_stdin_fd, write_to_stdin_fd = self._pipe()
+        pty.STDIN_FILENO = mock_stdin_fd
+        socketpair = self._socketpair()
+        masters = [s.fileno() for s in socketpair]
+
+        os.write(masters[1], b'first ')
+        os.write(masters[1], b'second')
+        socketpair[1].close()
+        os.close(write_to_stdin_fd)
+
+        reads = []
+
+        def master_read(fd):
+            data = os.read(fd, 6)
+            reads.append(data)
+            return data
+
+        writes = []
+        orig_writen = pty._writen
+        self.addCleanup(setattr, pty, '_writen', orig_writen)
+        pty._writen = lambda fd, data: (writes.append(data), orig_writen(fd, data))
+
+        self.assertEqual(pty._copy(masters[0], master_read), None)
+        self.assertEqual(reads, [b'first ', b'second', b''])
+        self.assertEqual(writes, [b'first second'])
+        self.assertEqual(os.read(read_from_stdout_fd, 20), b'first second')
+
+    def test__copy_high_fd(self):
+        """Test that descriptors above FD_SETSIZE work, select() can not handle them."""
+        read_from_stdout_fd, mock_stdout_fd = self._pipe()
+        pty.STDOUT_FILENO = mock_stdout_fd
+        mock_stdin_fd, write_to_stdin_fd = self._pipe()
+        pty.STDIN_FILENO = mock_stdin_fd
+        os.close(write_to_stdin_fd)
+        socketpair = self._socketpair()
+
+        try:
+            master_fd = fcntl.fcntl(socketpair[0].fileno(), fcntl.F_DUPFD, 2000)
+        except OSError:
+            self.skipTest('Can not open descriptors above 2000')
+        self.fds.append(master_fd)
+
+        os.write(socketpair[1].fileno(), b'from master')
+        socketpair[1].close()
+        socketpair[0].close()
+
+        self.assertEqual(pty._copy(master_fd), None)
+        self.assertEqual(os.read(read_from_stdout_fd, 20), b'from master')
 
     def test__restore_tty_mode_normal_return(self):
         """Test that spawn resets the tty mode no when _copy returns normally."""
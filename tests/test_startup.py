@@ -0,0 +1,76 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from dev.helpers import root_path
+
+# These commands run many times a day through the shell wrapper, they must not import modules
+# only other commands need. Checked on sys.modules rather than timed, which is flaky on busy CI.
+
+script = '''
+import json
+import sys
+
+sys.argv = {argv!r}
+sys.path.insert(0, {path!r})
+try:
+    from dev.cli import main
+
+    main()
+finally:
+    sys.stderr.write(json.dumps(sorted(sys.modules)))
+'''
+
+
+def run_dev(argv, home):
+    env = dict(
+        os.environ, HOME=str(home), INVOKED_VIA_SHELL='1', DEV_CACHE_PATH=str(home / 'cache')
+    )
+    completed_process = subprocess.run(
+        [sys.executable, '-c', script.format(argv=argv, path=os.path.dirname(root_path))],
+        cwd=home,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    assert completed_process.returncode == 0, completed_process.stderr
+
+    return json.loads(completed_process.stderr.splitlines()[-1])
+
+
+def task_modules(modules):
+    return [m for m in modules if m.startswith('dev.tasks.') and m != 'dev.tasks.internal']
+
+
+@pytest.fixture
+def home(tmp_path):
+    os.makedirs(tmp_path / 'src' / 'github.com' / 'acme' / 'abc' / '.git')
+    return tmp_path
+
+
+def test_help_startup(home):
+    modules = run_dev(['dev', '--help'], home)
+
+    assert task_modules(modules) == []
+    assert 'rich' not in modules
+    assert 'yaml' not in modules
+
+
+def test_version_startup(home):
+    modules = run_dev(['dev', '--version'], home)
+
+    assert task_modules(modules) == []
+    assert 'jinja2' not in modules
+    assert 'yaml' not in modules
+
+
+def test_cd_startup(home):
+    modules = run_dev(['dev', 'cd', 'abc'], home)
+
+    assert task_modules(modules) == ['dev.tasks.internal.cd']
+    assert 'rich' not in modules
+    assert 'jinja2' not in modules
+    assert 'yaml' not in modules